@@ -12,7 +12,10 @@ def before_all(context):
 
 
 def before_scenario(context, scenario):
+    from river.core.caches import invalidate_caches
+
     management.call_command('flush', interactive=False)
+    invalidate_caches()
 
 
 def parse_string_with_whitespace(text):
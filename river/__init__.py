@@ -1 +1,11 @@
 default_app_config = 'river.apps.RiverApp'
+
+
+def bulk_initialize(workflow_objects, field_name, *args, **kwargs):
+    from river.core.bulk import bulk_initialize as _bulk_initialize
+    return _bulk_initialize(workflow_objects, field_name, *args, **kwargs)
+
+
+def bulk_create(workflow_objects, *args, **kwargs):
+    from river.core.bulk import bulk_create as _bulk_create
+    return _bulk_create(workflow_objects, *args, **kwargs)
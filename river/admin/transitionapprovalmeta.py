@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django import forms
 
+from river.core.approvalmetagraph import deferred_approval_meta_graph
 from river.models.transitionapprovalmeta import TransitionApprovalMeta
 
 
@@ -14,5 +15,9 @@ class TransitionApprovalMetaAdmin(admin.ModelAdmin):
     form = TransitionApprovalMetaForm
     list_display = ('workflow', 'transition_meta', 'priority')
 
+    def changelist_view(self, request, extra_context=None):
+        with deferred_approval_meta_graph():
+            return super(TransitionApprovalMetaAdmin, self).changelist_view(request, extra_context=extra_context)
+
 
 admin.site.register(TransitionApprovalMeta, TransitionApprovalMetaAdmin)
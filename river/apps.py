@@ -28,8 +28,30 @@ class RiverApp(AppConfig):
             for model_class in self._get_all_workflow_classes():
                 self._register_hook_inlines(model_class)
 
+        from river.core.authorizationcontext import authorization_context_cache
+        authorization_context_cache.connect_signals()
+
+        from river.core.instrumentation import instrumentation
+        instrumentation.load_listeners(app_config.INSTRUMENTATION_LISTENERS)
+
+        self._warm_function_cache()
+
         LOGGER.debug('RiverApp is loaded.')
 
+    def _warm_function_cache(self):
+        from river.config import app_config
+
+        try:
+            functions = list(self.get_model('Function').objects.order_by('-date_updated')[:app_config.FUNCTION_CACHE_SIZE])
+        except (OperationalError, ProgrammingError):
+            return
+
+        for function in reversed(functions):
+            try:
+                function.get()
+            except Exception as e:
+                LOGGER.warning("Function %s could not be compiled. %s" % (function, e))
+
     @classmethod
     def _get_all_workflow_fields(cls):
         from river.core.workflowregistry import workflow_registry
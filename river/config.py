@@ -1,6 +1,7 @@
 from django.contrib.auth.models import Permission, Group
 from django.contrib.contenttypes.models import ContentType
 
+from django.core.signals import setting_changed
 from django.db import connection
 
 
@@ -21,13 +22,25 @@ class RiverConfig(object):
                 'USER_CLASS': settings.AUTH_USER_MODEL,
                 'PERMISSION_CLASS': Permission,
                 'GROUP_CLASS': Group,
-                'INJECT_MODEL_ADMIN': False
+                'INJECT_MODEL_ADMIN': False,
+                'HOOK_EXECUTION': 'sync',
+                'HOOK_EXECUTOR': 'thread',
+                'HOOK_WORKERS': 4,
+                'HOOK_QUEUE_SIZE': 1000,
+                'HOOK_RETRIES': 0,
+                'HOOK_RETRY_DELAY': 1,
+                'FUNCTION_CACHE_SIZE': 256,
+                'AUTHORIZATION_CACHE_TTL': 60,
+                'INSTRUMENTATION_LISTENERS': [],
+                'FULL_OBJECT_SAVE': False,
+                'ACTIONABLE_APPROVALS': False,
             }
             river_settings = {}
             for key, default in allowed_configurations.items():
                 river_settings[key] = getattr(settings, self.get_with_prefix(key), default)
 
             river_settings['IS_MSSQL'] = connection.vendor == 'microsoft'
+            river_settings['IS_POSTGRESQL'] = connection.vendor == 'postgresql'
             self.cached_settings = river_settings
 
             return self.cached_settings
@@ -43,3 +56,11 @@ class RiverConfig(object):
 
 
 app_config = RiverConfig()
+
+
+def _on_setting_changed(sender, setting, **kwargs):
+    if setting.startswith(app_config.get_with_prefix('')):
+        app_config.cached_settings = None
+
+
+setting_changed.connect(_on_setting_changed, dispatch_uid="river_setting_changed")
@@ -0,0 +1,83 @@
+import logging
+
+from river.config import app_config
+from river.core.transitionbatch import get_approval_relations
+from river.models import ActionableApproval, TransitionApproval, PENDING
+from river.utils.typedobjectid import object_ids_filter
+
+LOGGER = logging.getLogger(__name__)
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def refresh_actionable_approvals(workflow, model_class, object_ids):
+    """
+    Replaces the actionable approval rows of the given workflow objects with the ones computed from their current
+    states and pending approvals. It costs a fixed number of queries no matter how many objects are given. Nothing is
+    done unless ``RIVER_ACTIONABLE_APPROVALS`` is enabled.
+    """
+    if app_config.ACTIONABLE_APPROVALS and workflow is not None:
+        _refresh(workflow, model_class, object_ids)
+
+
+def rebuild_actionable_approvals(workflow, batch_size=REBUILD_BATCH_SIZE):
+    """
+    Computes all the actionable approval rows of the workflow from scratch, ``batch_size`` objects at a time. It
+    returns the number of the objects that have any pending approval.
+    """
+    model_class = workflow.content_type.model_class()
+    ActionableApproval.objects.filter(workflow=workflow).delete()
+
+    object_ids = list(TransitionApproval.objects.filter(workflow=workflow, status=PENDING).order_by().values_list("object_id", flat=True).distinct())
+    for offset in range(0, len(object_ids), batch_size):
+        _refresh(workflow, model_class, object_ids[offset:offset + batch_size])
+
+    LOGGER.debug("Actionable approvals of %s objects are rebuilt for the workflow %s" % (len(object_ids), workflow))
+    return len(object_ids)
+
+
+def _refresh(workflow, model_class, object_ids):
+    object_ids = sorted(set(str(object_id) for object_id in object_ids))
+    if not object_ids or model_class is None:
+        return
+
+    content_type = app_config.CONTENT_TYPE_CLASS.objects.get_for_model(model_class)
+    ActionableApproval.objects.filter(workflow=workflow, content_type=content_type, object_id__in=object_ids).delete()
+
+    state_attname = model_class._meta.get_field(workflow.field_name).attname
+    current_state_ids = {
+        str(pk): state_id for pk, state_id in model_class.objects.filter(pk__in=object_ids).values_list("pk", state_attname)
+    }
+
+    candidates = []
+    min_priorities = {}
+    for approval_id, object_id, transition_id, source_state_id, priority, transactioner_id in TransitionApproval.objects.filter(
+            workflow=workflow,
+            content_type=content_type,
+            status=PENDING,
+            **object_ids_filter(model_class, object_ids)
+    ).values_list("pk", "object_id", "transition_id", "transition__source_state_id", "priority", "transactioner_id"):
+        if source_state_id != current_state_ids.get(object_id):
+            continue
+        candidates.append((approval_id, object_id, transition_id, priority, transactioner_id))
+        min_priorities[transition_id] = min(priority, min_priorities.get(transition_id, priority))
+
+    actionable = [candidate for candidate in candidates if candidate[3] == min_priorities[candidate[2]]]
+    approval_ids = [approval_id for approval_id, _, _, _, _ in actionable]
+    permission_ids = get_approval_relations("permissions", approval_ids)
+    group_ids = get_approval_relations("groups", approval_ids)
+
+    ActionableApproval.objects.bulk_create([
+        ActionableApproval(
+            workflow=workflow,
+            content_type=content_type,
+            object_id=object_id,
+            transition_approval_id=approval_id,
+            transactioner_id=transactioner_id,
+            permission_id=permission_id,
+            group_id=group_id
+        )
+        for approval_id, object_id, _, _, transactioner_id in actionable
+        for permission_id in (permission_ids[approval_id] or [None])
+        for group_id in (group_ids[approval_id] or [None])
+    ])
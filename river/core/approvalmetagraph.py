@@ -0,0 +1,128 @@
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Q
+
+from river.models import TransitionApprovalMeta, TransitionMeta, Workflow
+
+LOGGER = logging.getLogger(__name__)
+
+_deferred = threading.local()
+
+
+def rebuild_approval_meta_graph(workflow):
+    """
+    Computes the parents of all the approval metas of the workflow in memory and writes the difference with the
+    existing ones to the through table. An approval meta is a parent of another one when its transition ends on the
+    state that the transition of the other one starts from. It costs a fixed number of queries no matter how big the
+    workflow is and it returns the numbers of the added and the removed relations.
+    """
+    through = TransitionApprovalMeta.parents.through
+    child_field_name = TransitionApprovalMeta.parents.field.m2m_field_name()
+
+    approval_metas = list(TransitionApprovalMeta.objects.filter(workflow=workflow).values_list(
+        "pk", "transition_meta__source_state_id", "transition_meta__destination_state_id"
+    ))
+    approval_meta_ids_by_destination = defaultdict(list)
+    for approval_meta_id, _, destination_state_id in approval_metas:
+        approval_meta_ids_by_destination[destination_state_id].append(approval_meta_id)
+
+    expected = set(
+        (approval_meta_id, parent_id)
+        for approval_meta_id, source_state_id, _ in approval_metas
+        for parent_id in approval_meta_ids_by_destination[source_state_id]
+        if parent_id != approval_meta_id
+    )
+
+    added, removed = _write_difference(expected, through.objects.filter(**{"%s__workflow" % child_field_name: workflow}))
+    LOGGER.debug("Approval meta graph of the workflow %s is rebuilt. %s relations are added and %s are removed" % (workflow, added, removed))
+    return added, removed
+
+
+def update_approval_meta_neighbours(approval_meta):
+    """
+    Maintains only the relations of the given approval meta, to its parents and to its children, which are the only
+    ones that saving it can change. It costs a fixed number of queries no matter how big the workflow is and it returns
+    the numbers of the added and the removed relations.
+    """
+    through = TransitionApprovalMeta.parents.through
+    child_field_name = TransitionApprovalMeta.parents.field.m2m_field_name()
+    parent_field_name = TransitionApprovalMeta.parents.field.m2m_reverse_field_name()
+
+    source_state_id, destination_state_id = TransitionMeta.objects.filter(pk=approval_meta.transition_meta_id).values_list(
+        "source_state_id", "destination_state_id"
+    ).get()
+    neighbours = TransitionApprovalMeta.objects.filter(
+        Q(transition_meta__destination_state_id=source_state_id) | Q(transition_meta__source_state_id=destination_state_id),
+        workflow=approval_meta.workflow_id,
+    ).exclude(pk=approval_meta.pk).values_list("pk", "transition_meta__source_state_id", "transition_meta__destination_state_id")
+
+    expected = set()
+    for neighbour_id, neighbour_source_state_id, neighbour_destination_state_id in neighbours:
+        if neighbour_destination_state_id == source_state_id:
+            expected.add((approval_meta.pk, neighbour_id))
+        if neighbour_source_state_id == destination_state_id:
+            expected.add((neighbour_id, approval_meta.pk))
+
+    added, removed = _write_difference(expected, through.objects.filter(
+        Q(**{"%s_id" % child_field_name: approval_meta.pk}) | Q(**{"%s_id" % parent_field_name: approval_meta.pk})
+    ))
+    LOGGER.debug("Approval meta graph around the approval meta %s is updated. %s relations are added and %s are removed" % (approval_meta.pk, added, removed))
+    return added, removed
+
+
+def _write_difference(expected, relations):
+    through = TransitionApprovalMeta.parents.through
+    child_field_name = TransitionApprovalMeta.parents.field.m2m_field_name()
+    parent_field_name = TransitionApprovalMeta.parents.field.m2m_reverse_field_name()
+
+    existing = {
+        (approval_meta_id, parent_id): through_id
+        for through_id, approval_meta_id, parent_id in relations.values_list("pk", "%s_id" % child_field_name, "%s_id" % parent_field_name)
+    }
+
+    stale = [through_id for relation, through_id in existing.items() if relation not in expected]
+    missing = [
+        through(**{"%s_id" % child_field_name: approval_meta_id, "%s_id" % parent_field_name: parent_id})
+        for approval_meta_id, parent_id in sorted(expected.difference(existing))
+    ]
+
+    with transaction.atomic():
+        if stale:
+            through.objects.filter(pk__in=stale).delete()
+        if missing:
+            through.objects.bulk_create(missing)
+    return len(missing), len(stale)
+
+
+@contextmanager
+def deferred_approval_meta_graph():
+    """
+    Defers maintaining the parents of the approval metas that are saved in the block. The graph of each workflow that
+    any of them belongs to is rebuilt once when the outermost block exits without an error. It is meant for the code
+    that saves many approval metas at once like the loaders and the bulk edits.
+    """
+    if getattr(_deferred, "workflow_ids", None) is not None:
+        yield
+        return
+
+    _deferred.workflow_ids = set()
+    try:
+        yield
+        workflow_ids = _deferred.workflow_ids
+    finally:
+        _deferred.workflow_ids = None
+
+    for workflow in Workflow.objects.filter(pk__in=workflow_ids):
+        rebuild_approval_meta_graph(workflow)
+
+
+def on_approval_meta_saved(approval_meta):
+    workflow_ids = getattr(_deferred, "workflow_ids", None)
+    if workflow_ids is not None:
+        workflow_ids.add(approval_meta.workflow_id)
+    else:
+        update_approval_meta_neighbours(approval_meta)
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.contrib import auth
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save, post_delete
+
+from river.config import app_config
+from river.core.caches import PendingChanges
+
+LOGGER = logging.getLogger(__name__)
+
+
+class AuthorizationContext(object):
+    """
+    What a user is authorized with, resolved down to the primary keys of the permissions and the groups of the user so
+    that the available approvals can be filtered with plain ``IN`` clauses.
+    """
+
+    def __init__(self, user_id, permission_ids, group_ids):
+        self.user_id = user_id
+        self.permission_ids = frozenset(permission_ids)
+        self.group_ids = frozenset(group_ids)
+
+    @classmethod
+    def build(cls, as_user):
+        codenames_by_app_label = defaultdict(set)
+        for backend in auth.get_backends():
+            if hasattr(backend, "get_all_permissions"):
+                for permission in backend.get_all_permissions(as_user):
+                    app_label, codename = permission.split('.', 1)
+                    codenames_by_app_label[app_label].add(codename)
+
+        permission_q = Q()
+        for app_label, codenames in codenames_by_app_label.items():
+            permission_q = permission_q | Q(content_type__app_label=app_label, codename__in=codenames)
+
+        permission_ids = app_config.PERMISSION_CLASS.objects.filter(permission_q).values_list("pk", flat=True) if permission_q else []
+        group_ids = as_user.groups.values_list("pk", flat=True) if as_user.pk is not None else []
+        return cls(as_user.pk, permission_ids, group_ids)
+
+
+class AuthorizationContextCache(object):
+    """
+    Process local cache of the authorization contexts of the users. An entry lives ``RIVER_AUTHORIZATION_CACHE_TTL``
+    seconds at most and it is dropped earlier when the permissions or the groups of the user change. While such a
+    change is not committed yet, the contexts that are built are only seen by the thread which has made the change and
+    they are dropped once the transaction is committed or rolled back.
+    """
+
+    def __init__(self):
+        self._contexts = {}
+        self._lock = threading.Lock()
+        self._pending_changes = PendingChanges(self.invalidate)
+        self.version = 0
+
+    def get(self, as_user):
+        if as_user.pk is None:
+            return AuthorizationContext.build(as_user)
+
+        pending_contexts = self._pending_changes.get_values()
+        contexts = self._contexts if pending_contexts is None else pending_contexts
+        entry = contexts.get(as_user.pk, None)
+        if entry and entry[0] > time.time():
+            return entry[1]
+
+        version = self.version
+        context = AuthorizationContext.build(as_user)
+        entry = (time.time() + app_config.AUTHORIZATION_CACHE_TTL, context)
+        if pending_contexts is not None:
+            pending_contexts[as_user.pk] = entry
+        else:
+            with self._lock:
+                if version == self.version:
+                    self._contexts[as_user.pk] = entry
+        return context
+
+    def invalidate(self, user_ids=None):
+        with self._lock:
+            if user_ids is None:
+                self._contexts = {}
+            else:
+                for user_id in user_ids:
+                    self._contexts.pop(user_id, None)
+            self.version += 1
+        self._pending_changes.clear()
+        LOGGER.debug("Authorization context cache is invalidated for %s." % ("all the users" if user_ids is None else "the users %s" % list(user_ids)))
+
+    def _invalidate_now_and_on_commit(self, user_ids=None):
+        self.invalidate(user_ids)
+        self._pending_changes.add()
+
+    def on_user_relations_changed(self, sender, instance, action, reverse, pk_set, **kwargs):
+        if not action.startswith("post_"):
+            return
+        if not reverse:
+            self._invalidate_now_and_on_commit([instance.pk])
+        elif pk_set is not None and action != "post_clear":
+            self._invalidate_now_and_on_commit(set(pk_set))
+        else:
+            self._invalidate_now_and_on_commit()
+
+    def on_group_permissions_changed(self, *args, **kwargs):
+        self._invalidate_now_and_on_commit()
+
+    def on_user_changed(self, sender, instance, **kwargs):
+        self._invalidate_now_and_on_commit([instance.pk])
+
+    def connect_signals(self):
+        user_class = get_user_model()
+        for field_name in ["groups", "user_permissions"]:
+            field = getattr(user_class, field_name, None)
+            if field is not None and hasattr(field, "through"):
+                m2m_changed.connect(self.on_user_relations_changed, sender=field.through, dispatch_uid="river_authorization_context_%s" % field_name)
+
+        group_class = app_config.GROUP_CLASS
+        if hasattr(group_class, "permissions"):
+            m2m_changed.connect(self.on_group_permissions_changed, sender=group_class.permissions.through, dispatch_uid="river_authorization_context_group_permissions")
+
+        post_save.connect(self.on_user_changed, sender=user_class, dispatch_uid="river_authorization_context_user_saved")
+        post_delete.connect(self.on_user_changed, sender=user_class, dispatch_uid="river_authorization_context_user_deleted")
+        for model in [group_class, app_config.PERMISSION_CLASS]:
+            post_delete.connect(self.on_group_permissions_changed, sender=model, dispatch_uid="river_authorization_context_%s_deleted" % model.__name__)
+
+
+authorization_context_cache = AuthorizationContextCache()
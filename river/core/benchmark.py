@@ -0,0 +1,170 @@
+import logging
+from collections import OrderedDict
+from timeit import default_timer
+from uuid import uuid4
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction, models
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+
+from river.config import app_config
+from river.core.approvalmetagraph import deferred_approval_meta_graph
+from river.core.bulk import _can_return_primary_keys
+from river.core.caches import invalidate_caches
+from river.models import State, Workflow, TransitionMeta, TransitionApprovalMeta, Transition, Function, OnApprovedHook, OnTransitHook, PENDING
+from river.models.hook import BEFORE, AFTER
+from river.signals import HookDispatcher
+
+LOGGER = logging.getLogger(__name__)
+
+NOOP_CALLBACK = """
+def handle(context):
+    pass
+"""
+
+
+class WorkflowBenchmark(object):
+    """
+    Builds a synthetic workflow for a workflow model and records the number of queries and the wall time spent by the
+    core workflow API on it. Everything is created in a transaction which is rolled back at the end, so it leaves the
+    database as it is. The workflow model shouldn't have a workflow for the field yet.
+    """
+
+    def __init__(self, model_class, field_name, states=5, branching=2, approvals_per_transition=1, cycles=False, objects=100):
+        self.model_class = model_class
+        self.field_name = field_name
+        self.number_of_states = states
+        self.branching = branching
+        self.approvals_per_transition = approvals_per_transition
+        self.cycles = cycles
+        self.number_of_objects = objects
+        self.results = OrderedDict()
+
+    @property
+    def parameters(self):
+        return OrderedDict([
+            ("model", self.model_class._meta.label),
+            ("field_name", self.field_name),
+            ("states", self.number_of_states),
+            ("branching", self.branching),
+            ("approvals_per_transition", self.approvals_per_transition),
+            ("cycles", self.cycles),
+            ("objects", self.number_of_objects),
+        ])
+
+    def run(self):
+        self.results = OrderedDict()
+        try:
+            with transaction.atomic():
+                self._run()
+                transaction.set_rollback(True)
+        finally:
+            invalidate_caches()
+
+        return OrderedDict([
+            ("django", django.get_version()),
+            ("database", connection.vendor),
+            ("parameters", self.parameters),
+            ("results", self.results),
+        ])
+
+    def _run(self):
+        workflow, user = self._create_workflow()
+        class_workflow = getattr(self.model_class.river, self.field_name)
+
+        workflow_objects = self._create_workflow_objects(workflow)
+
+        for workflow_object in workflow_objects:
+            self._measure("initialize_approvals", getattr(workflow_object.river, self.field_name).initialize_approvals)
+
+        self._measure("get_available_approvals", lambda: list(class_workflow.get_available_approvals(as_user=user)))
+        self._measure("get_on_approval_objects", lambda: list(class_workflow.get_on_approval_objects(as_user=user)))
+
+        content_type = app_config.CONTENT_TYPE_CLASS.objects.get_for_model(self.model_class)
+        for workflow_object in workflow_objects:
+            approval = getattr(workflow_object.river, self.field_name).get_available_approvals(as_user=user).select_related("transition").first()
+            if approval:
+                self._measure("hook_dispatch", self._dispatch_hooks, workflow, workflow_object, content_type, approval)
+
+        for workflow_object in workflow_objects:
+            instance_workflow = getattr(workflow_object.river, self.field_name)
+            next_state = instance_workflow.get_available_states(as_user=user).order_by("pk").first()
+            if next_state:
+                self._measure("approve", instance_workflow.approve, as_user=user, next_state=next_state)
+
+        for workflow_object in workflow_objects:
+            furthest_transition = Transition.objects.filter(
+                workflow=workflow, object_id=workflow_object.pk, status=PENDING
+            ).order_by("-iteration", "pk").first()
+            if furthest_transition:
+                self._measure("jump_to", getattr(workflow_object.river, self.field_name).jump_to, furthest_transition.destination_state)
+
+    def _create_workflow(self):
+        content_type = app_config.CONTENT_TYPE_CLASS.objects.get_for_model(self.model_class)
+        suffix = uuid4().hex[:8]
+
+        states = [State.objects.create(label="benchmark-%s-%s" % (suffix, index)) for index in range(self.number_of_states)]
+        workflow = Workflow.objects.create(content_type=content_type, field_name=self.field_name, initial_state=states[0])
+
+        permission = app_config.PERMISSION_CLASS.objects.create(content_type=content_type, codename="benchmark_%s" % suffix, name="benchmark %s" % suffix)
+        user = get_user_model().objects.create(**{get_user_model().USERNAME_FIELD: "benchmark-%s" % suffix})
+        user.user_permissions.add(permission)
+
+        callback_function = Function.objects.create(name="benchmark-%s" % suffix, body=NOOP_CALLBACK)
+
+        with deferred_approval_meta_graph():
+            for source_state, destination_state in self._edges(states):
+                transition_meta = TransitionMeta.objects.create(workflow=workflow, source_state=source_state, destination_state=destination_state)
+                OnTransitHook.objects.create(workflow=workflow, callback_function=callback_function, transition_meta=transition_meta, hook_type=AFTER)
+                for priority in range(self.approvals_per_transition):
+                    approval_meta = TransitionApprovalMeta.objects.create(workflow=workflow, transition_meta=transition_meta, priority=priority)
+                    approval_meta.permissions.add(permission)
+                    OnApprovedHook.objects.create(workflow=workflow, callback_function=callback_function, transition_approval_meta=approval_meta, hook_type=BEFORE)
+
+        return workflow, user
+
+    def _create_workflow_objects(self, workflow):
+        workflow_objects = [self.model_class(**{self.field_name: workflow.initial_state}) for _ in range(self.number_of_objects)]
+        if not _can_return_primary_keys() and isinstance(self.model_class._meta.pk, models.AutoField):
+            last_pk = self.model_class.objects.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+            for offset, workflow_object in enumerate(workflow_objects, 1):
+                workflow_object.pk = last_pk + offset
+        self.model_class.objects.bulk_create(workflow_objects)
+        return workflow_objects
+
+    def _edges(self, states):
+        edges = []
+        sources = [states[0]]
+        next_index = 1
+        while sources and next_index < len(states):
+            source_state = sources.pop(0)
+            for _ in range(self.branching):
+                if next_index >= len(states):
+                    break
+                edges.append((source_state, states[next_index]))
+                sources.append(states[next_index])
+                next_index += 1
+
+        if self.cycles and len(states) > 1:
+            edges.append((states[-1], states[0]))
+        return edges
+
+    @staticmethod
+    def _dispatch_hooks(workflow, workflow_object, content_type, approval):
+        with HookDispatcher(workflow, workflow_object, content_type, approval, True, False):
+            pass
+
+    def _measure(self, name, func, *args, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            started = default_timer()
+            func(*args, **kwargs)
+            elapsed = default_timer() - started
+
+        result = self.results.setdefault(name, OrderedDict([("calls", 0), ("queries", 0), ("seconds", 0.0)]))
+        result["calls"] += 1
+        result["queries"] += len(queries)
+        result["seconds"] += elapsed
+        result["queries_per_call"] = float(result["queries"]) / result["calls"]
+        result["seconds_per_call"] = result["seconds"] / result["calls"]
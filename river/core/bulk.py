@@ -0,0 +1,50 @@
+from django.db import connection
+from django.db.transaction import atomic
+
+from river.core.classworkflowobject import BULK_INITIALIZATION_BATCH_SIZE
+from river.utils.error_code import ErrorCode
+from river.utils.exceptions import RiverException
+
+
+def bulk_initialize(workflow_objects, field_name, batch_size=BULK_INITIALIZATION_BATCH_SIZE):
+    workflow_objects = list(workflow_objects)
+    if workflow_objects:
+        getattr(workflow_objects[0].__class__.river, field_name).bulk_initialize(workflow_objects, batch_size=batch_size)
+    return workflow_objects
+
+
+@atomic
+def bulk_create(workflow_objects, batch_size=BULK_INITIALIZATION_BATCH_SIZE):
+    """
+    Inserts many workflow objects of the same model with ``bulk_create`` and initializes all of their workflows in bulk.
+    Since ``post_save`` is never fired by ``bulk_create``, this is the way of creating workflow objects in bulk.
+    """
+    workflow_objects = list(workflow_objects)
+    if not workflow_objects:
+        return workflow_objects
+
+    model = workflow_objects[0].__class__
+    class_workflows = model.river.all(model)
+    for class_workflow in class_workflows:
+        state_attname = model._meta.get_field(class_workflow.field_name).attname
+        initial_state = class_workflow.initial_state
+        for workflow_object in workflow_objects:
+            if getattr(workflow_object, state_attname) is None:
+                setattr(workflow_object, class_workflow.field_name, initial_state)
+
+    if not _can_return_primary_keys() and any(workflow_object.pk is None for workflow_object in workflow_objects):
+        raise RiverException(ErrorCode.BULK_CREATE_REQUIRES_PRIMARY_KEYS,
+                             "The database backend can not return the primary keys of the objects created in bulk. "
+                             "Either give the primary keys explicitly or save the objects and use bulk_initialize instead.")
+
+    model.objects.bulk_create(workflow_objects, batch_size=batch_size)
+
+    for class_workflow in class_workflows:
+        class_workflow.bulk_initialize(workflow_objects, batch_size=batch_size)
+
+    return workflow_objects
+
+
+def _can_return_primary_keys():
+    features = connection.features
+    return getattr(features, "can_return_rows_from_bulk_insert", getattr(features, "can_return_ids_from_bulk_insert", False))
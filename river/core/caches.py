@@ -0,0 +1,77 @@
+import threading
+
+from django.db import transaction
+
+
+class PendingChanges(object):
+    """
+    Keeps track of the changes that a process local cache depends on and that are made in a transaction which is not
+    committed yet. While the transaction of the current thread has such changes, whatever the cache builds may depend on
+    them, so it is kept in ``values`` which are only seen by the current thread instead of being published to the other
+    ones. ``on_end`` is called both once the transaction is committed and once it is found out that the changes are
+    rolled back, which is when the ``on_commit`` callbacks that are registered for them are discarded by Django.
+    """
+
+    def __init__(self, on_end):
+        self.on_end = on_end
+        self._local = threading.local()
+
+    def add(self):
+        self._local.values = {}
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            return
+
+        sentinels = self._get_sentinels()
+        savepoint_ids = set(connection.savepoint_ids)
+        if sentinels and sentinels[-1][0] == savepoint_ids:
+            return
+
+        def on_commit():
+            self._local.sentinels = []
+            self._local.values = {}
+            self.on_end()
+
+        transaction.on_commit(on_commit)
+        sentinels.append((savepoint_ids, on_commit))
+        self._local.sentinels = sentinels
+
+    def get_values(self):
+        """
+        The values that are built in the current transaction, or ``None`` when it has no pending change.
+        """
+        return self._local.values if self._get_sentinels() else None
+
+    def clear(self):
+        self._local.values = {}
+
+    def _get_sentinels(self):
+        sentinels = getattr(self._local, "sentinels", None)
+        if not sentinels:
+            return []
+
+        registered = set(id(func) for _, func in transaction.get_connection().run_on_commit)
+        alive = [sentinel for sentinel in sentinels if id(sentinel[1]) in registered]
+        if len(alive) != len(sentinels):
+            self._local.sentinels = alive
+            self._local.values = {}
+            self.on_end()
+        return alive
+
+
+def invalidate_caches():
+    """
+    Drops every process local cache of river. It is needed when the database is changed without any model signal
+    being fired, like when the database is flushed.
+    """
+    from river.core.authorizationcontext import authorization_context_cache
+    from river.core.hookregistry import hook_registry
+    from river.core.riverobject import clear_class_workflows
+    from river.core.workflowgraph import workflow_graph_cache
+    from river.models.function import clear_loaded_functions
+
+    workflow_graph_cache.invalidate()
+    hook_registry.invalidate()
+    clear_loaded_functions()
+    authorization_context_cache.invalidate()
+    clear_class_workflows()
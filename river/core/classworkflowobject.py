@@ -1,8 +1,32 @@
+import logging
+from collections import namedtuple, defaultdict
+
 from django.contrib.contenttypes.models import ContentType
+from django.db.transaction import atomic
+from django.utils import timezone
 
+from river.core.actionableapprovals import refresh_actionable_approvals
+from river.core.history import iter_history, HISTORY_STATUSES, HISTORY_CHUNK_SIZE
+from river.core.inbox import Inbox, DATE_CREATED, INBOX_PAGE_SIZE
+from river.core.instrumentation import instrumented, measured, APPROVE_MANY, BULK_INITIALIZE, GET_AVAILABLE_APPROVALS
+from river.core.transitionbatch import TransitionBatch
+from river.core.workflowgraph import workflow_graph_cache
+from river.driver.actionable_driver import ActionableApprovalDriver
 from river.driver.mssql_driver import MsSqlDriver
 from river.driver.orm_driver import OrmDriver
-from river.models import State, TransitionApprovalMeta, Workflow, app_config
+from river.driver.postgres_driver import PostgresDriver
+from river.models import State, app_config, TransitionApproval, Transition, PENDING, APPROVED, DONE
+from river.utils.bulkupdate import bulk_update
+from river.utils.error_code import ErrorCode
+from river.utils.exceptions import RiverException
+from river.utils.typedobjectid import object_ids_filter
+
+LOGGER = logging.getLogger(__name__)
+
+BULK_INITIALIZATION_BATCH_SIZE = 500
+ON_APPROVAL_OBJECTS_CHUNK_SIZE = 2000
+
+ApprovalResult = namedtuple("ApprovalResult", ["workflow_object", "approval", "error"])
 
 
 class ClassWorkflowObject(object):
@@ -10,7 +34,8 @@ class ClassWorkflowObject(object):
     def __init__(self, wokflow_object_class, field_name):
         self.wokflow_object_class = wokflow_object_class
         self.field_name = field_name
-        self.workflow = Workflow.objects.filter(field_name=self.field_name, content_type=self._content_type).first()
+        graph = self.workflow_graph
+        self.workflow = graph.workflow if graph else None
         self._cached_river_driver = None
 
     @property
@@ -18,29 +43,269 @@ class ClassWorkflowObject(object):
         if self._cached_river_driver:
             return self._cached_river_driver
         else:
-            if app_config.IS_MSSQL:
+            if app_config.ACTIONABLE_APPROVALS:
+                self._cached_river_driver = ActionableApprovalDriver(self.workflow, self.wokflow_object_class, self.field_name)
+            elif app_config.IS_MSSQL:
                 self._cached_river_driver = MsSqlDriver(self.workflow, self.wokflow_object_class, self.field_name)
+            elif app_config.IS_POSTGRESQL:
+                self._cached_river_driver = PostgresDriver(self.workflow, self.wokflow_object_class, self.field_name)
             else:
                 self._cached_river_driver = OrmDriver(self.workflow, self.wokflow_object_class, self.field_name)
             return self._cached_river_driver
 
     def get_on_approval_objects(self, as_user):
+        """
+        The workflow objects which have an approval waiting for the user. It is lazy and the object ids are looked up by a
+        subquery rather than being fetched into the memory.
+        """
         approvals = self.get_available_approvals(as_user)
-        object_ids = list(approvals.values_list('object_id', flat=True))
+        object_ids = approvals.order_by().values_list(self._river_driver.typed_object_id_field_name or 'object_id', flat=True)
         return self.wokflow_object_class.objects.filter(pk__in=object_ids)
 
+    def iter_on_approval_objects(self, as_user, chunk_size=ON_APPROVAL_OBJECTS_CHUNK_SIZE):
+        """
+        Streams the workflow objects which have an approval waiting for the user, ``chunk_size`` of them are fetched at a
+        time. Server side cursors are used on the databases which support them.
+        """
+        return self.get_on_approval_objects(as_user).order_by('pk').iterator(chunk_size=chunk_size)
+
+    def iter_history(self, workflow_objects=None, statuses=HISTORY_STATUSES, chunk_size=HISTORY_CHUNK_SIZE):
+        """
+        Streams the histories of the given workflow objects, or of all of them, one after another. ``chunk_size`` objects
+        are handled at a time with a fixed number of queries.
+        """
+        object_ids = [workflow_object.pk for workflow_object in workflow_objects] if workflow_objects is not None else None
+        return iter_history(self.workflow, self.wokflow_object_class, object_ids, statuses=statuses, chunk_size=chunk_size)
+
     def get_available_approvals(self, as_user):
-        return self._river_driver.get_available_approvals(as_user)
+        river_driver = self._river_driver
+        return measured(river_driver.get_available_approvals(as_user), GET_AVAILABLE_APPROVALS, driver=river_driver.__class__.__name__)
+
+    def get_inbox(self, as_user, order_by=DATE_CREATED, cursor=None, page_size=INBOX_PAGE_SIZE, count=None):
+        """
+        A page of the approvals waiting for the user in a stable order. The page is fetched by keyset, so the deep pages
+        cost the same as the first one.
+
+        :param order_by: ``date_created``, ``priority``, ``object`` or ``pk``, optionally prefixed with ``-``. The ties are
+            broken by the primary keys of the approvals.
+        :param cursor: ``next_cursor`` of the previous page.
+        :param count: ``exact`` or ``estimate`` to have the total number of the approvals in the inbox counted. The
+            estimate comes from the query planner on PostgreSQL and it is the exact count on the other databases.
+        :return: An ``InboxPage``.
+        """
+        return Inbox(self, as_user, order_by).get_page(cursor=cursor, page_size=page_size, count=count)
+
+    @instrumented(APPROVE_MANY)
+    @atomic
+    def approve_many(self, as_user, workflow_objects, next_state=None):
+        """
+        Approves the next approval of each of the given workflow objects in a single transaction. The available
+        approvals of all the objects are resolved with one query and the approvals, the transitions and the states are
+        written in bulk. The objects that can not be approved by the user don't stop the others from being approved.
+        The BEFORE hooks are fired before anything is written and the AFTER hooks once everything is. The states are
+        written with ``bulk_update``, so neither ``pre_save`` nor ``post_save`` is fired for the workflow objects and
+        ``RIVER_FULL_OBJECT_SAVE`` is ignored.
+
+        :return: An ``ApprovalResult`` per workflow object in the given order. Either its ``approval`` or its ``error``
+            which is the ``RiverException`` that ``approve`` would raise for that object is set.
+        """
+        workflow_objects = list(workflow_objects)
+        object_ids = [str(workflow_object.pk) for workflow_object in workflow_objects]
+
+        available_approvals = defaultdict(list)
+        for approval in self.get_available_approvals(as_user).filter(
+                **self._object_ids_filter(set(object_ids))
+        ).select_related("transition__source_state", "transition__destination_state").order_by("pk"):
+            available_approvals[approval.object_id].append(approval)
+
+        results = []
+        approved = {}
+        for workflow_object, object_id in zip(workflow_objects, object_ids):
+            try:
+                if object_id in approved:
+                    approval = approved[object_id][1]
+                else:
+                    approval = self._pick_approval(available_approvals[object_id], next_state)
+                    approved[object_id] = (workflow_object, approval)
+                results.append(ApprovalResult(workflow_object, approval, None))
+            except RiverException as e:
+                results.append(ApprovalResult(workflow_object, None, e))
+
+        if approved:
+            self._approve_in_bulk(as_user, list(approved.values()), next_state)
+
+        return results
+
+    @staticmethod
+    def _pick_approval(available_approvals, next_state):
+        if not available_approvals:
+            raise RiverException(ErrorCode.NO_AVAILABLE_NEXT_STATE_FOR_USER, "There is no available approval for the user.")
+        elif next_state:
+            approvals_to_next_state = [approval for approval in available_approvals if approval.transition.destination_state_id == next_state.pk]
+            if not approvals_to_next_state:
+                available_states = sorted(set(approval.transition.destination_state for approval in available_approvals), key=lambda state: state.pk)
+                raise RiverException(ErrorCode.INVALID_NEXT_STATE_FOR_USER, "Invalid state is given(%s). Valid states is(are) %s" % (
+                    next_state.__str__(), ','.join([ast.__str__() for ast in available_states])))
+            return approvals_to_next_state[0]
+        elif len(available_approvals) > 1:
+            raise RiverException(ErrorCode.NEXT_STATE_IS_REQUIRED, "State must be given when there are multiple states for destination")
+        return available_approvals[0]
+
+    def _approve_in_bulk(self, as_user, approved, next_state):
+        object_ids = [str(workflow_object.pk) for workflow_object, _ in approved]
+
+        recent_approvals = {}
+        for recent_approval in TransitionApproval.objects.filter(
+                workflow=self.workflow,
+                content_type=self._content_type,
+                transaction_date__isnull=False,
+                **self._object_ids_filter(object_ids)
+        ).order_by("transaction_date"):
+            recent_approvals[recent_approval.object_id] = recent_approval
+
+        now = timezone.now()
+        for workflow_object, approval in approved:
+            approval.status = APPROVED
+            approval.transactioner = as_user
+            approval.transaction_date = now
+            approval.date_updated = now
+            approval.previous = recent_approvals.get(str(workflow_object.pk), None)
+
+        transitions_with_pending_approvals = set(TransitionApproval.objects.filter(
+            transition__in=[approval.transition for _, approval in approved],
+            status=PENDING
+        ).exclude(pk__in=[approval.pk for _, approval in approved]).values_list("transition_id", flat=True))
+        transited = [(workflow_object, approval) for workflow_object, approval in approved if approval.transition_id not in transitions_with_pending_approvals]
+
+        instance_workflows = {}
+        for workflow_object, approval in approved:
+            instance_workflows[approval.object_id] = getattr(workflow_object.river, self.field_name)
+        for workflow_object, approval in transited:
+            approval.transition.status = DONE
+            instance_workflows[approval.object_id].set_state(approval.transition.destination_state)
+
+        transited_object_ids = set(approval.object_id for _, approval in transited)
+        signals = [
+            instance_workflows[approval.object_id]._hook_dispatcher(approval, approval.object_id in transited_object_ids)
+            for workflow_object, approval in approved
+        ]
+        for signal in signals:
+            signal.__enter__()
+
+        bulk_update(
+            TransitionApproval, [approval for _, approval in approved], ["status", "transactioner", "transaction_date", "date_updated", "previous"]
+        )
+        if next_state:
+            for workflow_object, approval in approved:
+                instance_workflows[approval.object_id]._cancel_impossible_future(approval)
+
+        if transited:
+            Transition.objects.filter(pk__in=[approval.transition_id for _, approval in transited]).update(status=DONE, date_updated=now)
+            for workflow_object, approval in transited:
+                LOGGER.debug("Workflow object %s is proceeded for next transition. Transition: %s -> %s" % (
+                    workflow_object, approval.transition.source_state, approval.transition.destination_state))
+
+            for workflow_object, approval in self._get_cycled(transited):
+                instance_workflows[approval.object_id]._re_create_cycled_path(approval.transition)
+
+            bulk_update(self.wokflow_object_class, [workflow_object for workflow_object, _ in transited], [self.field_name])
+        refresh_actionable_approvals(self.workflow, self.wokflow_object_class, object_ids)
+        for signal in reversed(signals):
+            signal.__exit__(None, None, None)
+
+    def _get_cycled(self, transited):
+        transitions_by_source = defaultdict(set)
+        for object_id, source_state_id, status in Transition.objects.filter(
+                workflow=self.workflow,
+                content_type=self._content_type,
+                **self._object_ids_filter([approval.object_id for _, approval in transited])
+        ).values_list("object_id", "source_state_id", "status"):
+            transitions_by_source[(object_id, source_state_id)].add(status)
+
+        return [
+            (workflow_object, approval) for workflow_object, approval in transited
+            if DONE in transitions_by_source[(approval.object_id, approval.transition.destination_state_id)] and
+               PENDING not in transitions_by_source[(approval.object_id, approval.transition.destination_state_id)]
+        ]
+
+    @instrumented(BULK_INITIALIZE)
+    @atomic
+    def bulk_initialize(self, workflow_objects, batch_size=BULK_INITIALIZATION_BATCH_SIZE):
+        """
+        Initializes the approvals of many already saved workflow objects at once and sets the initial state of the ones
+        that don't have any state yet. It is the bulk counterpart of what is done on the creation of a single workflow
+        object and it costs a handful of queries per batch no matter how big the workflow is.
+        """
+        graph = self.workflow_graph
+        if not graph:
+            return
+
+        state_attname = self.wokflow_object_class._meta.get_field(self.field_name).attname
+        workflow_objects = list(workflow_objects)
+        for offset in range(0, len(workflow_objects), batch_size):
+            chunk = workflow_objects[offset:offset + batch_size]
+
+            without_state = [workflow_object for workflow_object in chunk if getattr(workflow_object, state_attname) is None]
+            for workflow_object in without_state:
+                setattr(workflow_object, self.field_name, graph.initial_state)
+            if without_state:
+                bulk_update(self.wokflow_object_class, without_state, [self.field_name])
+
+            initialized_object_ids = set(TransitionApproval.objects.filter(
+                workflow=self.workflow,
+                content_type=self._content_type,
+                **self._object_ids_filter([workflow_object.pk for workflow_object in chunk])
+            ).values_list("object_id", flat=True).distinct())
+
+            batch = TransitionBatch(self.workflow)
+            self._add_initial_path(batch, [workflow_object for workflow_object in chunk if str(workflow_object.pk) not in initialized_object_ids])
+            batch.save()
+            refresh_actionable_approvals(self.workflow, self.wokflow_object_class, [workflow_object.pk for workflow_object in chunk])
+
+        LOGGER.debug("Transition approvals are initialized for %s workflow objects of %s in bulk" % (len(workflow_objects), self.workflow))
+
+    def _add_initial_path(self, batch, workflow_objects):
+        graph = self.workflow_graph
+        for workflow_object in workflow_objects:
+            for transition_meta, iteration in graph.initial_path:
+                transition = Transition(
+                    workflow=self.workflow,
+                    workflow_object=workflow_object,
+                    source_state=transition_meta.source_state,
+                    destination_state=transition_meta.destination_state,
+                    meta=transition_meta,
+                    iteration=iteration
+                )
+                batch.add(transition, [
+                    (
+                        TransitionApproval(
+                            workflow=self.workflow,
+                            workflow_object=workflow_object,
+                            priority=transition_approval_meta.priority,
+                            meta=transition_approval_meta
+                        ),
+                        graph.get_permission_ids(transition_approval_meta),
+                        graph.get_group_ids(transition_approval_meta)
+                    )
+                    for transition_approval_meta in graph.get_approval_metas(transition_meta)
+                ])
+
+    def _object_ids_filter(self, object_ids):
+        return object_ids_filter(self.wokflow_object_class, object_ids)
+
+    @property
+    def workflow_graph(self):
+        return workflow_graph_cache.get(self._content_type, self.field_name)
 
     @property
     def initial_state(self):
-        workflow = Workflow.objects.filter(content_type=self._content_type, field_name=self.field_name).first()
-        return workflow.initial_state if workflow else None
+        graph = self.workflow_graph
+        return graph.initial_state if graph else None
 
     @property
     def final_states(self):
-        final_approvals = TransitionApprovalMeta.objects.filter(workflow=self.workflow, children__isnull=True)
-        return State.objects.filter(pk__in=final_approvals.values_list("transition_meta__destination_state", flat=True))
+        graph = self.workflow_graph
+        return State.objects.filter(pk__in=graph.final_state_ids) if graph else State.objects.none()
 
     @property
     def _content_type(self):
@@ -0,0 +1,63 @@
+from river.models import TransitionApproval, APPROVED, JUMPED, CANCELLED
+from river.utils.typedobjectid import typed_object_id_field_name, object_ids_filter
+
+HISTORY_STATUSES = [APPROVED, JUMPED, CANCELLED]
+HISTORY_CHUNK_SIZE = 500
+
+HISTORY_ORDERING = ["transition__iteration", "priority", "pk"]
+
+
+def with_history_relations(approvals):
+    """
+    Fetches everything that an audit trail row renders along with the approvals, so evaluating the queryset costs
+    three queries no matter how many approvals there are.
+    """
+    return approvals.select_related(
+        "transition__source_state",
+        "transition__destination_state",
+        "transactioner",
+        "meta",
+    ).prefetch_related("permissions", "groups")
+
+
+def get_history(workflow, model_class, object_id, statuses=HISTORY_STATUSES):
+    return with_history_relations(TransitionApproval.objects.filter(
+        workflow=workflow,
+        status__in=statuses,
+        **object_ids_filter(model_class, [object_id])
+    )).order_by(*HISTORY_ORDERING)
+
+
+def iter_history(workflow, model_class, object_ids=None, statuses=HISTORY_STATUSES, chunk_size=HISTORY_CHUNK_SIZE):
+    """
+    Streams the history of many workflow objects ordered by the object and then the same way as a single history.
+    ``chunk_size`` objects are handled at a time with a fixed number of queries per chunk. The objects are picked
+    by keyset from the approvals themselves unless ``object_ids`` are given.
+    """
+    if workflow is None:
+        return
+
+    approvals = TransitionApproval.objects.filter(workflow=workflow, status__in=statuses)
+    object_id_field_name = typed_object_id_field_name(model_class) or "object_id"
+    for chunk in _iter_object_id_chunks(approvals, object_id_field_name, object_ids, chunk_size):
+        for approval in with_history_relations(approvals.filter(**{"%s__in" % object_id_field_name: chunk})).order_by(object_id_field_name, *HISTORY_ORDERING):
+            yield approval
+
+
+def _iter_object_id_chunks(approvals, object_id_field_name, object_ids, chunk_size):
+    if object_ids is not None:
+        field = TransitionApproval._meta.get_field(object_id_field_name)
+        object_ids = list(object_ids)
+        for offset in range(0, len(object_ids), chunk_size):
+            yield [field.to_python(object_id) for object_id in object_ids[offset:offset + chunk_size]]
+        return
+
+    last_object_id = None
+    while True:
+        chunk_approvals = approvals if last_object_id is None else approvals.filter(**{"%s__gt" % object_id_field_name: last_object_id})
+        chunk = list(chunk_approvals.order_by(object_id_field_name).values_list(object_id_field_name, flat=True).distinct()[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_object_id = chunk[-1]
+
@@ -0,0 +1,135 @@
+import csv
+import datetime
+import json
+import logging
+import uuid
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+
+from river.models import Transition, TransitionApproval
+
+LOGGER = logging.getLogger(__name__)
+
+APPROVALS = "approvals"
+TRANSITIONS = "transitions"
+TABLES = [APPROVALS, TRANSITIONS]
+
+CSV = "csv"
+JSON_LINES = "jsonl"
+FORMATS = [CSV, JSON_LINES]
+
+DATE_CREATED = "date_created"
+DATE_UPDATED = "date_updated"
+TRANSACTION_DATE = "transaction_date"
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _approval_columns():
+    return [
+        ("id", "pk"),
+        ("workflow", "workflow_id"),
+        ("app_label", "content_type__app_label"),
+        ("model", "content_type__model"),
+        ("object_id", "object_id"),
+        ("transition", "transition_id"),
+        ("iteration", "transition__iteration"),
+        ("source_state", "transition__source_state__slug"),
+        ("destination_state", "transition__destination_state__slug"),
+        ("status", "status"),
+        ("priority", "priority"),
+        ("transactioner", "transactioner__%s" % get_user_model().USERNAME_FIELD),
+        ("transaction_date", "transaction_date"),
+        ("date_created", "date_created"),
+        ("date_updated", "date_updated"),
+    ]
+
+
+def _transition_columns():
+    return [
+        ("id", "pk"),
+        ("workflow", "workflow_id"),
+        ("app_label", "content_type__app_label"),
+        ("model", "content_type__model"),
+        ("object_id", "object_id"),
+        ("iteration", "iteration"),
+        ("source_state", "source_state__slug"),
+        ("destination_state", "destination_state__slug"),
+        ("status", "status"),
+        ("date_created", "date_created"),
+        ("date_updated", "date_updated"),
+    ]
+
+
+TABLE_DEFINITIONS = {
+    APPROVALS: (TransitionApproval, _approval_columns, [DATE_CREATED, DATE_UPDATED, TRANSACTION_DATE]),
+    TRANSITIONS: (Transition, _transition_columns, [DATE_CREATED, DATE_UPDATED]),
+}
+
+
+def iter_history_rows(table=APPROVALS, workflow=None, content_type=None, since=None, until=None, date_field=DATE_UPDATED, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Streams the rows of a history table as tuples in the order of the column names that are yielded first. The rows
+    are read with a server side cursor on the databases which support it, ``chunk_size`` of them at a time, and no
+    model instance is ever built. ``since`` is inclusive and ``until`` is exclusive, both are compared with
+    ``date_field``.
+    """
+    if table not in TABLE_DEFINITIONS:
+        raise ValueError("Table should be one of %s" % ", ".join(TABLES))
+    model, get_columns, date_fields = TABLE_DEFINITIONS[table]
+    if date_field not in date_fields:
+        raise ValueError("Date field of %s should be one of %s" % (table, ", ".join(date_fields)))
+
+    columns = get_columns()
+    rows = model.objects.all()
+    if workflow is not None:
+        rows = rows.filter(workflow=workflow)
+    if content_type is not None:
+        rows = rows.filter(content_type=content_type)
+    if since is not None:
+        rows = rows.filter(**{"%s__gte" % date_field: since})
+    if until is not None:
+        rows = rows.filter(**{"%s__lt" % date_field: until})
+
+    yield tuple(name for name, _ in columns)
+    for row in rows.order_by("pk").values_list(*[lookup for _, lookup in columns]).iterator(chunk_size=chunk_size):
+        yield row
+
+
+def export_history(output, table=APPROVALS, format=CSV, **filters):
+    """
+    Writes a history table to the given text stream as CSV or JSON Lines with bounded memory and returns the number
+    of the rows written. The filters are the ones of ``iter_history_rows``.
+    """
+    if format not in FORMATS:
+        raise ValueError("Format should be one of %s" % ", ".join(FORMATS))
+
+    rows = iter_history_rows(table, **filters)
+    header = next(rows)
+    count = 0
+    if format == CSV:
+        writer = csv.writer(output)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow([_to_text(value) for value in row])
+            count += 1
+    else:
+        for row in rows:
+            output.write(json.dumps(OrderedDict(zip(header, [_to_json(value) for value in row]))) + "\n")
+            count += 1
+
+    LOGGER.debug("%s rows of the %s history are exported." % (count, table))
+    return count
+
+
+def _to_json(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    elif isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _to_text(value):
+    return "" if value is None else _to_json(value)
@@ -0,0 +1,115 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+import time
+
+from django.db import transaction, connections
+
+from river.config import app_config
+from river.core.instrumentation import instrumented, EXECUTE_HOOK
+from river.models.hook import AFTER
+
+LOGGER = logging.getLogger(__name__)
+
+SYNC = "sync"
+ASYNC = "async"
+
+THREAD = "thread"
+PROCESS = "process"
+
+
+@instrumented(EXECUTE_HOOK)
+def run_hook(hook, context, retries=0, retry_delay=0):
+    """
+    Runs the callback function of the hook and retries it with an exponential back off when it fails. Returns whether
+    it has eventually succeeded.
+    """
+    for attempt in range(retries + 1):
+        try:
+            hook.callback_function.get()(context)
+            return True
+        except Exception as e:
+            if attempt < retries:
+                LOGGER.warning("Hook %s has failed with %r, it is going to be retried (%s/%s)" % (hook, e, attempt + 1, retries))
+                time.sleep(retry_delay * (2 ** attempt))
+            else:
+                LOGGER.exception(e)
+    return False
+
+
+def _run_hook_in_worker(hook, context, retries, retry_delay):
+    try:
+        return run_hook(hook, context, retries, retry_delay)
+    finally:
+        connections.close_all()
+
+
+def _initialize_worker_process():
+    import django
+
+    django.setup()
+
+
+class HookExecutor(object):
+    """
+    Runs the hooks. BEFORE hooks are always run synchronously. When ``RIVER_HOOK_EXECUTION`` is ``async``, AFTER hooks
+    are handed over to a thread or a process pool once the transaction is committed. At most ``RIVER_HOOK_QUEUE_SIZE``
+    hooks can wait or run in the pool at a time, the ones beyond that are run by the committing thread itself which
+    slows the producers down instead of piling the hooks up in memory.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def execute(self, hook, context):
+        if hook.hook_type == AFTER and app_config.HOOK_EXECUTION == ASYNC:
+            transaction.on_commit(lambda: self.submit(hook, context))
+        else:
+            hook.execute(context)
+
+    def submit(self, hook, context):
+        executor, slots = self._get_executor()
+        if not slots.acquire(False):
+            LOGGER.warning("Hook queue is full, hook %s is run by the committing thread." % hook)
+            run_hook(hook, context, app_config.HOOK_RETRIES, app_config.HOOK_RETRY_DELAY)
+            return None
+
+        try:
+            future = executor.submit(_run_hook_in_worker, hook, context, app_config.HOOK_RETRIES, app_config.HOOK_RETRY_DELAY)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor, self._slots = self._executor, None, None
+        if executor:
+            executor.shutdown(wait=wait)
+
+    def _get_executor(self):
+        with self._lock:
+            if not self._executor:
+                from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+                if app_config.HOOK_EXECUTOR == PROCESS:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=app_config.HOOK_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_initialize_worker_process
+                    )
+                elif app_config.HOOK_EXECUTOR == THREAD:
+                    self._executor = ThreadPoolExecutor(max_workers=app_config.HOOK_WORKERS)
+                else:
+                    raise ValueError("Unknown hook executor %s. It should be either %s or %s" % (app_config.HOOK_EXECUTOR, THREAD, PROCESS))
+                self._slots = threading.BoundedSemaphore(app_config.HOOK_QUEUE_SIZE)
+            return self._executor, self._slots
+
+
+hook_executor = HookExecutor()
+
+atexit.register(hook_executor.shutdown)
@@ -0,0 +1,90 @@
+import logging
+import threading
+from collections import defaultdict
+
+from django.db.models.signals import post_save, post_delete
+
+from river.core.caches import PendingChanges
+from river.models import Function, OnApprovedHook, OnTransitHook, OnCompleteHook
+
+LOGGER = logging.getLogger(__name__)
+
+HOOK_META_ATTNAMES = {
+    OnApprovedHook: "transition_approval_meta_id",
+    OnTransitHook: "transition_meta_id",
+    OnCompleteHook: None,
+}
+
+
+class HookRegistry(object):
+    """
+    Process local index of the workflow level hooks, the ones that are not registered for a specific workflow object,
+    keyed by workflow, hook class, approval or transition meta and BEFORE/AFTER. It also knows which workflows have
+    hooks for some of their objects, per content type, so that the objects of the others cost no query at all. It
+    does not keep the objects themselves in memory. Any change on the hooks or on the functions invalidates the whole
+    registry both right away and once the transaction is committed or rolled back. The index that is built before that
+    is only seen by the thread which has made the change.
+    """
+
+    def __init__(self):
+        self._hooks = None
+        self._workflows_with_object_hooks = None
+        self._lock = threading.RLock()
+        self._pending_changes = PendingChanges(self.invalidate)
+        self.version = 0
+
+    def get_hooks(self, workflow, hook_class, meta_id, hook_type):
+        return self._get_index()[0].get((workflow.pk, hook_class, meta_id, hook_type), [])
+
+    def may_have_object_hooks(self, workflow, content_type):
+        return (workflow.pk, content_type.pk) in self._get_index()[1]
+
+    def invalidate(self):
+        with self._lock:
+            self._hooks = None
+            self._workflows_with_object_hooks = None
+            self.version += 1
+        self._pending_changes.clear()
+        LOGGER.debug("Hook registry is invalidated.")
+
+    def on_hooks_changed(self, *args, **kwargs):
+        self.invalidate()
+        self._pending_changes.add()
+
+    def _get_index(self):
+        pending_index = self._pending_changes.get_values()
+        if pending_index is not None:
+            if "index" not in pending_index:
+                pending_index["index"] = self._build_index()
+            return pending_index["index"]
+
+        hooks, workflows_with_object_hooks = self._hooks, self._workflows_with_object_hooks
+        if hooks is not None and workflows_with_object_hooks is not None:
+            return hooks, workflows_with_object_hooks
+
+        with self._lock:
+            version = self.version
+            hooks, workflows_with_object_hooks = self._build_index()
+            if version == self.version:
+                self._hooks, self._workflows_with_object_hooks = hooks, workflows_with_object_hooks
+            return hooks, workflows_with_object_hooks
+
+    @staticmethod
+    def _build_index():
+        hooks = defaultdict(list)
+        workflows_with_object_hooks = set()
+        for hook_class, meta_attname in HOOK_META_ATTNAMES.items():
+            for hook in hook_class.objects.filter(object_id__isnull=True).select_related("callback_function").order_by("pk"):
+                meta_id = getattr(hook, meta_attname) if meta_attname else None
+                hooks[(hook.workflow_id, hook_class, meta_id, hook.hook_type)].append(hook)
+            workflows_with_object_hooks.update(
+                hook_class.objects.filter(object_id__isnull=False).values_list("workflow_id", "content_type_id").distinct()
+            )
+        return dict(hooks), workflows_with_object_hooks
+
+
+hook_registry = HookRegistry()
+
+for _model in [Function, OnApprovedHook, OnTransitHook, OnCompleteHook]:
+    post_save.connect(hook_registry.on_hooks_changed, sender=_model, dispatch_uid="river_hook_registry_post_save_%s" % _model.__name__)
+    post_delete.connect(hook_registry.on_hooks_changed, sender=_model, dispatch_uid="river_hook_registry_post_delete_%s" % _model.__name__)
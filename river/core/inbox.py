@@ -0,0 +1,143 @@
+import base64
+import binascii
+import datetime
+import json
+import uuid
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+
+from river.models import TransitionApproval
+from river.utils.error_code import ErrorCode
+from river.utils.exceptions import RiverException
+
+DATE_CREATED = "date_created"
+PRIORITY = "priority"
+OBJECT = "object"
+PK = "pk"
+
+ORDERING_KEYS = [DATE_CREATED, PRIORITY, OBJECT, PK]
+
+EXACT = "exact"
+ESTIMATE = "estimate"
+
+INBOX_PAGE_SIZE = 50
+
+
+class InboxPage(object):
+    """
+    A page of the approvals waiting for a user. ``next_cursor`` is ``None`` on the last page and ``count`` is only set
+    when it is asked for.
+    """
+
+    def __init__(self, model_class, approvals, next_cursor, count=None):
+        self.model_class = model_class
+        self.approvals = approvals
+        self.next_cursor = next_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.approvals)
+
+    def __len__(self):
+        return len(self.approvals)
+
+    @property
+    def workflow_objects(self):
+        """
+        The workflow objects of the approvals on the page in the same order, fetched with a single query. An object with
+        more than one approval on the page is listed once.
+        """
+        to_python = self.model_class._meta.pk.to_python
+        object_ids = list(OrderedDict((to_python(approval.object_id), None) for approval in self.approvals))
+        workflow_objects = self.model_class.objects.in_bulk(object_ids)
+        return [workflow_objects[object_id] for object_id in object_ids if object_id in workflow_objects]
+
+
+class Inbox(object):
+    """
+    The approvals waiting for a user in a stable order which are paginated by keyset. The cursor of a page holds the
+    ordering key of its last approval, so fetching any page costs the same as fetching the first one.
+    """
+
+    def __init__(self, class_workflow, as_user, order_by=DATE_CREATED):
+        key = order_by.lstrip("-")
+        if key not in ORDERING_KEYS:
+            raise ValueError("Inbox can not be ordered by %s. It should be one of %s, optionally prefixed with -" % (order_by, ", ".join(ORDERING_KEYS)))
+
+        self.class_workflow = class_workflow
+        self.as_user = as_user
+        self.order_by = order_by
+        self.descending = order_by.startswith("-")
+        if key == OBJECT:
+            self.field_name = class_workflow._river_driver.typed_object_id_field_name or "object_id"
+        else:
+            self.field_name = key
+
+    def get_page(self, cursor=None, page_size=INBOX_PAGE_SIZE, count=None):
+        approvals = self.class_workflow.get_available_approvals(self.as_user)
+        page_approvals = approvals
+        if cursor:
+            page_approvals = page_approvals.filter(self._after(*self._decode(cursor)))
+
+        page_approvals = list(page_approvals.order_by(*self._ordering())[:page_size + 1])
+        next_cursor = self._encode(page_approvals[page_size - 1]) if len(page_approvals) > page_size else None
+
+        if count == EXACT:
+            count = approvals.count()
+        elif count == ESTIMATE:
+            count = _estimate_count(approvals)
+        elif count is not None:
+            raise ValueError("Count should either be %s or %s" % (EXACT, ESTIMATE))
+
+        return InboxPage(self.class_workflow.wokflow_object_class, page_approvals[:page_size], next_cursor, count)
+
+    def _ordering(self):
+        direction = "-" if self.descending else ""
+        if self.field_name == PK:
+            return [direction + PK]
+        return [direction + self.field_name, direction + PK]
+
+    def _after(self, value, pk):
+        lookup = "lt" if self.descending else "gt"
+        if self.field_name == PK:
+            return Q(**{"pk__%s" % lookup: pk})
+        return Q(**{"%s__%s" % (self.field_name, lookup): value}) | Q(**{self.field_name: value, "pk__%s" % lookup: pk})
+
+    def _encode(self, approval):
+        value = getattr(approval, self.field_name)
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            value = value.isoformat()
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        return base64.urlsafe_b64encode(json.dumps([self.order_by, value, approval.pk]).encode("utf-8")).decode("ascii")
+
+    def _decode(self, cursor):
+        try:
+            order_by, value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+            if order_by != self.order_by:
+                raise ValueError("The cursor is of an inbox ordered by %s" % order_by)
+            field = TransitionApproval._meta.pk if self.field_name == PK else TransitionApproval._meta.get_field(self.field_name)
+            return field.to_python(value), TransitionApproval._meta.pk.to_python(pk)
+        except (ValueError, TypeError, UnicodeError, binascii.Error, ValidationError) as e:
+            raise RiverException(ErrorCode.INVALID_INBOX_CURSOR, "Invalid inbox cursor. %s" % e)
+
+
+def _estimate_count(queryset):
+    """
+    The number of the rows that the query planner expects the queryset to return on PostgreSQL. It is the exact count
+    on the other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if not isinstance(plan, list):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -1,17 +1,21 @@
 import logging
+from collections import defaultdict
 
-import six
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
-from django.db.models import Q, Max
 from django.db.transaction import atomic
 from django.utils import timezone
 
 from river.config import app_config
-from river.models import TransitionApproval, PENDING, State, APPROVED, Workflow, CANCELLED, Transition, DONE, JUMPED
-from river.signals import ApproveSignal, TransitionSignal, OnCompleteSignal
+from river.core.actionableapprovals import refresh_actionable_approvals
+from river.core.history import get_history, HISTORY_STATUSES
+from river.core.instrumentation import instrumented, APPROVE, INITIALIZE_APPROVALS, CANCEL_IMPOSSIBLE_FUTURE, RE_CREATE_CYCLED_PATH
+from river.core.transitionbatch import TransitionBatch, get_approval_relations
+from river.models import TransitionApproval, PENDING, State, APPROVED, CANCELLED, Transition, DONE, JUMPED
+from river.signals import HookDispatcher
 from river.utils.error_code import ErrorCode
 from river.utils.exceptions import RiverException
+from river.utils.typedobjectid import object_id_filter
 
 LOGGER = logging.getLogger(__name__)
 
@@ -23,56 +27,34 @@ class InstanceWorkflowObject(object):
         self.workflow_object = workflow_object
         self.content_type = app_config.CONTENT_TYPE_CLASS.objects.get_for_model(self.workflow_object)
         self.field_name = field_name
-        self.workflow = Workflow.objects.filter(content_type=self.content_type, field_name=self.field_name).first()
+        self.workflow = self.class_workflow.workflow
         self.initialized = False
 
+    @instrumented(INITIALIZE_APPROVALS)
     @transaction.atomic
     def initialize_approvals(self):
         if not self.initialized:
             if self.workflow and self.workflow.transition_approvals.filter(workflow_object=self.workflow_object).count() == 0:
-                transition_meta_list = self.workflow.transition_metas.filter(source_state=self.workflow.initial_state)
-                iteration = 0
-                processed_transitions = []
-                while transition_meta_list:
-                    for transition_meta in transition_meta_list:
-                        transition = Transition.objects.create(
-                            workflow=self.workflow,
-                            workflow_object=self.workflow_object,
-                            source_state=transition_meta.source_state,
-                            destination_state=transition_meta.destination_state,
-                            meta=transition_meta,
-                            iteration=iteration
-                        )
-                        for transition_approval_meta in transition_meta.transition_approval_meta.all():
-                            transition_approval = TransitionApproval.objects.create(
-                                workflow=self.workflow,
-                                workflow_object=self.workflow_object,
-                                transition=transition,
-                                priority=transition_approval_meta.priority,
-                                meta=transition_approval_meta
-                            )
-                            transition_approval.permissions.add(*transition_approval_meta.permissions.all())
-                            transition_approval.groups.add(*transition_approval_meta.groups.all())
-                        processed_transitions.append(transition_meta.pk)
-                    transition_meta_list = self.workflow.transition_metas.filter(
-                        source_state__in=transition_meta_list.values_list("destination_state", flat=True)
-                    ).exclude(pk__in=processed_transitions)
-
-                    iteration += 1
+                batch = TransitionBatch(self.workflow)
+                self.class_workflow._add_initial_path(batch, [self.workflow_object])
+                batch.save()
+                self._refresh_actionable_approvals()
                 self.initialized = True
                 LOGGER.debug("Transition approvals are initialized for the workflow object %s" % self.workflow_object)
 
     @property
     def on_initial_state(self):
-        return self.get_state() == self.class_workflow.initial_state
+        graph = self.class_workflow.workflow_graph
+        return graph.is_initial_state(self._get_state_id()) if graph else self._get_state_id() is None
 
     @property
     def on_final_state(self):
-        return self.class_workflow.final_states.filter(pk=self.get_state().pk).count() > 0
+        graph = self.class_workflow.workflow_graph
+        return graph.is_final_state(self._get_state_id()) if graph else False
 
     @property
     def next_approvals(self):
-        transitions = Transition.objects.filter(workflow=self.workflow, object_id=self.workflow_object.pk, source_state=self.get_state())
+        transitions = Transition.objects.filter(workflow=self.workflow, source_state=self.get_state(), **self._object_id_filter)
         return TransitionApproval.objects.filter(transition__in=transitions)
 
     @property
@@ -82,6 +64,14 @@ class InstanceWorkflowObject(object):
         except TransitionApproval.DoesNotExist:
             return None
 
+    def history(self, statuses=HISTORY_STATUSES):
+        """
+        The approvals of the workflow object that are no longer pending, in the order they have happened. The
+        transitions with their states, the transactioners, the metas, the permissions and the groups are fetched along
+        with them, so evaluating it costs three queries no matter how long the history is.
+        """
+        return get_history(self.workflow, self.workflow_object.__class__, self.workflow_object.pk, statuses=statuses)
+
     @transaction.atomic
     def jump_to(self, state):
         def _transitions_before(iteration):
@@ -99,7 +89,7 @@ class InstanceWorkflowObject(object):
                 approval.save()
             jumped_transitions.update(status=JUMPED)
             self.set_state(state)
-            self.workflow_object.save()
+            self.save_state()
 
         except Transition.DoesNotExist:
             raise RiverException(ErrorCode.STATE_IS_NOT_AVAILABLE_TO_BE_JUMPED, "This state is not available to be jumped in the future of this object")
@@ -109,12 +99,13 @@ class InstanceWorkflowObject(object):
         return State.objects.filter(pk__in=all_destination_state_ids)
 
     def get_available_approvals(self, as_user=None, destination_state=None):
-        qs = self.class_workflow.get_available_approvals(as_user, ).filter(object_id=self.workflow_object.pk)
+        qs = self.class_workflow.get_available_approvals(as_user, ).filter(**self._object_id_filter)
         if destination_state:
             qs = qs.filter(transition__destination_state=destination_state)
 
         return qs
 
+    @instrumented(APPROVE)
     @atomic
     def approve(self, as_user, next_state=None):
         available_approvals = self.get_available_approvals(as_user=as_user)
@@ -130,7 +121,7 @@ class InstanceWorkflowObject(object):
         elif number_of_available_approvals > 1 and not next_state:
             raise RiverException(ErrorCode.NEXT_STATE_IS_REQUIRED, "State must be given when there are multiple states for destination")
 
-        approval = available_approvals.first()
+        approval = available_approvals.select_related("transition__source_state", "transition__destination_state").first()
         approval.status = APPROVED
         approval.transactioner = as_user
         approval.transaction_date = timezone.now()
@@ -138,7 +129,7 @@ class InstanceWorkflowObject(object):
         approval.save()
 
         if next_state:
-            self.cancel_impossible_future(approval)
+            self._cancel_impossible_future(approval)
 
         has_transit = False
         if approval.peers.filter(status=PENDING).count() == 0:
@@ -152,46 +143,57 @@ class InstanceWorkflowObject(object):
             LOGGER.debug("Workflow object %s is proceeded for next transition. Transition: %s -> %s" % (
                 self.workflow_object, previous_state, self.get_state()))
 
-        with self._approve_signal(approval), self._transition_signal(has_transit, approval), self._on_complete_signal():
-            self.workflow_object.save()
+        with self._hook_dispatcher(approval, has_transit):
+            self.save_state()
 
     @atomic
     def cancel_impossible_future(self, approved_approval):
+        self._cancel_impossible_future(approved_approval)
+        self._refresh_actionable_approvals()
+
+    @instrumented(CANCEL_IMPOSSIBLE_FUTURE)
+    def _cancel_impossible_future(self, approved_approval):
+        """
+        Cancels the pending transitions of the object, and their approvals, which can no longer be reached once the
+        given approval is approved. The pending transitions are fetched once and walked in memory by their state ids
+        so it costs the same number of queries no matter how deep or wide the workflow is.
+        """
         transition = approved_approval.transition
 
-        possible_transition_ids = {transition.pk}
-
-        possible_next_states = {transition.destination_state.label}
-        while possible_next_states:
-            possible_transitions = Transition.objects.filter(
-                workflow=self.workflow,
-                object_id=self.workflow_object.pk,
-                status=PENDING,
-                source_state__label__in=possible_next_states
-            ).exclude(pk__in=possible_transition_ids)
-
-            possible_transition_ids.update(set(possible_transitions.values_list("pk", flat=True)))
-
-            possible_next_states = set(possible_transitions.values_list("destination_state__label", flat=True))
-
-        cancelled_transitions = Transition.objects.filter(
+        pending_transitions = list(Transition.objects.filter(
             workflow=self.workflow,
-            object_id=self.workflow_object.pk,
             status=PENDING,
-            iteration__gte=transition.iteration
-        ).exclude(pk__in=possible_transition_ids)
-
-        TransitionApproval.objects.filter(transition__in=cancelled_transitions).update(status=CANCELLED)
-        cancelled_transitions.update(status=CANCELLED)
+            **self._object_id_filter
+        ).values_list("pk", "source_state_id", "destination_state_id", "iteration"))
 
-    def _approve_signal(self, approval):
-        return ApproveSignal(self.workflow_object, self.field_name, approval)
+        pending_transitions_by_source = defaultdict(list)
+        for pk, source_state_id, destination_state_id, _ in pending_transitions:
+            pending_transitions_by_source[source_state_id].append((pk, destination_state_id))
 
-    def _transition_signal(self, has_transit, approval):
-        return TransitionSignal(has_transit, self.workflow_object, self.field_name, approval)
+        possible_transition_ids = {transition.pk}
+        visited_state_ids = {transition.destination_state_id}
+        possible_next_state_ids = [transition.destination_state_id]
+        while possible_next_state_ids:
+            for pk, destination_state_id in pending_transitions_by_source[possible_next_state_ids.pop()]:
+                possible_transition_ids.add(pk)
+                if destination_state_id not in visited_state_ids:
+                    visited_state_ids.add(destination_state_id)
+                    possible_next_state_ids.append(destination_state_id)
+
+        cancelled_transition_ids = [
+            pk for pk, _, _, iteration in pending_transitions
+            if iteration >= transition.iteration and pk not in possible_transition_ids
+        ]
+        if cancelled_transition_ids:
+            TransitionApproval.objects.filter(transition_id__in=cancelled_transition_ids).update(status=CANCELLED)
+            Transition.objects.filter(pk__in=cancelled_transition_ids).update(status=CANCELLED)
+
+    def _hook_dispatcher(self, approval, has_transit):
+        return HookDispatcher(self.workflow, self.workflow_object, self._content_type, approval, has_transit, self.on_final_state)
 
-    def _on_complete_signal(self):
-        return OnCompleteSignal(self.workflow_object, self.field_name)
+    @property
+    def _object_id_filter(self):
+        return object_id_filter(self.workflow_object.__class__, self.workflow_object.pk)
 
     @property
     def _content_type(self):
@@ -209,56 +211,93 @@ class InstanceWorkflowObject(object):
 
         return qs.filter(status=DONE).count() > 0 and qs.filter(status=PENDING).count() == 0
 
-    def _get_transition_images(self, source_states):
-        meta_max_iteration = Transition.objects.filter(
-            workflow=self.workflow,
-            workflow_object=self.workflow_object,
-            source_state__pk__in=source_states,
-        ).values_list("meta").annotate(max_iteration=Max("iteration"))
-
-        return Transition.objects.filter(
-            Q(workflow=self.workflow, object_id=self.workflow_object.pk) &
-            six.moves.reduce(lambda agg, q: q | agg, [Q(meta__id=meta_id, iteration=max_iteration) for meta_id, max_iteration in meta_max_iteration], Q(pk=-1))
-        )
+    def _get_transition_images(self):
+        """
+        The most recent iteration of each transition of the object, keyed by its meta.
+        """
+        images = {}
+        for transition in Transition.objects.filter(workflow=self.workflow, **self._object_id_filter).order_by("iteration", "pk"):
+            images[transition.meta_id] = transition
+        return images.values()
 
+    @instrumented(RE_CREATE_CYCLED_PATH)
     def _re_create_cycled_path(self, done_transition):
-        old_transitions = self._get_transition_images([done_transition.destination_state.pk])
-
-        iteration = done_transition.iteration + 1
+        """
+        Re-creates the transitions, and their approvals, that the object is going to go through again as their next
+        iterations once it has cycled. The whole image of the cycle is computed from a single fetch and written with a
+        fixed number of bulk inserts no matter how big the cycle is.
+        """
+        images_by_source = defaultdict(list)
+        for image in self._get_transition_images():
+            images_by_source[image.source_state_id].append(image)
+
+        cycled_images = []
         regenerated_transitions = set()
-        while old_transitions:
-            for old_transition in old_transitions:
-                cycled_transition = Transition.objects.create(
-                    source_state=old_transition.source_state,
-                    destination_state=old_transition.destination_state,
-                    workflow=old_transition.workflow,
-                    object_id=old_transition.workflow_object.pk,
-                    content_type=old_transition.content_type,
+        source_state_ids = {done_transition.destination_state_id}
+        iteration = done_transition.iteration + 1
+        while source_state_ids:
+            images = [
+                image for source_state_id in source_state_ids for image in images_by_source[source_state_id]
+                if (image.source_state_id, image.destination_state_id) not in regenerated_transitions
+            ]
+            regenerated_transitions.update((image.source_state_id, image.destination_state_id) for image in images)
+            cycled_images.extend((image, iteration) for image in images)
+            source_state_ids = set(image.destination_state_id for image in images)
+            iteration += 1
+
+        old_approvals = defaultdict(list)
+        for old_approval in TransitionApproval.objects.filter(transition__in=[image for image, _ in cycled_images]).order_by("pk"):
+            old_approvals[old_approval.transition_id].append(old_approval)
+        old_approval_ids = [old_approval.pk for approvals in old_approvals.values() for old_approval in approvals]
+        permission_ids = get_approval_relations("permissions", old_approval_ids)
+        group_ids = get_approval_relations("groups", old_approval_ids)
+
+        batch = TransitionBatch(self.workflow)
+        for image, image_iteration in cycled_images:
+            batch.add(
+                Transition(
+                    source_state_id=image.source_state_id,
+                    destination_state_id=image.destination_state_id,
+                    workflow_id=image.workflow_id,
+                    object_id=image.object_id,
+                    content_type_id=image.content_type_id,
                     status=PENDING,
-                    iteration=iteration,
-                    meta=old_transition.meta
-                )
-
-                for old_approval in old_transition.transition_approvals.all():
-                    cycled_approval = TransitionApproval.objects.create(
-                        transition=cycled_transition,
-                        workflow=old_approval.workflow,
-                        object_id=old_approval.workflow_object.pk,
-                        content_type=old_approval.content_type,
-                        priority=old_approval.priority,
-                        status=PENDING,
-                        meta=old_approval.meta
+                    iteration=image_iteration,
+                    meta_id=image.meta_id
+                ),
+                [
+                    (
+                        TransitionApproval(
+                            workflow_id=old_approval.workflow_id,
+                            object_id=old_approval.object_id,
+                            content_type_id=old_approval.content_type_id,
+                            priority=old_approval.priority,
+                            status=PENDING,
+                            meta_id=old_approval.meta_id
+                        ),
+                        permission_ids[old_approval.pk],
+                        group_ids[old_approval.pk]
                     )
-                    cycled_approval.permissions.set(old_approval.permissions.all())
-                    cycled_approval.groups.set(old_approval.groups.all())
+                    for old_approval in old_approvals[image.pk]
+                ]
+            )
+        batch.save()
 
-            regenerated_transitions.add((old_transition.source_state, old_transition.destination_state))
+    def save_state(self):
+        """
+        Persists the state of the object. Only the state column is written unless ``RIVER_FULL_OBJECT_SAVE`` is set.
+        """
+        if app_config.FULL_OBJECT_SAVE:
+            self.workflow_object.save()
+        else:
+            self.workflow_object.save(update_fields=[self.field_name])
+        self._refresh_actionable_approvals()
 
-            old_transitions = self._get_transition_images(old_transitions.values_list("destination_state__pk", flat=True)).exclude(
-                six.moves.reduce(lambda agg, q: q | agg, [Q(source_state=source_state, destination_state=destination_state) for source_state, destination_state in regenerated_transitions], Q(pk=-1))
-            )
+    def _refresh_actionable_approvals(self):
+        refresh_actionable_approvals(self.workflow, self.workflow_object.__class__, [self.workflow_object.pk])
 
-            iteration += 1
+    def _get_state_id(self):
+        return getattr(self.workflow_object, self.workflow_object._meta.get_field(self.field_name).attname)
 
     def get_state(self):
         return getattr(self.workflow_object, self.field_name)
@@ -0,0 +1,219 @@
+import logging
+import threading
+from functools import wraps
+from timeit import default_timer
+
+from django.db import connection
+from django.utils.module_loading import import_string
+
+LOGGER = logging.getLogger(__name__)
+
+APPROVE = "approve"
+APPROVE_MANY = "approve_many"
+INITIALIZE_APPROVALS = "initialize_approvals"
+BULK_INITIALIZE = "bulk_initialize"
+CANCEL_IMPOSSIBLE_FUTURE = "cancel_impossible_future"
+RE_CREATE_CYCLED_PATH = "re_create_cycled_path"
+GET_AVAILABLE_APPROVALS = "get_available_approvals"
+EXECUTE_HOOK = "execute_hook"
+
+
+class InstrumentationListener(object):
+    """
+    Base class of the instrumentation listeners. ``on_start`` is called before an operation is run and ``on_stop``
+    after it is done, even when it has failed.
+    """
+
+    def on_start(self, event):
+        pass
+
+    def on_stop(self, event):
+        pass
+
+
+class InstrumentationEvent(object):
+    """
+    An operation of river which is being measured. ``duration`` is in seconds and ``queries`` is the number of the
+    database queries that are issued while the operation was run, including the ones of the nested operations. Both of
+    them are set once the operation is done. ``error`` is the exception that the operation has raised if any.
+    """
+
+    __slots__ = ("operation", "tags", "duration", "queries", "error")
+
+    def __init__(self, operation, tags):
+        self.operation = operation
+        self.tags = tags
+        self.duration = None
+        self.queries = 0
+        self.error = None
+
+    def __repr__(self):
+        return "<InstrumentationEvent %s %s duration=%s queries=%s>" % (self.operation, self.tags, self.duration, self.queries)
+
+
+class _Measurement(object):
+
+    def __init__(self, listeners, operation, tags):
+        self.listeners = listeners
+        self.event = InstrumentationEvent(operation, tags)
+        self._started = None
+        self._query_counter = None
+
+    def __enter__(self):
+        self._notify("on_start")
+        self._query_counter = connection.execute_wrapper(self._count_query)
+        self._query_counter.__enter__()
+        self._started = default_timer()
+        return self.event
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.event.duration = default_timer() - self._started
+        self._query_counter.__exit__(exc_type, exc_val, exc_tb)
+        self.event.error = exc_val
+        self._notify("on_stop")
+        return False
+
+    def _count_query(self, execute, sql, params, many, context):
+        self.event.queries += 1
+        return execute(sql, params, many, context)
+
+    def _notify(self, callback_name):
+        for listener in self.listeners:
+            try:
+                getattr(listener, callback_name)(self.event)
+            except Exception as e:
+                LOGGER.exception(e)
+
+
+class _NoMeasurement(object):
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+NO_MEASUREMENT = _NoMeasurement()
+
+
+class Instrumentation(object):
+    """
+    Registry of the instrumentation listeners. The hot paths of river are wrapped with ``measure`` and every registered
+    listener is notified when they start and stop. When there is no listener, which is the default, nothing is measured
+    at all.
+    """
+
+    def __init__(self):
+        self.listeners = ()
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        with self._lock:
+            if listener not in self.listeners:
+                self.listeners = self.listeners + (listener,)
+        return listener
+
+    def remove_listener(self, listener):
+        with self._lock:
+            self.listeners = tuple(registered for registered in self.listeners if registered is not listener)
+
+    def clear(self):
+        with self._lock:
+            self.listeners = ()
+
+    def load_listeners(self, listener_paths):
+        """
+        Registers the listeners which are given by their dotted paths. A path can either point to a listener or to a
+        class or a factory that can be called without any argument to build one.
+        """
+        for listener_path in listener_paths:
+            listener = import_string(listener_path)
+            if isinstance(listener, type) or not hasattr(listener, "on_stop"):
+                listener = listener()
+            self.add_listener(listener)
+
+    @property
+    def enabled(self):
+        return bool(self.listeners)
+
+    def measure(self, operation, **tags):
+        listeners = self.listeners
+        if not listeners:
+            return NO_MEASUREMENT
+        return _Measurement(listeners, operation, tags)
+
+
+instrumentation = Instrumentation()
+
+
+class _MeasuredQuerySetMixin(object):
+    _measurement = None
+
+    def _clone(self, *args, **kwargs):
+        clone = super(_MeasuredQuerySetMixin, self)._clone(*args, **kwargs)
+        clone._measurement = self._measurement
+        return clone
+
+    def _fetch_all(self):
+        if self._result_cache is not None:
+            return super(_MeasuredQuerySetMixin, self)._fetch_all()
+        operation, tags = self._measurement
+        with instrumentation.measure(operation, **tags):
+            return super(_MeasuredQuerySetMixin, self)._fetch_all()
+
+    def count(self):
+        if self._result_cache is not None:
+            return super(_MeasuredQuerySetMixin, self).count()
+        operation, tags = self._measurement
+        with instrumentation.measure(operation, **tags):
+            return super(_MeasuredQuerySetMixin, self).count()
+
+    def exists(self):
+        if self._result_cache is not None:
+            return super(_MeasuredQuerySetMixin, self).exists()
+        operation, tags = self._measurement
+        with instrumentation.measure(operation, **tags):
+            return super(_MeasuredQuerySetMixin, self).exists()
+
+
+_measured_queryset_classes = {}
+
+
+def measured(queryset, operation, **tags):
+    """
+    Measures the given lazy queryset as the given operation when it is evaluated, rather than when it is built. The
+    querysets that are chained from it are measured the same way. The queryset is returned as is when there is no
+    listener.
+    """
+    if not instrumentation.listeners:
+        return queryset
+
+    queryset_class = queryset.__class__
+    measured_class = _measured_queryset_classes.get(queryset_class)
+    if measured_class is None:
+        measured_class = type("Measured%s" % queryset_class.__name__, (_MeasuredQuerySetMixin, queryset_class), {})
+        _measured_queryset_classes[queryset_class] = measured_class
+
+    queryset = queryset._chain()
+    queryset.__class__ = measured_class
+    queryset._measurement = (operation, tags)
+    return queryset
+
+
+def instrumented(operation, **tags):
+    """
+    Measures every call of the decorated function as the given operation.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.listeners:
+                return func(*args, **kwargs)
+            with instrumentation.measure(operation, **tags):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,129 @@
+import logging
+import socket
+import threading
+from collections import OrderedDict
+
+from river.core.instrumentation import InstrumentationListener
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _OperationMetrics(object):
+
+    def __init__(self, buckets):
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.errors = 0
+
+
+class PrometheusExporter(InstrumentationListener):
+    """
+    Aggregates the instrumentation events in memory and renders them in the Prometheus text exposition format. It is
+    up to the application to serve ``render()`` on an endpoint that Prometheus scrapes.
+    """
+
+    def __init__(self, namespace="river", buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._metrics = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_stop(self, event):
+        key = (event.operation, tuple(sorted(event.tags.items())))
+        with self._lock:
+            metrics = self._metrics.get(key)
+            if metrics is None:
+                metrics = self._metrics[key] = _OperationMetrics(self.buckets)
+            for index, bucket in enumerate(self.buckets):
+                if event.duration <= bucket:
+                    metrics.bucket_counts[index] += 1
+            metrics.count += 1
+            metrics.duration += event.duration
+            metrics.queries += event.queries
+            if event.error is not None:
+                metrics.errors += 1
+
+    def reset(self):
+        with self._lock:
+            self._metrics = OrderedDict()
+
+    def render(self):
+        with self._lock:
+            metrics = [(operation, tags, self._copy(operation_metrics)) for (operation, tags), operation_metrics in self._metrics.items()]
+
+        duration_name = "%s_operation_duration_seconds" % self.namespace
+        queries_name = "%s_operation_queries_total" % self.namespace
+        errors_name = "%s_operation_errors_total" % self.namespace
+
+        lines = [
+            "# HELP %s Duration of the river operations." % duration_name,
+            "# TYPE %s histogram" % duration_name,
+        ]
+        for operation, tags, operation_metrics in metrics:
+            for bucket, bucket_count in zip(self.buckets, operation_metrics.bucket_counts):
+                lines.append("%s_bucket%s %s" % (duration_name, self._labels(operation, tags, le=repr(float(bucket))), bucket_count))
+            lines.append("%s_bucket%s %s" % (duration_name, self._labels(operation, tags, le="+Inf"), operation_metrics.count))
+            lines.append("%s_sum%s %r" % (duration_name, self._labels(operation, tags), operation_metrics.duration))
+            lines.append("%s_count%s %s" % (duration_name, self._labels(operation, tags), operation_metrics.count))
+
+        lines.extend([
+            "# HELP %s Number of the database queries issued by the river operations." % queries_name,
+            "# TYPE %s counter" % queries_name,
+        ])
+        for operation, tags, operation_metrics in metrics:
+            lines.append("%s%s %s" % (queries_name, self._labels(operation, tags), operation_metrics.queries))
+
+        lines.extend([
+            "# HELP %s Number of the river operations that have failed." % errors_name,
+            "# TYPE %s counter" % errors_name,
+        ])
+        for operation, tags, operation_metrics in metrics:
+            lines.append("%s%s %s" % (errors_name, self._labels(operation, tags), operation_metrics.errors))
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _copy(operation_metrics):
+        copied = _OperationMetrics(())
+        copied.__dict__.update(operation_metrics.__dict__)
+        copied.bucket_counts = list(operation_metrics.bucket_counts)
+        return copied
+
+    @staticmethod
+    def _labels(operation, tags, **extra):
+        labels = [("operation", operation)] + list(tags) + sorted(extra.items())
+        return "{%s}" % ",".join('%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for name, value in labels)
+
+
+class StatsdExporter(InstrumentationListener):
+    """
+    Sends the instrumentation events to a StatsD daemon over UDP as a timer of the duration and counters of the queries
+    and the errors of each operation. The tags are not sent since plain StatsD has no notion of them. Sending is
+    best effort, the metrics that can not be sent are dropped.
+    """
+
+    def __init__(self, host="localhost", port=8125, prefix="river"):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def on_stop(self, event):
+        name = "%s.%s" % (self.prefix, event.operation)
+        lines = [
+            "%s.duration:%.3f|ms" % (name, event.duration * 1000),
+            "%s.queries:%s|c" % (name, event.queries),
+        ]
+        if event.error is not None:
+            lines.append("%s.errors:1|c" % name)
+
+        try:
+            self._socket.sendto("\n".join(lines).encode("ascii"), self.address)
+        except (socket.error, UnicodeError) as e:
+            LOGGER.debug("Metrics of %s could not be sent to StatsD. %s" % (event.operation, e))
+
+    def close(self):
+        self._socket.close()
@@ -1,28 +1,115 @@
 import inspect
+import threading
+import weakref
+
+from django.core.signals import setting_changed
 
 from river.core.classworkflowobject import ClassWorkflowObject
 from river.core.instanceworkflowobject import InstanceWorkflowObject
+from river.core.workflowgraph import workflow_graph_cache
 from river.core.workflowregistry import workflow_registry
 
+INSTANCE_WORKFLOWS_ATTNAME = "_river_instance_workflows"
+
+_class_workflows = weakref.WeakKeyDictionary()
+_class_workflows_lock = threading.Lock()
+
+
+def get_class_workflow(cls, field_name):
+    """
+    The class workflow object of the given workflow model and field. It is built once per version of the workflow
+    graph cache, so any change on the workflow metadata makes it to be built again at the next access. The ones that
+    are built while the metadata has uncommitted changes are only memoized for the current thread.
+    """
+    pending_class_workflows = workflow_graph_cache.get_pending_values("class_workflows")
+    if pending_class_workflows is not None:
+        key = (cls, field_name)
+        if key not in pending_class_workflows:
+            pending_class_workflows[key] = ClassWorkflowObject(cls, field_name)
+        return pending_class_workflows[key]
+
+    version = workflow_graph_cache.version
+    class_workflows = _class_workflows.get(cls)
+    memo = class_workflows.get(field_name) if class_workflows is not None else None
+    if memo is None or memo[0] != version:
+        memo = (version, ClassWorkflowObject(cls, field_name))
+        with _class_workflows_lock:
+            _class_workflows.setdefault(cls, {})[field_name] = memo
+    return memo[1]
+
+
+def clear_class_workflows():
+    with _class_workflows_lock:
+        _class_workflows.clear()
+
+
+def forget_instance_workflows(instance):
+    """
+    Drops the instance workflow objects that are memoized on the given workflow object.
+    """
+    instance.__dict__.pop(INSTANCE_WORKFLOWS_ATTNAME, None)
+
+
+class InstanceWorkflows(dict):
+    """
+    The instance workflow objects that are memoized on a workflow object, keyed by field name. They are only weakly
+    referred to, since they refer to the workflow object themselves. It is neither pickled nor deep copied along with
+    the workflow object.
+    """
+
+    def __reduce__(self):
+        return InstanceWorkflows, ()
+
 
 # noinspection PyMethodMayBeStatic
 class RiverObject(object):
+    """
+    The ``river`` accessor of the workflow models and their instances. The instance workflow objects of an instance
+    are memoized on the instance itself as long as they are in use. They are built again when the primary key of the
+    instance or the workflow graph cache version changes, or the instance is refreshed from the database.
+    """
 
     def __init__(self, owner):
         self.owner = owner
         self.is_class = inspect.isclass(owner)
 
+    @classmethod
+    def of(cls, owner):
+        return cls(owner)
+
+    def __reduce__(self):
+        return RiverObject, (self.owner,)
+
     def __getattr__(self, field_name):
+        if field_name.startswith("_"):
+            raise AttributeError(field_name)
         cls = self.owner if self.is_class else self.owner.__class__
         if field_name not in workflow_registry.workflows[id(cls)]:
             raise Exception("Workflow with name:%s doesn't exist for class:%s" % (field_name, cls.__name__))
         if self.is_class:
-            return ClassWorkflowObject(self.owner, field_name)
-        else:
-            return InstanceWorkflowObject(self.owner, field_name)
+            return get_class_workflow(self.owner, field_name)
+
+        key = (self.owner.pk, workflow_graph_cache.version)
+        instance_workflows = self.owner.__dict__.get(INSTANCE_WORKFLOWS_ATTNAME)
+        if instance_workflows is None:
+            instance_workflows = self.owner.__dict__[INSTANCE_WORKFLOWS_ATTNAME] = InstanceWorkflows()
+        memo = instance_workflows.get(field_name)
+        instance_workflow = memo[1]() if memo is not None and memo[0] == key else None
+        if instance_workflow is None or instance_workflow.workflow_object is not self.owner:
+            instance_workflow = InstanceWorkflowObject(self.owner, field_name)
+            instance_workflows[field_name] = (key, weakref.ref(instance_workflow))
+        return instance_workflow
 
     def all(self, cls):
         return list([getattr(self, field_name) for field_name in workflow_registry.workflows[id(cls)]])
 
     def all_field_names(self, cls):  # pylint: disable=no-self-use
         return [field_name for field_name in workflow_registry.workflows[id(cls)]]
+
+
+def _on_setting_changed(sender, setting, **kwargs):
+    if setting.startswith("RIVER_"):
+        clear_class_workflows()
+
+
+setting_changed.connect(_on_setting_changed, dispatch_uid="river_class_workflows_setting_changed")
@@ -0,0 +1,123 @@
+import logging
+from collections import defaultdict
+
+from river.models import Transition, TransitionApproval
+from river.utils.error_code import ErrorCode
+from river.utils.exceptions import RiverException
+from river.utils.typedobjectid import populate_typed_object_id
+
+LOGGER = logging.getLogger(__name__)
+
+READ_BACK_BATCH_SIZE = 500
+
+
+class TransitionBatch(object):
+    """
+    Collects unsaved transitions along with their approvals and writes all of them with a fixed number of bulk_create
+    calls. The primary keys are read back with a query per model and per ``READ_BACK_BATCH_SIZE`` workflow objects on
+    the backends which can not return them from a bulk insert.
+    """
+
+    def __init__(self, workflow, batch_size=None):
+        self.workflow = workflow
+        self.batch_size = batch_size
+        self.transitions = []
+        self.approvals = []
+
+    def __len__(self):
+        return len(self.transitions)
+
+    def add(self, transition, approvals):
+        """
+        :param transition: An unsaved transition.
+        :param approvals: A list of ``(unsaved transition approval, permission ids, group ids)`` of the transition.
+        """
+        populate_typed_object_id(transition)
+        self.transitions.append(transition)
+        for approval, permission_ids, group_ids in approvals:
+            populate_typed_object_id(approval)
+            self.approvals.append((transition, approval, permission_ids, group_ids))
+
+    def save(self):
+        if not self.transitions:
+            return []
+
+        self._bulk_create(Transition, self.transitions, ("content_type_id", "object_id", "meta_id", "iteration"))
+
+        for transition, approval, _, _ in self.approvals:
+            approval.transition = transition
+        approvals = [approval for _, approval, _, _ in self.approvals]
+        self._bulk_create(TransitionApproval, approvals, ("transition_id", "meta_id", "priority"))
+
+        self._bulk_create_relations("permissions", [(approval.pk, permission_ids) for _, approval, permission_ids, _ in self.approvals])
+        self._bulk_create_relations("groups", [(approval.pk, group_ids) for _, approval, _, group_ids in self.approvals])
+
+        LOGGER.debug("%s transitions and %s transition approvals are created in bulk for the workflow %s" % (
+            len(self.transitions), len(approvals), self.workflow))
+
+        transitions = self.transitions
+        self.transitions = []
+        self.approvals = []
+        return transitions
+
+    def _bulk_create(self, model, objects, natural_key):
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+        missing = defaultdict(list)
+        for obj in objects:
+            if obj.pk is None:
+                missing[_natural_key(obj.__dict__, natural_key)].append(obj)
+        if not missing:
+            return
+
+        created = defaultdict(list)
+        content_type_ids = set(obj.content_type_id for objs in missing.values() for obj in objs)
+        object_ids = sorted(set(str(obj.object_id) for objs in missing.values() for obj in objs))
+        for offset in range(0, len(object_ids), READ_BACK_BATCH_SIZE):
+            for row in model.objects.filter(
+                    workflow=self.workflow,
+                    content_type_id__in=content_type_ids,
+                    object_id__in=object_ids[offset:offset + READ_BACK_BATCH_SIZE],
+            ).values("pk", *natural_key).order_by("pk"):
+                key = _natural_key(row, natural_key)
+                if key in missing:
+                    created[key].append(row["pk"])
+
+        # The objects which share a natural key, like the approvals of a transition whose metas are deleted, are told
+        # apart by the order they are inserted in. It is only safe when there is no other row with the same key.
+        for key, objs in missing.items():
+            if len(created[key]) != len(objs):
+                raise RiverException(ErrorCode.AMBIGUOUS_BULK_CREATED_OBJECTS,
+                                     "The primary keys of the %s objects created in bulk can not be read back since %s rows are found "
+                                     "with the natural key %s of %s objects." % (model.__name__, len(created[key]), key, len(objs)))
+            for obj, pk in zip(objs, created[key]):
+                obj.pk = pk
+
+    def _bulk_create_relations(self, field_name, relations):
+        field = TransitionApproval._meta.get_field(field_name)
+        through = field.remote_field.through
+        source_field_name = field.m2m_field_name() + "_id"
+        target_field_name = field.m2m_reverse_field_name() + "_id"
+        through.objects.bulk_create([
+            through(**{source_field_name: approval_id, target_field_name: target_id})
+            for approval_id, target_ids in relations
+            for target_id in target_ids
+        ], batch_size=self.batch_size)
+
+
+def get_approval_relations(field_name, approval_ids):
+    """
+    The ids of the permissions or the groups of the given transition approvals, keyed by approval id.
+    """
+    field = TransitionApproval._meta.get_field(field_name)
+    through = field.remote_field.through
+    relations = defaultdict(list)
+    if approval_ids:
+        for approval_id, target_id in through.objects.filter(**{field.m2m_field_name() + "_id__in": approval_ids}).values_list(
+                field.m2m_field_name() + "_id", field.m2m_reverse_field_name() + "_id").order_by("pk"):
+            relations[approval_id].append(target_id)
+    return relations
+
+
+def _natural_key(values, fields):
+    return tuple(str(values[field]) if field == "object_id" else values[field] for field in fields)
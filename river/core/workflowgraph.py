@@ -0,0 +1,178 @@
+import logging
+import threading
+from collections import defaultdict
+
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from river.core.caches import PendingChanges
+from river.models import Workflow, State, TransitionMeta, TransitionApprovalMeta
+
+LOGGER = logging.getLogger(__name__)
+
+
+class WorkflowGraph(object):
+    """
+    A compiled and read-only image of the metadata of a workflow. It is built once with a fixed number of queries
+    and then shared by every class and instance workflow object of the same workflow. Nothing in here should be mutated.
+    """
+
+    def __init__(self, workflow, transition_metas, approval_metas, permission_ids, group_ids):
+        self.workflow = workflow
+        self.initial_state = workflow.initial_state
+
+        self.states = {workflow.initial_state.pk: workflow.initial_state}
+        self.transition_metas = list(transition_metas)
+        self.transition_metas_by_source = defaultdict(list)
+        self.transition_metas_by_destination = defaultdict(list)
+        for transition_meta in self.transition_metas:
+            self.states[transition_meta.source_state.pk] = transition_meta.source_state
+            self.states[transition_meta.destination_state.pk] = transition_meta.destination_state
+            self.transition_metas_by_source[transition_meta.source_state.pk].append(transition_meta)
+            self.transition_metas_by_destination[transition_meta.destination_state.pk].append(transition_meta)
+
+        transition_metas_by_id = {transition_meta.pk: transition_meta for transition_meta in self.transition_metas}
+        self.approval_metas = defaultdict(list)
+        for approval_meta in approval_metas:
+            approval_meta.transition_meta = transition_metas_by_id[approval_meta.transition_meta_id]
+            self.approval_metas[approval_meta.transition_meta_id].append(approval_meta)
+
+        self.permission_ids = permission_ids
+        self.group_ids = group_ids
+
+        # The final states are the ones that can be transited into but not out of.
+        approved_transition_metas = [transition_metas_by_id[transition_meta_id] for transition_meta_id in self.approval_metas]
+        self.final_state_ids = frozenset(
+            set(transition_meta.destination_state.pk for transition_meta in approved_transition_metas) -
+            set(transition_meta.source_state.pk for transition_meta in approved_transition_metas)
+        )
+        self._initial_path = None
+
+    @property
+    def final_states(self):
+        return [self.states[state_id] for state_id in sorted(self.final_state_ids)]
+
+    def is_initial_state(self, state_id):
+        return state_id == self.initial_state.pk
+
+    def is_final_state(self, state_id):
+        return state_id in self.final_state_ids
+
+    def get_approval_metas(self, transition_meta):
+        return self.approval_metas.get(transition_meta.pk, [])
+
+    def get_permission_ids(self, approval_meta):
+        return self.permission_ids.get(approval_meta.pk, [])
+
+    def get_group_ids(self, approval_meta):
+        return self.group_ids.get(approval_meta.pk, [])
+
+    def get_transition_metas_from(self, state_ids):
+        return [transition_meta for state_id in state_ids for transition_meta in self.transition_metas_by_source.get(state_id, [])]
+
+    @property
+    def initial_path(self):
+        """
+        The transition metas that a fresh workflow object goes through, level by level starting from the initial state,
+        along with the iteration each level is created with. Every transition meta is visited only once.
+        """
+        if self._initial_path is not None:
+            return self._initial_path
+
+        path = []
+        transition_meta_list = self.get_transition_metas_from([self.initial_state.pk])
+        iteration = 0
+        processed_transitions = set()
+        while transition_meta_list:
+            for transition_meta in transition_meta_list:
+                path.append((transition_meta, iteration))
+                processed_transitions.add(transition_meta.pk)
+            transition_meta_list = [
+                transition_meta for transition_meta in self.get_transition_metas_from(
+                    sorted(set(transition_meta.destination_state.pk for transition_meta in transition_meta_list))
+                ) if transition_meta.pk not in processed_transitions
+            ]
+            iteration += 1
+        self._initial_path = path
+        return path
+
+    @classmethod
+    def build(cls, content_type, field_name):
+        workflow = Workflow.objects.select_related("initial_state", "content_type").filter(content_type=content_type, field_name=field_name).first()
+        if not workflow:
+            return None
+
+        transition_metas = TransitionMeta.objects.filter(workflow=workflow).select_related("source_state", "destination_state").order_by("pk")
+        approval_metas = TransitionApprovalMeta.objects.filter(workflow=workflow).order_by("priority", "pk")
+
+        permission_ids = defaultdict(list)
+        for approval_meta_id, permission_id in TransitionApprovalMeta.objects.filter(
+                workflow=workflow, permissions__isnull=False
+        ).values_list("pk", "permissions").order_by("pk", "permissions"):
+            permission_ids[approval_meta_id].append(permission_id)
+
+        group_ids = defaultdict(list)
+        for approval_meta_id, group_id in TransitionApprovalMeta.objects.filter(
+                workflow=workflow, groups__isnull=False
+        ).values_list("pk", "groups").order_by("pk", "groups"):
+            group_ids[approval_meta_id].append(group_id)
+
+        return cls(workflow, transition_metas, approval_metas, dict(permission_ids), dict(group_ids))
+
+
+class WorkflowGraphCache(object):
+    """
+    Process local cache of compiled workflow graphs keyed by content type and field name. Any change on the workflow
+    metadata invalidates the whole cache both right away and once the transaction that made the change is committed
+    or rolled back. The graphs that are built before that are only seen by the thread which has made the change.
+    """
+
+    def __init__(self):
+        self._graphs = {}
+        self._lock = threading.RLock()
+        self._pending_changes = PendingChanges(self.invalidate)
+        self.version = 0
+
+    def get(self, content_type, field_name):
+        key = (content_type.pk, field_name)
+        pending_graphs = self.get_pending_values("graphs")
+        graphs = self._graphs if pending_graphs is None else pending_graphs
+        try:
+            return graphs[key]
+        except KeyError:
+            with self._lock:
+                version = self.version
+                graph = WorkflowGraph.build(content_type, field_name)
+                if pending_graphs is not None:
+                    pending_graphs[key] = graph
+                elif version == self.version:
+                    self._graphs[key] = graph
+                return graph
+
+    def get_pending_values(self, namespace):
+        """
+        What is built out of the workflow metadata in the given namespace while the transaction of the current thread
+        has uncommitted changes on the metadata, or ``None`` when it hasn't.
+        """
+        values = self._pending_changes.get_values()
+        return values.setdefault(namespace, {}) if values is not None else None
+
+    def invalidate(self):
+        with self._lock:
+            self._graphs = {}
+            self.version += 1
+        self._pending_changes.clear()
+        LOGGER.debug("Workflow graph cache is invalidated.")
+
+    def on_metadata_changed(self, *args, **kwargs):
+        self.invalidate()
+        self._pending_changes.add()
+
+
+workflow_graph_cache = WorkflowGraphCache()
+
+for _model in [Workflow, State, TransitionMeta, TransitionApprovalMeta]:
+    post_save.connect(workflow_graph_cache.on_metadata_changed, sender=_model, dispatch_uid="river_workflow_graph_post_save_%s" % _model.__name__)
+    post_delete.connect(workflow_graph_cache.on_metadata_changed, sender=_model, dispatch_uid="river_workflow_graph_post_delete_%s" % _model.__name__)
+
+for _through in [TransitionApprovalMeta.permissions.through, TransitionApprovalMeta.groups.through, TransitionApprovalMeta.parents.through]:
+    m2m_changed.connect(workflow_graph_cache.on_metadata_changed, sender=_through, dispatch_uid="river_workflow_graph_m2m_%s" % _through.__name__)
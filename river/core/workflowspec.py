@@ -0,0 +1,611 @@
+import json
+import logging
+from collections import OrderedDict, defaultdict, deque
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.template.defaultfilters import slugify
+from six import string_types
+
+from river.config import app_config
+from river.core.approvalmetagraph import rebuild_approval_meta_graph
+from river.core.hookregistry import hook_registry
+from river.core.workflowgraph import workflow_graph_cache
+from river.core.workflowregistry import workflow_registry
+from river.models import State, Workflow, TransitionMeta, TransitionApprovalMeta, Function, OnApprovedHook, OnTransitHook, OnCompleteHook
+from river.models.function import evict_function
+from river.models.hook import BEFORE, AFTER
+from river.utils.bulkupdate import bulk_update
+from river.utils.error_code import ErrorCode
+from river.utils.exceptions import RiverException
+
+LOGGER = logging.getLogger(__name__)
+
+SPEC_VERSION = 1
+
+JSON = "json"
+YAML = "yaml"
+FORMATS = [JSON, YAML]
+
+HOOK_TYPES = [BEFORE, AFTER]
+
+
+def export_workflows(workflows=None):
+    """
+    Describes the given workflows, or all of them, as a workflow spec which can be imported back with
+    ``import_workflows``. Only the hooks that are not specific to a workflow object are included. It costs a fixed
+    number of queries no matter how big the workflows are.
+    """
+    if workflows is None:
+        workflows = Workflow.objects.all()
+    workflows = sorted(workflows, key=lambda workflow: workflow.pk)
+    workflow_ids = [workflow.pk for workflow in workflows]
+
+    transition_metas = defaultdict(list)
+    state_ids = set(workflow.initial_state_id for workflow in workflows)
+    for transition_meta_id, workflow_id, source_state_id, destination_state_id in TransitionMeta.objects.filter(
+            workflow__in=workflow_ids
+    ).order_by("pk").values_list("pk", "workflow_id", "source_state_id", "destination_state_id"):
+        transition_metas[workflow_id].append((transition_meta_id, source_state_id, destination_state_id))
+        state_ids.update([source_state_id, destination_state_id])
+
+    approval_metas = defaultdict(list)
+    for approval_meta_id, transition_meta_id, priority in TransitionApprovalMeta.objects.filter(
+            workflow__in=workflow_ids
+    ).order_by("priority", "pk").values_list("pk", "transition_meta_id", "priority"):
+        approval_metas[transition_meta_id].append((approval_meta_id, priority))
+
+    permissions = _get_approval_meta_relations(TransitionApprovalMeta.permissions, workflow_ids, "content_type__app_label", "codename")
+    groups = _get_approval_meta_relations(TransitionApprovalMeta.groups, workflow_ids, "name")
+
+    hooks = defaultdict(list)
+    function_names = set()
+    for hook_class, meta_field_name in [(OnTransitHook, "transition_meta_id"), (OnApprovedHook, "transition_approval_meta_id"), (OnCompleteHook, "workflow_id")]:
+        for meta_id, function_name, hook_type in hook_class.objects.filter(
+                workflow__in=workflow_ids, object_id__isnull=True
+        ).order_by("pk").values_list(meta_field_name, "callback_function__name", "hook_type"):
+            hooks[(hook_class, meta_id)].append(OrderedDict([("function", function_name), ("type", hook_type)]))
+            function_names.add(function_name)
+
+    states = State.objects.in_bulk(state_ids)
+    content_types = app_config.CONTENT_TYPE_CLASS.objects.in_bulk(set(workflow.content_type_id for workflow in workflows))
+
+    return OrderedDict([
+        ("version", SPEC_VERSION),
+        ("states", [
+            OrderedDict([("slug", state.slug), ("label", state.label), ("description", state.description)])
+            for state in sorted(states.values(), key=lambda state: state.pk)
+        ]),
+        ("functions", [
+            OrderedDict([("name", name), ("body", body)])
+            for name, body in Function.objects.filter(name__in=function_names).order_by("name").values_list("name", "body")
+        ]),
+        ("workflows", [
+            OrderedDict([
+                ("model", "%s.%s" % (content_types[workflow.content_type_id].app_label, content_types[workflow.content_type_id].model)),
+                ("field_name", workflow.field_name),
+                ("initial_state", states[workflow.initial_state_id].slug),
+                ("transitions", [
+                    OrderedDict([
+                        ("source", states[source_state_id].slug),
+                        ("destination", states[destination_state_id].slug),
+                        ("approvals", [
+                            OrderedDict([
+                                ("priority", priority),
+                                ("permissions", ["%s.%s" % permission for permission in permissions[approval_meta_id]]),
+                                ("groups", [name for name, in groups[approval_meta_id]]),
+                                ("hooks", hooks[(OnApprovedHook, approval_meta_id)]),
+                            ])
+                            for approval_meta_id, priority in approval_metas[transition_meta_id]
+                        ]),
+                        ("hooks", hooks[(OnTransitHook, transition_meta_id)]),
+                    ])
+                    for transition_meta_id, source_state_id, destination_state_id in transition_metas[workflow.pk]
+                ]),
+                ("hooks", hooks[(OnCompleteHook, workflow.pk)]),
+            ])
+            for workflow in workflows
+        ]),
+    ])
+
+
+def import_workflows(spec):
+    """
+    Validates the given workflow spec and loads it in a single transaction with a fixed number of bulk queries. The
+    states, the functions, the workflows, the transition metas and the transition approval metas that already exist are
+    reused and updated, the missing ones are created. The permissions and the groups of the transition approval metas
+    in the spec are replaced by the ones in the spec and the missing hooks are added. Nothing is ever deleted. A
+    ``RiverException`` listing every problem in the spec is raised before anything is written if it is not valid.
+    """
+    parsed = _SpecParser(spec).parse()
+
+    with transaction.atomic():
+        workflows = _load(parsed)
+
+    LOGGER.debug("%s workflows are imported." % len(workflows))
+    return workflows
+
+
+def dumps(spec, format=JSON):
+    if format == YAML:
+        return _yaml().safe_dump(json.loads(json.dumps(spec)), default_flow_style=False, sort_keys=False, allow_unicode=True)
+    return json.dumps(spec, indent=2)
+
+
+def loads(text, format=JSON):
+    if format == YAML:
+        yaml = _yaml()
+        try:
+            return yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(str(e))
+    return json.loads(text, object_pairs_hook=OrderedDict)
+
+
+def format_of(path):
+    return YAML if path.lower().endswith((".yaml", ".yml")) else JSON
+
+
+def _yaml():
+    try:
+        import yaml
+    except ImportError:
+        raise ImproperlyConfigured("PyYAML is required to read and write the workflow specs in YAML. Either install it or use JSON.")
+    return yaml
+
+
+def _get_approval_meta_relations(field, workflow_ids, *value_field_names):
+    through = field.through
+    approval_meta_field_name = field.field.m2m_field_name()
+    related_field_name = field.field.m2m_reverse_field_name()
+
+    relations = defaultdict(list)
+    for row in through.objects.filter(**{"%s__workflow__in" % approval_meta_field_name: workflow_ids}).order_by(
+            *["%s__%s" % (related_field_name, value_field_name) for value_field_name in value_field_names]
+    ).values_list("%s_id" % approval_meta_field_name, *["%s__%s" % (related_field_name, value_field_name) for value_field_name in value_field_names]):
+        relations[row[0]].append(tuple(row[1:]))
+    return relations
+
+
+class _ParsedWorkflow(object):
+
+    def __init__(self, model_class, field_name, initial_state, transitions, hooks):
+        self.model_class = model_class
+        self.field_name = field_name
+        self.initial_state = initial_state
+        self.transitions = transitions
+        self.hooks = hooks
+
+
+class _ParsedTransition(object):
+
+    def __init__(self, source, destination, approvals, hooks):
+        self.source = source
+        self.destination = destination
+        self.approvals = approvals
+        self.hooks = hooks
+
+
+class _ParsedApproval(object):
+
+    def __init__(self, priority, permission_names, group_names, hooks):
+        self.priority = priority
+        self.permission_names = permission_names
+        self.group_names = group_names
+        self.permission_ids = []
+        self.group_ids = []
+        self.hooks = hooks
+
+
+class _ParsedSpec(object):
+
+    def __init__(self, states, functions, workflows):
+        self.states = states
+        self.functions = functions
+        self.workflows = workflows
+
+
+class _SpecParser(object):
+    """
+    Turns a workflow spec into plain objects with every reference to a permission or a group resolved, collecting
+    all the problems in it along the way.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.errors = []
+        self.permission_names = set()
+        self.group_names = set()
+        self.function_names = set()
+
+    def parse(self):
+        if not isinstance(self.spec, dict):
+            self._fail("The workflow spec should be an object.")
+        version = self.spec.get("version", SPEC_VERSION)
+        if not isinstance(version, int) or isinstance(version, bool) or version != SPEC_VERSION:
+            self._fail("Version %s of the workflow spec is not supported. It should be %s." % (self.spec.get("version"), SPEC_VERSION))
+
+        states = self._parse_states(self._get_list(self.spec, "states", "The workflow spec"))
+        functions = self._parse_functions(self._get_list(self.spec, "functions", "The workflow spec"))
+        workflows = self._parse_workflows(self._get_list(self.spec, "workflows", "The workflow spec"), states)
+
+        permission_ids = self._resolve_permissions()
+        group_ids = self._resolve_groups()
+        self._check_functions(functions)
+        self._raise_errors()
+
+        for workflow in workflows:
+            for transition in workflow.transitions:
+                for approval in transition.approvals:
+                    approval.permission_ids = [permission_ids[name] for name in approval.permission_names]
+                    approval.group_ids = [group_ids[name] for name in approval.group_names]
+        return _ParsedSpec(states, functions, workflows)
+
+    def _parse_states(self, states_spec):
+        states = OrderedDict()
+        for index, state_spec in enumerate(states_spec):
+            where = "State #%s" % (index + 1)
+            if not isinstance(state_spec, dict) or not self._is_text(state_spec.get("label")):
+                self.errors.append("%s should have a label." % where)
+                continue
+            if not isinstance(state_spec.get("slug") or "", string_types) or not isinstance(state_spec.get("description") or "", string_types):
+                self.errors.append("%s slug and description should be strings." % where)
+                continue
+            slug = slugify(state_spec.get("slug") or state_spec["label"])
+            if slug in states:
+                self.errors.append("State %s is defined more than once." % slug)
+            states[slug] = (state_spec["label"], state_spec.get("description"))
+        return states
+
+    def _parse_functions(self, functions_spec):
+        functions = OrderedDict()
+        for index, function_spec in enumerate(functions_spec):
+            where = "Function #%s" % (index + 1)
+            if not isinstance(function_spec, dict) or not self._is_text(function_spec.get("name")) or not self._is_text(function_spec.get("body")):
+                self.errors.append("%s should have a name and a body." % where)
+                continue
+            if function_spec["name"] in functions:
+                self.errors.append("Function %s is defined more than once." % function_spec["name"])
+            functions[function_spec["name"]] = function_spec["body"]
+        return functions
+
+    def _parse_workflows(self, workflows_spec, states):
+        workflows = []
+        seen = set()
+        for index, workflow_spec in enumerate(workflows_spec):
+            where = "Workflow #%s" % (index + 1)
+            if not isinstance(workflow_spec, dict):
+                self.errors.append("%s should be an object." % where)
+                continue
+
+            model_class = self._get_model_class(workflow_spec.get("model"), where)
+            field_name = workflow_spec.get("field_name")
+            if not self._is_text(field_name):
+                self.errors.append("%s field_name %s should be a string." % (where, field_name))
+            elif model_class is not None:
+                where = "Workflow %s.%s" % (workflow_spec["model"], field_name)
+                if field_name not in workflow_registry.workflows.get(id(model_class), ()):
+                    self.errors.append("%s is not a state field of the model." % where)
+                if (model_class, field_name) in seen:
+                    self.errors.append("%s is defined more than once." % where)
+                seen.add((model_class, field_name))
+
+            initial_state = self._get_state(workflow_spec.get("initial_state"), states, "%s initial state" % where)
+            transitions = self._parse_transitions(self._get_list(workflow_spec, "transitions", where), states, where)
+            hooks = self._parse_hooks(self._get_list(workflow_spec, "hooks", where), where)
+            if initial_state is not None:
+                self._check_reachability(initial_state, transitions, where)
+
+            workflows.append(_ParsedWorkflow(model_class, field_name, initial_state, transitions, hooks))
+        return workflows
+
+    def _parse_transitions(self, transitions_spec, states, workflow_where):
+        transitions = []
+        seen = set()
+        for index, transition_spec in enumerate(transitions_spec):
+            where = "%s transition #%s" % (workflow_where, index + 1)
+            if not isinstance(transition_spec, dict):
+                self.errors.append("%s should be an object." % where)
+                continue
+
+            source = self._get_state(transition_spec.get("source"), states, "%s source" % where)
+            destination = self._get_state(transition_spec.get("destination"), states, "%s destination" % where)
+            where = "%s transition %s -> %s" % (workflow_where, source, destination)
+            if (source, destination) in seen:
+                self.errors.append("%s is defined more than once." % where)
+            seen.add((source, destination))
+
+            approvals = self._parse_approvals(self._get_list(transition_spec, "approvals", where), where)
+            if not approvals:
+                self.errors.append("%s should have at least one approval." % where)
+            hooks = self._parse_hooks(self._get_list(transition_spec, "hooks", where), where)
+            transitions.append(_ParsedTransition(source, destination, approvals, hooks))
+        return transitions
+
+    def _parse_approvals(self, approvals_spec, transition_where):
+        approvals = []
+        priorities = set()
+        for index, approval_spec in enumerate(approvals_spec):
+            where = "%s approval #%s" % (transition_where, index + 1)
+            if not isinstance(approval_spec, dict):
+                self.errors.append("%s should be an object." % where)
+                continue
+
+            priority = approval_spec.get("priority", 0)
+            if not isinstance(priority, int) or isinstance(priority, bool):
+                self.errors.append("%s should have an integer priority." % where)
+            elif priority in priorities:
+                self.errors.append("%s has the same priority as another approval of the transition." % where)
+            else:
+                priorities.add(priority)
+
+            permissions = self._get_list(approval_spec, "permissions", where)
+            for permission in permissions:
+                if not isinstance(permission, string_types) or permission.count(".") != 1:
+                    self.errors.append("%s permission %s should be in app_label.codename format." % (where, permission))
+                    continue
+                self.permission_names.add(permission)
+            groups = self._get_list(approval_spec, "groups", where)
+            for group in groups:
+                if not isinstance(group, string_types):
+                    self.errors.append("%s group %s should be a group name." % (where, group))
+                    continue
+                self.group_names.add(group)
+
+            hooks = self._parse_hooks(self._get_list(approval_spec, "hooks", where), where)
+            approvals.append(_ParsedApproval(priority, permissions, groups, hooks))
+        return approvals
+
+    def _parse_hooks(self, hooks_spec, owner_where):
+        hooks = []
+        for index, hook_spec in enumerate(hooks_spec):
+            where = "%s hook #%s" % (owner_where, index + 1)
+            if not isinstance(hook_spec, dict) or not isinstance(hook_spec.get("function"), string_types):
+                self.errors.append("%s should have a function." % where)
+                continue
+            hook_type = hook_spec.get("type", AFTER)
+            if not self._is_text(hook_type) or hook_type not in HOOK_TYPES:
+                self.errors.append("%s type should be one of %s." % (where, ", ".join(HOOK_TYPES)))
+            self.function_names.add(hook_spec["function"])
+            hooks.append((hook_spec["function"], hook_type))
+        return hooks
+
+    def _check_reachability(self, initial_state, transitions, where):
+        destinations = defaultdict(set)
+        for transition in transitions:
+            if transition.source is not None and transition.destination is not None:
+                destinations[transition.source].add(transition.destination)
+
+        reachable = set([initial_state])
+        queue = deque([initial_state])
+        while queue:
+            for destination in destinations[queue.popleft()]:
+                if destination not in reachable:
+                    reachable.add(destination)
+                    queue.append(destination)
+
+        for source in sorted(set(destinations) - reachable):
+            self.errors.append("%s state %s is not reachable from the initial state." % (where, source))
+
+    def _resolve_permissions(self):
+        permission_ids = {}
+        codenames = set(name.split(".")[1] for name in self.permission_names)
+        for permission_id, app_label, codename in app_config.PERMISSION_CLASS.objects.filter(codename__in=codenames).values_list(
+                "pk", "content_type__app_label", "codename"
+        ):
+            name = "%s.%s" % (app_label, codename)
+            if name in permission_ids:
+                self.errors.append("Permission %s is ambiguous." % name)
+            permission_ids[name] = permission_id
+
+        for name in sorted(self.permission_names - set(permission_ids)):
+            self.errors.append("Permission %s does not exist." % name)
+        return permission_ids
+
+    def _resolve_groups(self):
+        group_ids = dict(app_config.GROUP_CLASS.objects.filter(name__in=self.group_names).values_list("name", "pk"))
+        for name in sorted(self.group_names - set(group_ids)):
+            self.errors.append("Group %s does not exist." % name)
+        return group_ids
+
+    def _check_functions(self, functions):
+        missing = self.function_names - set(functions)
+        existing = set(Function.objects.filter(name__in=missing).values_list("name", flat=True)) if missing else set()
+        for name in sorted(missing - existing):
+            self.errors.append("Function %s is neither defined in the spec nor exists." % name)
+
+    def _get_model_class(self, model, where):
+        if not self._is_text(model):
+            self.errors.append("%s model %s should be an existing model in app_label.model_name format." % (where, model))
+            return None
+        try:
+            return apps.get_model(model)
+        except (LookupError, ValueError, TypeError, AttributeError):
+            self.errors.append("%s model %s should be an existing model in app_label.model_name format." % (where, model))
+            return None
+
+    def _get_state(self, slug, states, where):
+        if not self._is_text(slug) or slug not in states:
+            self.errors.append("%s %s should be one of the states in the spec." % (where, slug))
+            return None
+        return slug
+
+    def _get_list(self, owner, key, where):
+        value = owner.get(key) if isinstance(owner, dict) else None
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            self.errors.append("%s %s should be a list." % (where, key))
+            return []
+        return value
+
+    @staticmethod
+    def _is_text(value):
+        return isinstance(value, string_types) and bool(value)
+
+    def _fail(self, error):
+        self.errors.append(error)
+        self._raise_errors()
+
+    def _raise_errors(self):
+        if self.errors:
+            raise RiverException(ErrorCode.INVALID_WORKFLOW_SPEC, "Invalid workflow spec. %s" % " ".join(self.errors))
+
+
+def _load(parsed):
+    state_ids = _load_states(parsed.states)
+    function_ids = _load_functions(parsed.functions, parsed.workflows)
+    workflows = _load_workflows(parsed.workflows, state_ids)
+
+    workflow_ids = [workflow.pk for workflow in workflows]
+    transition_meta_ids = _load_objects(
+        TransitionMeta,
+        TransitionMeta.objects.filter(workflow__in=workflow_ids),
+        ("workflow_id", "source_state_id", "destination_state_id"),
+        [
+            (workflow.pk, state_ids[transition.source], state_ids[transition.destination])
+            for workflow, parsed_workflow in zip(workflows, parsed.workflows)
+            for transition in parsed_workflow.transitions
+        ],
+    )
+    approval_meta_ids = _load_objects(
+        TransitionApprovalMeta,
+        TransitionApprovalMeta.objects.filter(workflow__in=workflow_ids),
+        ("workflow_id", "transition_meta_id", "priority"),
+        [
+            (workflow.pk, transition_meta_ids[(workflow.pk, state_ids[transition.source], state_ids[transition.destination])], approval.priority)
+            for workflow, parsed_workflow in zip(workflows, parsed.workflows)
+            for transition in parsed_workflow.transitions
+            for approval in transition.approvals
+        ],
+    )
+
+    permissions = {}
+    groups = {}
+    transition_hooks = []
+    approval_hooks = []
+    complete_hooks = []
+    for workflow, parsed_workflow in zip(workflows, parsed.workflows):
+        complete_hooks.extend((function_ids[function_name], workflow.pk, hook_type) for function_name, hook_type in parsed_workflow.hooks)
+        for transition in parsed_workflow.transitions:
+            transition_meta_id = transition_meta_ids[(workflow.pk, state_ids[transition.source], state_ids[transition.destination])]
+            transition_hooks.extend((function_ids[function_name], workflow.pk, hook_type, transition_meta_id) for function_name, hook_type in transition.hooks)
+            for approval in transition.approvals:
+                approval_meta_id = approval_meta_ids[(workflow.pk, transition_meta_id, approval.priority)]
+                permissions[approval_meta_id] = approval.permission_ids
+                groups[approval_meta_id] = approval.group_ids
+                approval_hooks.extend((function_ids[function_name], workflow.pk, hook_type, approval_meta_id) for function_name, hook_type in approval.hooks)
+
+    _replace_approval_meta_relations(TransitionApprovalMeta.permissions, permissions)
+    _replace_approval_meta_relations(TransitionApprovalMeta.groups, groups)
+
+    hook_field_names = ("callback_function_id", "workflow_id", "hook_type")
+    _load_objects(OnCompleteHook, OnCompleteHook.objects.filter(workflow__in=workflow_ids, object_id__isnull=True), hook_field_names, complete_hooks)
+    _load_objects(OnTransitHook, OnTransitHook.objects.filter(workflow__in=workflow_ids, object_id__isnull=True), hook_field_names + ("transition_meta_id",), transition_hooks)
+    _load_objects(OnApprovedHook, OnApprovedHook.objects.filter(workflow__in=workflow_ids, object_id__isnull=True), hook_field_names + ("transition_approval_meta_id",), approval_hooks)
+
+    for workflow in workflows:
+        rebuild_approval_meta_graph(workflow)
+
+    workflow_graph_cache.on_metadata_changed()
+    hook_registry.on_hooks_changed()
+    return workflows
+
+
+def _load_states(states):
+    existing = {state.slug: state for state in State.objects.filter(slug__in=list(states))}
+    State.objects.bulk_create([State(slug=slug, label=label, description=description) for slug, (label, description) in states.items() if slug not in existing])
+
+    changed = []
+    for slug, state in existing.items():
+        label, description = states[slug]
+        if (state.label, state.description) != (label, description):
+            state.label, state.description = label, description
+            changed.append(state)
+    if changed:
+        bulk_update(State, changed, ["label", "description"])
+
+    return dict(State.objects.filter(slug__in=list(states)).values_list("slug", "pk"))
+
+
+def _load_functions(functions, workflows):
+    existing = {function.name: function for function in Function.objects.filter(name__in=list(functions))}
+    Function.objects.bulk_create([Function(name=name, body=body, version=1) for name, body in functions.items() if name not in existing])
+
+    changed = [function for name, function in existing.items() if function.body != functions[name]]
+    for function in changed:
+        function.body = functions[function.name]
+        function.version += 1
+    if changed:
+        bulk_update(Function, changed, ["body", "version"])
+        for function in changed:
+            evict_function(function.pk)
+
+    function_names = set(functions)
+    for workflow in workflows:
+        function_names.update(function_name for function_name, _ in workflow.hooks)
+        for transition in workflow.transitions:
+            function_names.update(function_name for function_name, _ in transition.hooks)
+            for approval in transition.approvals:
+                function_names.update(function_name for function_name, _ in approval.hooks)
+    return dict(Function.objects.filter(name__in=function_names).values_list("name", "pk"))
+
+
+def _load_workflows(parsed_workflows, state_ids):
+    content_types = app_config.CONTENT_TYPE_CLASS.objects.get_for_models(*set(workflow.model_class for workflow in parsed_workflows))
+    keys = [(content_types[workflow.model_class].pk, workflow.field_name) for workflow in parsed_workflows]
+
+    existing = {
+        (workflow.content_type_id, workflow.field_name): workflow
+        for workflow in Workflow.objects.filter(content_type__in=[content_type_id for content_type_id, _ in keys])
+    }
+    Workflow.objects.bulk_create([
+        Workflow(content_type_id=content_type_id, field_name=field_name, initial_state_id=state_ids[parsed_workflow.initial_state])
+        for (content_type_id, field_name), parsed_workflow in zip(keys, parsed_workflows)
+        if (content_type_id, field_name) not in existing
+    ])
+
+    changed = []
+    for key, parsed_workflow in zip(keys, parsed_workflows):
+        workflow = existing.get(key)
+        if workflow is not None and workflow.initial_state_id != state_ids[parsed_workflow.initial_state]:
+            workflow.initial_state_id = state_ids[parsed_workflow.initial_state]
+            changed.append(workflow)
+    if changed:
+        bulk_update(Workflow, changed, ["initial_state"])
+
+    workflows = {
+        (workflow.content_type_id, workflow.field_name): workflow
+        for workflow in Workflow.objects.filter(content_type__in=[content_type_id for content_type_id, _ in keys])
+    }
+    return [workflows[key] for key in keys]
+
+
+def _load_objects(model_class, existing, field_names, keys):
+    """
+    Creates the objects of the given keys that don't exist yet with a single bulk insert and returns the primary keys
+    of all of them by their keys.
+    """
+    existing_ids = {tuple(row[1:]): row[0] for row in existing.values_list("pk", *field_names)}
+    model_class.objects.bulk_create([
+        model_class(**dict(zip(field_names, key)))
+        for key in OrderedDict.fromkeys(keys)
+        if key not in existing_ids
+    ])
+    if any(key not in existing_ids for key in keys):
+        existing_ids = {tuple(row[1:]): row[0] for row in existing.values_list("pk", *field_names)}
+    return existing_ids
+
+
+def _replace_approval_meta_relations(field, related_ids):
+    through = field.through
+    approval_meta_field_name = field.field.m2m_field_name()
+    related_field_name = field.field.m2m_reverse_field_name()
+
+    through.objects.filter(**{"%s_id__in" % approval_meta_field_name: list(related_ids)}).delete()
+    through.objects.bulk_create([
+        through(**{"%s_id" % approval_meta_field_name: approval_meta_id, "%s_id" % related_field_name: related_id})
+        for approval_meta_id, ids in related_ids.items()
+        for related_id in OrderedDict.fromkeys(ids)
+    ])
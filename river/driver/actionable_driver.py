@@ -0,0 +1,31 @@
+from django.db.models import Q
+
+from river.core.authorizationcontext import authorization_context_cache
+from river.driver.river_driver import RiverDriver
+from river.models import TransitionApproval, ActionableApproval
+
+
+class ActionableApprovalDriver(RiverDriver):
+    """
+    Looks the available approvals up in the actionable approvals table instead of computing them. It is used on any
+    database when ``RIVER_ACTIONABLE_APPROVALS`` is enabled.
+    """
+
+    def get_available_approvals(self, as_user):
+        authorization_context = authorization_context_cache.get(as_user)
+
+        permission_q = Q(permission__isnull=True)
+        if authorization_context.permission_ids:
+            permission_q = permission_q | Q(permission__in=authorization_context.permission_ids)
+
+        group_q = Q(group__isnull=True)
+        if authorization_context.group_ids:
+            group_q = group_q | Q(group__in=authorization_context.group_ids)
+
+        actionable_approvals = ActionableApproval.objects.filter(
+            Q(workflow=self.workflow) &
+            (Q(transactioner__isnull=True) | Q(transactioner=as_user)) &
+            permission_q &
+            group_q
+        )
+        return TransitionApproval.objects.filter(pk__in=actionable_approvals.values("transition_approval_id"))
@@ -3,8 +3,9 @@ from os.path import dirname
 
 import six
 from django.db import connection
-from django.contrib.auth.models import Permission
+from django.db.models.expressions import RawSQL
 
+from river.core.authorizationcontext import authorization_context_cache
 from river.driver.river_driver import RiverDriver
 from river.models import TransitionApproval
 
@@ -18,27 +19,24 @@ class MsSqlDriver(RiverDriver):
         self.cursor = connection.cursor()
 
     def get_available_approvals(self, as_user):
-        with connection.cursor() as cursor:
-            cursor.execute(self._clean_sql % {
-                "workflow_id": self.workflow.pk,
-                "transactioner_id": as_user.pk,
-                "field_name": self.field_name,
-                "permission_ids": self._permission_ids_str(as_user),
-                "group_ids": self._group_ids_str(as_user),
-                "workflow_object_table": self.wokflow_object_class._meta.db_table,
-                "object_pk_name": self.wokflow_object_class._meta.pk.name
-            })
-
-            return TransitionApproval.objects.filter(pk__in=[row[0] for row in cursor.fetchall()])
+        return TransitionApproval.objects.filter(pk__in=RawSQL(self._clean_sql % {
+            "workflow_id": self.workflow.pk,
+            "transactioner_id": as_user.pk,
+            "field_name": self.field_name,
+            "permission_ids": self._permission_ids_str(as_user),
+            "group_ids": self._group_ids_str(as_user),
+            "workflow_object_table": self.wokflow_object_class._meta.db_table,
+            "object_pk_name": self.wokflow_object_class._meta.pk.name,
+            "object_id_column": self.typed_object_id_field_name or "object_id"
+        }, []))
 
     @staticmethod
     def _permission_ids_str(as_user):
-        permissions = as_user.user_permissions.all() | Permission.objects.filter(group__user=as_user)
-        return ",".join(list(six.moves.map(str, permissions.values_list("pk", flat=True))) or ["-1"])
+        return ",".join(list(six.moves.map(str, sorted(authorization_context_cache.get(as_user).permission_ids))) or ["-1"])
 
     @staticmethod
     def _group_ids_str(as_user):
-        return ",".join(list(six.moves.map(str, as_user.groups.all().values_list("pk", flat=True))) or ["-1"])
+        return ",".join(list(six.moves.map(str, sorted(authorization_context_cache.get(as_user).group_ids))) or ["-1"])
 
     @property
     def _clean_sql(self):
@@ -49,4 +47,5 @@ class MsSqlDriver(RiverDriver):
             .replace("'%(permission_ids)s'", "%(permission_ids)s") \
             .replace("'%(group_ids)s'", "%(group_ids)s") \
             .replace("'%(workflow_object_table)s'", "%(workflow_object_table)s") \
-            .replace("'%(object_pk_name)s'", "%(object_pk_name)s")
+            .replace("'%(object_pk_name)s'", "%(object_pk_name)s") \
+            .replace("'%(object_id_column)s'", "%(object_id_column)s")
@@ -1,8 +1,8 @@
-from django.contrib import auth
 from django.db.models import Min, CharField, Q, F
 from django.db.models.functions import Cast
 from django_cte import With
 
+from river.core.authorizationcontext import authorization_context_cache
 from river.driver.river_driver import RiverDriver
 from river.models import TransitionApproval, PENDING
 
@@ -31,36 +31,40 @@ class OrmDriver(RiverDriver):
         ).with_cte(
             those_with_max_priority
         ).annotate(
-            object_id_as_str=Cast('object_id', CharField(max_length=200)),
             min_priority=those_with_max_priority.col.min_priority
         ).filter(min_priority=F("priority"))
 
-        return workflow_objects.join(
-            approvals_with_max_priority, object_id_as_str=Cast(workflow_objects.col.pk, CharField(max_length=200))
-        ).with_cte(
+        typed_object_id_field_name = self.typed_object_id_field_name
+        if typed_object_id_field_name:
+            approvals_of_workflow_objects = workflow_objects.join(
+                approvals_with_max_priority, **{typed_object_id_field_name: workflow_objects.col.pk}
+            )
+        else:
+            approvals_of_workflow_objects = workflow_objects.join(
+                approvals_with_max_priority.annotate(object_id_as_str=Cast('object_id', CharField(max_length=200))),
+                object_id_as_str=Cast(workflow_objects.col.pk, CharField(max_length=200))
+            )
+
+        return approvals_of_workflow_objects.with_cte(
             workflow_objects
         ).filter(transition__source_state=getattr(workflow_objects.col, self.field_name + "_id"))
 
     def _authorized_approvals(self, as_user):
-        group_q = Q()
-        for g in as_user.groups.all():
-            group_q = group_q | Q(groups__in=[g])
+        authorization_context = authorization_context_cache.get(as_user)
 
-        permissions = []
-        for backend in auth.get_backends():
-            permissions.extend(backend.get_all_permissions(as_user))
+        permission_q = Q(permissions__isnull=True)
+        if authorization_context.permission_ids:
+            permission_q = permission_q | Q(permissions__in=authorization_context.permission_ids)
 
-        permission_q = Q()
-        for p in permissions:
-            label, codename = p.split('.')
-            permission_q = permission_q | Q(permissions__content_type__app_label=label,
-                                            permissions__codename=codename)
+        group_q = Q(groups__isnull=True)
+        if authorization_context.group_ids:
+            group_q = group_q | Q(groups__in=authorization_context.group_ids)
 
         return TransitionApproval.objects.filter(
             Q(workflow=self.workflow, status=PENDING) &
             (
                     (Q(transactioner__isnull=True) | Q(transactioner=as_user)) &
-                    (Q(permissions__isnull=True) | permission_q) &
-                    (Q(groups__isnull=True) | group_q)
+                    permission_q &
+                    group_q
             )
         )
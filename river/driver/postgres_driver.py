@@ -0,0 +1,52 @@
+import os
+from os.path import dirname
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from river.config import app_config
+from river.core.authorizationcontext import authorization_context_cache
+from river.driver.river_driver import RiverDriver
+from river.models import TransitionApproval, PENDING
+
+
+class PostgresDriver(RiverDriver):
+
+    def __init__(self, *args, **kwargs):
+        super(PostgresDriver, self).__init__(*args, **kwargs)
+        with open(os.path.join(dirname(dirname(__file__)), "sql", "postgresql", "get_available_approvals.sql")) as f:
+            self.available_approvals_sql = f.read() % self._identifiers()
+
+    def get_available_approvals(self, as_user):
+        authorization_context = authorization_context_cache.get(as_user)
+        return TransitionApproval.objects.filter(pk__in=RawSQL(self.available_approvals_sql, [
+            self.workflow.pk,
+            PENDING,
+            as_user.pk,
+            sorted(authorization_context.permission_ids),
+            sorted(authorization_context.group_ids),
+        ]))
+
+    def _identifiers(self):
+        quote_name = connection.ops.quote_name
+        object_pk = self.wokflow_object_class._meta.pk
+        permissions = TransitionApproval._meta.get_field("permissions")
+        groups = TransitionApproval._meta.get_field("groups")
+        if self.typed_object_id_field_name:
+            object_id_expression = "approval.%s" % self.typed_object_id_field_name
+        else:
+            object_id_expression = "CAST(approval.object_id AS %s)" % object_pk.rel_db_type(connection)
+        return {
+            "workflow_object_table": quote_name(self.wokflow_object_class._meta.db_table),
+            "object_pk_column": quote_name(object_pk.column),
+            "object_id_expression": object_id_expression,
+            "state_column": quote_name(self.wokflow_object_class._meta.get_field(self.field_name).column),
+            "permissions_table": quote_name(permissions.remote_field.through._meta.db_table),
+            "permissions_source_column": quote_name(permissions.m2m_column_name()),
+            "permissions_target_column": quote_name(permissions.m2m_reverse_name()),
+            "permission_pk_type": app_config.PERMISSION_CLASS._meta.pk.rel_db_type(connection),
+            "groups_table": quote_name(groups.remote_field.through._meta.db_table),
+            "groups_source_column": quote_name(groups.m2m_column_name()),
+            "groups_target_column": quote_name(groups.m2m_reverse_name()),
+            "group_pk_type": app_config.GROUP_CLASS._meta.pk.rel_db_type(connection),
+        }
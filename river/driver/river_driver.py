@@ -1,5 +1,7 @@
 from abc import abstractmethod
 
+from river.utils.typedobjectid import typed_object_id_field_name
+
 
 class RiverDriver(object):
 
@@ -8,6 +10,7 @@ class RiverDriver(object):
         self.wokflow_object_class = wokflow_object_class
         self.field_name = field_name
         self._cached_workflow = None
+        self.typed_object_id_field_name = typed_object_id_field_name(wokflow_object_class)
 
     @abstractmethod
     def get_available_approvals(self, as_user):
@@ -0,0 +1,17 @@
+from django.core.management import BaseCommand
+
+from river.config import app_config
+from river.models import Transition, TransitionApproval
+from river.utils.typedobjectid import backfill_typed_object_ids
+
+
+class Command(BaseCommand):
+    help = "Fills the typed object id columns of the transitions and the transition approvals which don't have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Number of rows updated at once for the UUID primary keys.")
+
+    def handle(self, *args, **options):
+        for model in [Transition, TransitionApproval]:
+            filled = backfill_typed_object_ids(model, app_config.CONTENT_TYPE_CLASS, lambda content_type: content_type.model_class(), options['batch_size'])
+            self.stdout.write("%s rows of %s are backfilled." % (filled, model.__name__))
@@ -0,0 +1,48 @@
+import json
+
+from django.apps import apps
+from django.core.management import BaseCommand, CommandError
+
+from river.core.benchmark import WorkflowBenchmark
+from river.models import Workflow
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the core workflow API on a synthetic workflow and prints a JSON report. The database is left as it is."
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help="The workflow model as app_label.ModelName. It shouldn't have a workflow for the field yet.")
+        parser.add_argument('field_name', help="The state field of the workflow model.")
+        parser.add_argument('--states', type=int, default=5)
+        parser.add_argument('--branching', type=int, default=2, help="Number of transitions going out of a state.")
+        parser.add_argument('--approvals', type=int, default=1, help="Number of approvals per transition.")
+        parser.add_argument('--cycles', action='store_true', help="Add a transition from the last state back to the initial state.")
+        parser.add_argument('--objects', type=int, default=100)
+        parser.add_argument('--output', help="Write the report into this file instead of the standard output.")
+
+    def handle(self, *args, **options):
+        try:
+            model_class = apps.get_model(options['model'])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if Workflow.objects.filter(content_type__app_label=model_class._meta.app_label, content_type__model=model_class._meta.model_name,
+                                   field_name=options['field_name']).exists():
+            raise CommandError("There is already a workflow for %s.%s" % (options['model'], options['field_name']))
+
+        report = WorkflowBenchmark(
+            model_class,
+            options['field_name'],
+            states=options['states'],
+            branching=options['branching'],
+            approvals_per_transition=options['approvals'],
+            cycles=options['cycles'],
+            objects=options['objects'],
+        ).run()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,86 @@
+import datetime
+import io
+import os
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+
+from river.config import app_config
+from river.core.historyexport import export_history, TABLES, APPROVALS, FORMATS, CSV, JSON_LINES, DATE_UPDATED, EXPORT_CHUNK_SIZE
+from river.models import Workflow
+
+EXTENSION_FORMATS = {".csv": CSV, ".jsonl": JSON_LINES}
+
+
+class Command(BaseCommand):
+    help = "Streams the approval or the transition history to CSV or JSON Lines with bounded memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--table', choices=TABLES, default=APPROVALS, help="History table to export.")
+        parser.add_argument('--format', choices=FORMATS, help="Output format. It is picked by the extension of the output file, .csv or .jsonl, by default.")
+        parser.add_argument('--output', help="File to write to instead of the standard output.")
+        parser.add_argument('--workflow', type=int, help="Only export the rows of the workflow with this id.")
+        parser.add_argument('--content-type', help="Only export the rows of the workflow objects of this model, in app_label.model format.")
+        parser.add_argument('--since', help="Only export the rows whose date is on or after this date or date time.")
+        parser.add_argument('--until', help="Only export the rows whose date is before this date or date time.")
+        parser.add_argument('--date-field', default=DATE_UPDATED, help="Date field that --since and --until are compared with.")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help="Number of rows fetched from the database at a time.")
+
+    def handle(self, *args, **options):
+        filters = {
+            "since": self._parse_date(options['since'], "--since"),
+            "until": self._parse_date(options['until'], "--until"),
+            "date_field": options['date_field'],
+            "chunk_size": options['chunk_size'],
+        }
+        if options['workflow']:
+            try:
+                filters["workflow"] = Workflow.objects.get(pk=options['workflow'])
+            except Workflow.DoesNotExist:
+                raise CommandError("Workflow %s does not exist." % options['workflow'])
+        if options['content_type']:
+            try:
+                filters["content_type"] = app_config.CONTENT_TYPE_CLASS.objects.get_by_natural_key(*options['content_type'].split(".", 1))
+            except (app_config.CONTENT_TYPE_CLASS.DoesNotExist, TypeError):
+                raise CommandError("Content type %s does not exist." % options['content_type'])
+
+        output_format = self._get_format(options['format'], options['output'])
+        try:
+            if options['output']:
+                with io.open(options['output'], "w", encoding="utf-8", newline="") as output:
+                    count = export_history(output, options['table'], output_format, **filters)
+                self.stderr.write("%s rows are exported to %s." % (count, options['output']))
+            else:
+                export_history(self.stdout, options['table'], output_format, **filters)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+    @staticmethod
+    def _get_format(output_format, output):
+        if output_format:
+            return output_format
+        if not output:
+            return CSV
+        extension = os.path.splitext(output)[1].lower()
+        if extension not in EXTENSION_FORMATS:
+            raise CommandError("Format of %s can not be told by its extension. It should be given with --format." % output)
+        return EXTENSION_FORMATS[extension]
+
+    @staticmethod
+    def _parse_date(value, option):
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                date = parse_date(value)
+                parsed = datetime.datetime(date.year, date.month, date.day) if date else None
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise CommandError("%s should be a date or a date time in ISO 8601 format." % option)
+        if settings.USE_TZ and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
@@ -0,0 +1,29 @@
+import io
+
+from django.core.management import BaseCommand
+
+from river.core.workflowspec import export_workflows, dumps, format_of, FORMATS
+from river.models import Workflow
+
+
+class Command(BaseCommand):
+    help = "Exports the workflow definitions as a workflow spec in JSON or YAML."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workflow', type=int, action='append', help="Only export the workflow with this id. It can be given more than once.")
+        parser.add_argument('--format', choices=FORMATS, help="Format of the spec. It is picked by the extension of the output file by default.")
+        parser.add_argument('--output', help="File to write the spec to instead of the standard output.")
+
+    def handle(self, *args, **options):
+        workflows = Workflow.objects.all()
+        if options['workflow']:
+            workflows = workflows.filter(pk__in=options['workflow'])
+
+        spec_format = options['format'] or format_of(options['output'] or "")
+        content = dumps(export_workflows(workflows), spec_format)
+        if options['output']:
+            with io.open(options['output'], "w", encoding="utf-8") as output:
+                output.write(content)
+            self.stdout.write("%s workflows are exported to %s." % (len(workflows), options['output']))
+        else:
+            self.stdout.write(content)
@@ -0,0 +1,34 @@
+import io
+import sys
+
+from django.core.management import BaseCommand, CommandError
+
+from river.core.workflowspec import import_workflows, loads, format_of, FORMATS
+from river.utils.exceptions import RiverException
+
+
+class Command(BaseCommand):
+    help = "Imports the workflow definitions from a workflow spec in JSON or YAML in a single transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to read the spec from. Give - to read it from the standard input.")
+        parser.add_argument('--format', choices=FORMATS, help="Format of the spec. It is picked by the extension of the file by default.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if path == "-":
+            content = sys.stdin.read()
+        else:
+            with io.open(path, encoding="utf-8") as spec_file:
+                content = spec_file.read()
+
+        try:
+            spec = loads(content, options['format'] or format_of(path))
+        except ValueError as e:
+            raise CommandError("The workflow spec could not be parsed. %s" % e)
+
+        try:
+            workflows = import_workflows(spec)
+        except RiverException as e:
+            raise CommandError(str(e))
+        self.stdout.write("%s workflows are imported." % len(workflows))
@@ -0,0 +1,67 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Min, QuerySet
+
+from river.models import Workflow, Transition, TransitionApproval, PENDING
+from river.utils.typedobjectid import object_id_filter
+
+RIVER_INDEX_NAMES = [index.name for model in [Transition, TransitionApproval] for index in model._meta.indexes]
+
+
+def hot_queries(workflow, object_id):
+    """
+    The queries which are issued the most while workflow objects are approved, for one workflow and one of its
+    workflow objects.
+    """
+    model_class = workflow.content_type.model_class()
+    of_object = object_id_filter(model_class, object_id)
+    return [
+        ("min priority of pending approvals", TransitionApproval.objects.filter(
+            workflow=workflow, status=PENDING
+        ).values("workflow", "object_id", "transition").annotate(min_priority=Min("priority"))),
+        ("pending approvals of an object", TransitionApproval.objects.filter(workflow=workflow, status=PENDING, **of_object)),
+        ("recent approval", TransitionApproval.objects.filter(
+            content_type=workflow.content_type, object_id=object_id, transaction_date__isnull=False
+        ).order_by("-transaction_date")[:1]),
+        ("pending transitions of an object", Transition.objects.filter(workflow=workflow, status=PENDING, iteration__gte=0, **of_object)),
+        ("next transitions of an object", Transition.objects.filter(workflow=workflow, status=PENDING, source_state=workflow.initial_state, **of_object)),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Explains the hot queries of django-river and reports which of its indexes the query planner uses."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workflow', type=int, help="Only report the workflow with this id.")
+        parser.add_argument('--format', choices=['text', 'json'], default='text')
+
+    def handle(self, *args, **options):
+        if not hasattr(QuerySet, "explain"):
+            raise CommandError("The query plans can only be reported as of Django 2.1 which brings QuerySet.explain.")
+
+        workflows = Workflow.objects.select_related("content_type", "initial_state").order_by("pk")
+        if options['workflow']:
+            workflows = workflows.filter(pk=options['workflow'])
+
+        report = []
+        for workflow in workflows:
+            object_id = Transition.objects.filter(workflow=workflow).values_list("object_id", flat=True).first()
+            if object_id is None:
+                continue
+            for name, queryset in hot_queries(workflow, object_id):
+                plan = queryset.explain()
+                report.append({
+                    "workflow": workflow.pk,
+                    "query": name,
+                    "indexes": [index_name for index_name in RIVER_INDEX_NAMES if index_name in plan],
+                    "plan": plan,
+                })
+
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for entry in report:
+                self.stdout.write("[workflow %s] %s: %s" % (entry["workflow"], entry["query"], ", ".join(entry["indexes"]) or "no river index is used"))
+                for line in entry["plan"].splitlines():
+                    self.stdout.write("    %s" % line)
@@ -0,0 +1,23 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from river.core.actionableapprovals import rebuild_actionable_approvals, REBUILD_BATCH_SIZE
+from river.models import Workflow
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the actionable approvals table from the pending approvals to fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workflow', type=int, help="Only rebuild the workflow with this id.")
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE, help="Number of workflow objects processed at once.")
+
+    def handle(self, *args, **options):
+        workflows = Workflow.objects.select_related("content_type").order_by("pk")
+        if options['workflow']:
+            workflows = workflows.filter(pk=options['workflow'])
+
+        for workflow in workflows:
+            with transaction.atomic():
+                rebuilt = rebuild_actionable_approvals(workflow, options['batch_size'])
+            self.stdout.write("Actionable approvals of %s objects are rebuilt for the workflow %s." % (rebuilt, workflow.pk))
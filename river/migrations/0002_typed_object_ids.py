@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from river.utils.typedobjectid import backfill_typed_object_ids
+
+
+def backfill(apps, schema_editor):
+    content_type_class = apps.get_model('contenttypes', 'ContentType')
+
+    def get_model_class(content_type):
+        try:
+            return apps.get_model(content_type.app_label, content_type.model)
+        except LookupError:
+            return None
+
+    for model_name in ['Transition', 'TransitionApproval']:
+        backfill_typed_object_ids(apps.get_model('river', model_name), content_type_class, get_model_class)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('river', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transition',
+            name='object_id_int',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Related Object (Integer)'),
+        ),
+        migrations.AddField(
+            model_name='transition',
+            name='object_id_uuid',
+            field=models.UUIDField(blank=True, editable=False, null=True, verbose_name='Related Object (UUID)'),
+        ),
+        migrations.AddField(
+            model_name='transitionapproval',
+            name='object_id_int',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Related Object (Integer)'),
+        ),
+        migrations.AddField(
+            model_name='transitionapproval',
+            name='object_id_uuid',
+            field=models.UUIDField(blank=True, editable=False, null=True, verbose_name='Related Object (UUID)'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
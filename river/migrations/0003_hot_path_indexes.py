@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import Q
+
+from river.utils.indexes import partial_indexes
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('river', '0002_typed_object_ids'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transitionapproval',
+            index=models.Index(fields=['workflow', 'status', 'transition', 'priority'], name='river_ta_wf_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transitionapproval',
+            index=models.Index(fields=['workflow', 'object_id_int', 'status'], name='river_ta_obj_int_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transitionapproval',
+            index=models.Index(fields=['workflow', 'object_id_uuid', 'status'], name='river_ta_obj_uuid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transitionapproval',
+            index=models.Index(fields=['content_type', 'object_id', 'transaction_date'], name='river_ta_obj_tx_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transition',
+            index=models.Index(fields=['workflow', 'object_id_int', 'status', 'iteration'], name='river_tr_obj_int_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transition',
+            index=models.Index(fields=['workflow', 'object_id_uuid', 'status', 'iteration'], name='river_tr_obj_uuid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transition',
+            index=models.Index(fields=['content_type', 'object_id', 'iteration'], name='river_tr_obj_iter_idx'),
+        ),
+    ] + [
+        migrations.AddIndex(model_name=model_name, index=index)
+        for model_name, index in zip(['transitionapproval', 'transition'], partial_indexes([
+            dict(fields=['workflow', 'transition', 'priority'], name='river_ta_pending_idx', condition=Q(status='pending')),
+            dict(fields=['workflow', 'source_state', 'object_id_int'], name='river_tr_pending_idx', condition=Q(status='pending')),
+        ]))
+    ]
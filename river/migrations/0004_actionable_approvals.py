@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('auth', '0008_alter_user_username_max_length'),
+        ('river', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActionableApproval',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.CharField(max_length=50, verbose_name='Related Object')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.ContentType', verbose_name='Content Type')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='auth.Group', verbose_name='Group')),
+                ('permission', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='auth.Permission', verbose_name='Permission')),
+                ('transactioner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Transactioner')),
+                ('transition_approval', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='actionable_approvals', to='river.TransitionApproval', verbose_name='Transition Approval')),
+                ('workflow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='river.Workflow', verbose_name='Workflow')),
+            ],
+            options={
+                'verbose_name': 'Actionable Approval',
+                'verbose_name_plural': 'Actionable Approvals',
+                'db_table': 'river_actionable_approval',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='actionableapproval',
+            index=models.Index(fields=['workflow', 'permission', 'group'], name='river_aa_wf_auth_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actionableapproval',
+            index=models.Index(fields=['workflow', 'content_type', 'object_id'], name='river_aa_wf_obj_idx'),
+        ),
+    ]
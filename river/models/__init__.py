@@ -9,3 +9,4 @@ from .function import *
 from .on_approved_hook import *
 from .on_transit_hook import *
 from .on_complete_hook import *
+from .actionableapproval import *
@@ -0,0 +1,33 @@
+from django.db import models
+from django.db.models import CASCADE
+from django.utils.translation import ugettext_lazy as _
+
+from river.config import app_config
+from river.models import Workflow
+from river.models.transitionapproval import TransitionApproval
+
+
+class ActionableApproval(models.Model):
+    """
+    A denormalized row per approval which can be approved right now, which is pending, has the highest priority of its
+    transition and goes out of the current state of its object, and per permission and group combination of it. It is
+    only maintained when ``RIVER_ACTIONABLE_APPROVALS`` is enabled.
+    """
+
+    class Meta:
+        app_label = 'river'
+        db_table = 'river_actionable_approval'
+        verbose_name = _("Actionable Approval")
+        verbose_name_plural = _("Actionable Approvals")
+        indexes = [
+            models.Index(fields=['workflow', 'permission', 'group'], name='river_aa_wf_auth_idx'),
+            models.Index(fields=['workflow', 'content_type', 'object_id'], name='river_aa_wf_obj_idx'),
+        ]
+
+    workflow = models.ForeignKey(Workflow, verbose_name=_("Workflow"), related_name='+', on_delete=CASCADE)
+    content_type = models.ForeignKey(app_config.CONTENT_TYPE_CLASS, verbose_name=_('Content Type'), related_name='+', on_delete=CASCADE)
+    object_id = models.CharField(max_length=50, verbose_name=_('Related Object'))
+    transition_approval = models.ForeignKey(TransitionApproval, verbose_name=_("Transition Approval"), related_name='actionable_approvals', on_delete=CASCADE)
+    transactioner = models.ForeignKey(app_config.USER_CLASS, verbose_name=_('Transactioner'), related_name='+', null=True, blank=True, on_delete=CASCADE)
+    permission = models.ForeignKey(app_config.PERMISSION_CLASS, verbose_name=_('Permission'), related_name='+', null=True, blank=True, on_delete=CASCADE)
+    group = models.ForeignKey(app_config.GROUP_CLASS, verbose_name=_('Group'), related_name='+', null=True, blank=True, on_delete=CASCADE)
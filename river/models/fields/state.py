@@ -4,7 +4,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.db.models import CASCADE
 from django.db.models.signals import post_save, post_delete
 
-from river.core.riverobject import RiverObject
+from river.core.riverobject import RiverObject, forget_instance_workflows
 from river.core.workflowregistry import workflow_registry
 from river.models import OnApprovedHook, OnTransitHook, OnCompleteHook
 
@@ -43,7 +43,7 @@ class StateField(models.ForeignKey):
     def contribute_to_class(self, cls, name, *args, **kwargs):
         @classproperty
         def river(_self):
-            return RiverObject(_self)
+            return RiverObject.of(_self)
 
         self.field_name = name
 
@@ -62,6 +62,11 @@ class StateField(models.ForeignKey):
 
         workflow_registry.add(self.field_name, cls)
 
+    def delete_cached_value(self, instance):
+        # Django drops the cached state of a workflow object when it is refreshed from the database.
+        super(StateField, self).delete_cached_value(instance)
+        forget_instance_workflows(instance)
+
     @staticmethod
     def _add_to_class(cls, key, value, ignore_exists=False):
         if ignore_exists or not hasattr(cls, key):
@@ -69,13 +74,14 @@ class StateField(models.ForeignKey):
 
 
 def _on_workflow_object_saved(sender, instance, created, *args, **kwargs):
+    if not created:
+        return
     for instance_workflow in instance.river.all(instance.__class__):
-        if created:
-            instance_workflow.initialize_approvals()
-            if not instance_workflow.get_state():
-                init_state = getattr(instance.__class__.river, instance_workflow.field_name).initial_state
-                instance_workflow.set_state(init_state)
-                instance.save()
+        instance_workflow.initialize_approvals()
+        if not instance_workflow.get_state():
+            init_state = getattr(instance.__class__.river, instance_workflow.field_name).initial_state
+            instance_workflow.set_state(init_state)
+            instance_workflow.save_state()
 
 
 def _on_workflow_object_deleted(sender, instance, *args, **kwargs):
@@ -1,13 +1,17 @@
 import inspect
 import re
+import threading
+from collections import OrderedDict
 
 from django.db import models
-from django.db.models.signals import pre_save
+from django.db.models.signals import pre_save, post_delete
 from django.utils.translation import ugettext_lazy as _
 
+from river.config import app_config
 from river.models import BaseModel
 
-loaded_functions = {}
+loaded_functions = OrderedDict()
+loaded_functions_lock = threading.Lock()
 
 
 class Function(BaseModel):
@@ -19,26 +23,59 @@ class Function(BaseModel):
         return "%s - %s" % (self.name, "v%s" % self.version)
 
     def get(self):
-        func = loaded_functions.get(self.name, None)
-        if not func or func["version"] != self.version:
-            func = {"function": self._load(), "version": self.version}
-            loaded_functions[self.pk] = func
-        return func["function"]
+        if self.pk is None:
+            return self._load()
+
+        key = (self.pk, self.version)
+        with loaded_functions_lock:
+            loaded = loaded_functions.pop(key, None)
+            if loaded:
+                loaded_functions[key] = loaded
+        # A primary key and a version can be given to another function once the transaction that has created the
+        # cached one is rolled back, so the body is compared too.
+        if loaded and loaded[0] == self.body:
+            func = loaded[1]
+        else:
+            func = self._load()
+            with loaded_functions_lock:
+                loaded_functions[key] = (self.body, func)
+                while len(loaded_functions) > app_config.FUNCTION_CACHE_SIZE:
+                    loaded_functions.popitem(last=False)
+        return func
 
     def _load(self):
         func_body = "def _wrapper(context):\n"
         for line in self.body.split("\n"):
             func_body += "\t" + line + "\n"
         func_body += "\thandle(context)\n"
-        exec(func_body)
-        return eval("_wrapper")
+        namespace = {}
+        exec(compile(func_body, "<river function %s>" % self.name, "exec"), namespace)
+        return namespace["_wrapper"]
+
+
+def clear_loaded_functions():
+    with loaded_functions_lock:
+        loaded_functions.clear()
+
+
+def evict_function(function_id):
+    with loaded_functions_lock:
+        for key in [key for key in loaded_functions if key[0] == function_id]:
+            del loaded_functions[key]
 
 
 def on_pre_save(sender, instance, *args, **kwargs):
+    if instance.pk is not None:
+        evict_function(instance.pk)
     instance.version += 1
 
 
+def on_post_delete(sender, instance, *args, **kwargs):
+    evict_function(instance.pk)
+
+
 pre_save.connect(on_pre_save, Function)
+post_delete.connect(on_post_delete, Function)
 
 
 def _normalize_callback(callback):
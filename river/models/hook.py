@@ -5,6 +5,7 @@ from django.db import models
 from django.db.models import PROTECT
 from django.utils.translation import ugettext_lazy as _
 
+from river.core.instrumentation import instrumented, EXECUTE_HOOK
 from river.models import Workflow, GenericForeignKey, BaseModel
 from river.models.function import Function
 
@@ -32,6 +33,7 @@ class Hook(BaseModel):
 
     hook_type = models.CharField(_('When?'), choices=HOOK_TYPES, max_length=50)
 
+    @instrumented(EXECUTE_HOOK)
     def execute(self, context):
         try:
             self.callback_function.get()(context)
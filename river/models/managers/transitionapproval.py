@@ -2,6 +2,7 @@ from django_cte import CTEManager
 
 from river.config import app_config
 from river.models.managers.rivermanager import RiverManager
+from river.utils.typedobjectid import object_id_filter
 
 
 class TransitionApprovalManager(RiverManager if app_config.IS_MSSQL else CTEManager):
@@ -12,7 +13,7 @@ class TransitionApprovalManager(RiverManager if app_config.IS_MSSQL else CTEMana
         workflow_object = kwarg.pop('workflow_object', None)
         if workflow_object:
             kwarg['content_type'] = app_config.CONTENT_TYPE_CLASS.objects.get_for_model(workflow_object)
-            kwarg['object_id'] = workflow_object.pk
+            kwarg.update(object_id_filter(workflow_object.__class__, workflow_object.pk))
 
         return super(TransitionApprovalManager, self).filter(*args, **kwarg)
 
@@ -1,6 +1,6 @@
 import logging
 
-from django.db.models import CASCADE, PROTECT
+from django.db.models import CASCADE, PROTECT, Q
 
 from river.models import State, Workflow, TransitionMeta
 
@@ -10,11 +10,14 @@ except ImportError:
     from django.contrib.contenttypes.generic import GenericForeignKey
 
 from django.db import models
+from django.db.models.signals import pre_save
 from django.utils.translation import ugettext_lazy as _
 
 from river.models.base_model import BaseModel
 from river.models.managers.transitionapproval import TransitionApprovalManager
 from river.config import app_config
+from river.utils import typedobjectid
+from river.utils.indexes import partial_indexes
 
 PENDING = "pending"
 CANCELLED = "cancelled"
@@ -36,10 +39,19 @@ class Transition(BaseModel):
         app_label = 'river'
         verbose_name = _("Transition")
         verbose_name_plural = _("Transitions")
+        indexes = [
+            models.Index(fields=['workflow', 'object_id_int', 'status', 'iteration'], name='river_tr_obj_int_idx'),
+            models.Index(fields=['workflow', 'object_id_uuid', 'status', 'iteration'], name='river_tr_obj_uuid_idx'),
+            models.Index(fields=['content_type', 'object_id', 'iteration'], name='river_tr_obj_iter_idx'),
+        ] + partial_indexes([
+            dict(fields=['workflow', 'source_state', 'object_id_int'], name='river_tr_pending_idx', condition=Q(status=PENDING)),
+        ])
 
     objects = TransitionApprovalManager()
     content_type = models.ForeignKey(app_config.CONTENT_TYPE_CLASS, verbose_name=_('Content Type'), on_delete=CASCADE)
     object_id = models.CharField(max_length=50, verbose_name=_('Related Object'))
+    object_id_int = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name=_('Related Object (Integer)'))
+    object_id_uuid = models.UUIDField(null=True, blank=True, editable=False, verbose_name=_('Related Object (UUID)'))
     workflow_object = GenericForeignKey('content_type', 'object_id')
 
     meta = models.ForeignKey(TransitionMeta, verbose_name=_('Meta'), related_name="transitions", on_delete=PROTECT)
@@ -68,3 +80,6 @@ class Transition(BaseModel):
             source_state=self.source_state,
             iteration=self.iteration
         ).exclude(pk=self.pk)
+
+
+pre_save.connect(typedobjectid.on_pre_save, Transition)
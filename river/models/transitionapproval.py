@@ -1,6 +1,6 @@
 import logging
 
-from django.db.models import CASCADE, PROTECT, SET_NULL
+from django.db.models import CASCADE, PROTECT, SET_NULL, Q
 from mptt.fields import TreeOneToOneField
 
 from river.models import TransitionApprovalMeta, Workflow
@@ -12,11 +12,14 @@ except ImportError:
     from django.contrib.contenttypes.generic import GenericForeignKey
 
 from django.db import models
+from django.db.models.signals import pre_save
 from django.utils.translation import ugettext_lazy as _
 
 from river.models.base_model import BaseModel
 from river.models.managers.transitionapproval import TransitionApprovalManager
 from river.config import app_config
+from river.utils import typedobjectid
+from river.utils.indexes import partial_indexes
 
 PENDING = "pending"
 APPROVED = "approved"
@@ -38,12 +41,22 @@ class TransitionApproval(BaseModel):
         app_label = 'river'
         verbose_name = _("Transition Approval")
         verbose_name_plural = _("Transition Approvals")
+        indexes = [
+            models.Index(fields=['workflow', 'status', 'transition', 'priority'], name='river_ta_wf_status_idx'),
+            models.Index(fields=['workflow', 'object_id_int', 'status'], name='river_ta_obj_int_idx'),
+            models.Index(fields=['workflow', 'object_id_uuid', 'status'], name='river_ta_obj_uuid_idx'),
+            models.Index(fields=['content_type', 'object_id', 'transaction_date'], name='river_ta_obj_tx_date_idx'),
+        ] + partial_indexes([
+            dict(fields=['workflow', 'transition', 'priority'], name='river_ta_pending_idx', condition=Q(status=PENDING)),
+        ])
 
     objects = TransitionApprovalManager()
 
     content_type = models.ForeignKey(app_config.CONTENT_TYPE_CLASS, verbose_name=_('Content Type'), on_delete=CASCADE)
 
     object_id = models.CharField(max_length=50, verbose_name=_('Related Object'))
+    object_id_int = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name=_('Related Object (Integer)'))
+    object_id_uuid = models.UUIDField(null=True, blank=True, editable=False, verbose_name=_('Related Object (UUID)'))
     workflow_object = GenericForeignKey('content_type', 'object_id')
 
     meta = models.ForeignKey(TransitionApprovalMeta, verbose_name=_('Meta'), related_name="transition_approvals", null=True, blank=True, on_delete=SET_NULL)
@@ -69,3 +82,6 @@ class TransitionApproval(BaseModel):
             workflow=self.workflow,
             transition=self.transition,
         ).exclude(pk=self.pk)
+
+
+pre_save.connect(typedobjectid.on_pre_save, TransitionApproval)
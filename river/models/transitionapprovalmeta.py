@@ -38,22 +38,8 @@ class TransitionApprovalMeta(BaseModel):
 
 
 def post_save_model(sender, instance, *args, **kwargs):
-    parents = TransitionApprovalMeta.objects \
-        .filter(workflow=instance.workflow, transition_meta__destination_state=instance.transition_meta.source_state) \
-        .exclude(pk__in=instance.parents.values_list('pk', flat=True)) \
-        .exclude(pk=instance.pk)
-
-    children = TransitionApprovalMeta.objects \
-        .filter(workflow=instance.workflow, transition_meta__source_state=instance.transition_meta.destination_state) \
-        .exclude(parents__in=[instance.pk]) \
-        .exclude(pk=instance.pk)
-
-    instance = TransitionApprovalMeta.objects.get(pk=instance.pk)
-    if parents:
-        instance.parents.add(*parents)
-
-    for child in children:
-        child.parents.add(instance)
+    from river.core.approvalmetagraph import on_approval_meta_saved
+    on_approval_meta_saved(instance)
 
 
 @transaction.atomic
@@ -1,10 +1,12 @@
 import logging
+from collections import defaultdict
 
-from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
+from django.db.models import Q, Value, CharField
 from django.dispatch import Signal
 
-from river.models import Workflow
+from river.core.hookexecutor import hook_executor
+from river.core.hookregistry import hook_registry
+from river.models import Function
 from river.models.hook import BEFORE, AFTER
 from river.models.on_approved_hook import OnApprovedHook
 from river.models.on_complete_hook import OnCompleteHook
@@ -22,50 +24,116 @@ post_approve = Signal(providing_args=["workflow_object", "field_name", "transiti
 LOGGER = logging.getLogger(__name__)
 
 
+ON_APPROVED = "on-approved"
+ON_TRANSIT = "on-transit"
+ON_COMPLETE = "on-complete"
+
+HOOK_CLASSES = {
+    ON_APPROVED: OnApprovedHook,
+    ON_TRANSIT: OnTransitHook,
+    ON_COMPLETE: OnCompleteHook,
+}
+
+
+class HookDispatcher(object):
+    """
+    Fires all the hooks of an approval. The workflow level hooks of the approval, of the transition it causes and of the
+    completion of the workflow come from the hook registry and the ones registered for the workflow object itself are
+    loaded with a single query up front, only when the object has any. Entering it runs the BEFORE hooks and
+    exiting it runs the AFTER hooks in the reverse order, exactly like the nested signals would.
+    """
+
+    def __init__(self, workflow, workflow_object, content_type, transition_approval, has_transit, is_complete):
+        hooks = self._load_hooks(workflow, workflow_object, content_type, transition_approval, has_transit, is_complete)
+        self.signals = [
+            ApproveSignal(workflow, workflow_object, transition_approval, hooks[ON_APPROVED]),
+            TransitionSignal(has_transit, workflow, workflow_object, transition_approval, hooks[ON_TRANSIT]),
+            OnCompleteSignal(is_complete, workflow, workflow_object, hooks[ON_COMPLETE]),
+        ]
+
+    def __enter__(self):
+        for signal in self.signals:
+            signal.__enter__()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        for signal in reversed(self.signals):
+            signal.__exit__(type, value, traceback)
+
+    @staticmethod
+    def _load_hooks(workflow, workflow_object, content_type, transition_approval, has_transit, is_complete):
+        scopes = {ON_APPROVED: (transition_approval.meta_id, "transition_approval_id", transition_approval.pk)}
+        if has_transit:
+            scopes[ON_TRANSIT] = (transition_approval.transition.meta_id, "transition_id", transition_approval.transition_id)
+        if is_complete:
+            scopes[ON_COMPLETE] = (None, None, None)
+
+        hooks = defaultdict(lambda: defaultdict(list))
+        for kind, (meta_id, scope_attname, scope_id) in scopes.items():
+            for hook_type in [BEFORE, AFTER]:
+                hooks[kind][hook_type].extend(
+                    hook for hook in hook_registry.get_hooks(workflow, HOOK_CLASSES[kind], meta_id, hook_type)
+                    if not scope_attname or getattr(hook, scope_attname) in (None, scope_id)
+                )
+
+        if hook_registry.may_have_object_hooks(workflow, content_type):
+            of_object = Q(workflow=workflow, content_type=content_type, object_id=workflow_object.pk)
+            querysets = {
+                ON_APPROVED: OnApprovedHook.objects.filter(
+                    of_object & (Q(transition_approval__isnull=True) | Q(transition_approval=transition_approval)),
+                    transition_approval_meta=transition_approval.meta_id,
+                )
+            }
+            if has_transit:
+                querysets[ON_TRANSIT] = OnTransitHook.objects.filter(
+                    of_object & (Q(transition__isnull=True) | Q(transition=transition_approval.transition_id)),
+                    transition_meta=transition_approval.transition.meta_id,
+                )
+            if is_complete:
+                querysets[ON_COMPLETE] = OnCompleteHook.objects.filter(of_object)
+
+            hook_values = [
+                queryset.annotate(hook_kind=Value(kind, output_field=CharField())).values_list(
+                    "pk", "hook_type", "callback_function", "callback_function__name", "callback_function__body", "callback_function__version", "hook_kind"
+                ) for kind, queryset in sorted(querysets.items())
+            ]
+            for pk, hook_type, function_pk, function_name, function_body, function_version, kind in hook_values[0].union(*hook_values[1:], all=True):
+                callback_function = Function(pk=function_pk, name=function_name, body=function_body, version=function_version)
+                hooks[kind][hook_type].append(HOOK_CLASSES[kind](pk=pk, hook_type=hook_type, callback_function=callback_function, workflow=workflow))
+
+            for hooks_of_kind in hooks.values():
+                for hooks_of_type in hooks_of_kind.values():
+                    hooks_of_type.sort(key=lambda hook: hook.pk)
+        return hooks
+
+
 class TransitionSignal(object):
-    def __init__(self, status, workflow_object, field_name, transition_approval):
+    def __init__(self, status, workflow, workflow_object, transition_approval, hooks):
         self.status = status
+        self.workflow = workflow
         self.workflow_object = workflow_object
-        self.field_name = field_name
         self.transition_approval = transition_approval
-        self.content_type = ContentType.objects.get_for_model(self.workflow_object.__class__)
-        self.workflow = Workflow.objects.get(content_type=self.content_type, field_name=self.field_name)
+        self.hooks = hooks
 
     def __enter__(self):
         if self.status:
-            for hook in OnTransitHook.objects.filter(
-                    (Q(object_id__isnull=True) | Q(object_id=self.workflow_object.pk, content_type=self.content_type)) &
-                    (Q(transition__isnull=True) | Q(transition=self.transition_approval.transition)) &
-                    Q(
-                        workflow__field_name=self.field_name,
-                        transition_meta=self.transition_approval.transition.meta,
-                        hook_type=BEFORE
-                    )
-            ):
-                hook.execute(self._get_context(BEFORE))
+            for hook in self.hooks[BEFORE]:
+                hook_executor.execute(hook, self._get_context(BEFORE))
 
             LOGGER.debug("The signal that is fired right before the transition ( %s ) happened for %s"
                          % (self.transition_approval.transition, self.workflow_object))
 
     def __exit__(self, type, value, traceback):
         if self.status:
-            for hook in OnTransitHook.objects.filter(
-                    (Q(object_id__isnull=True) | Q(object_id=self.workflow_object.pk, content_type=self.content_type)) &
-                    (Q(transition__isnull=True) | Q(transition=self.transition_approval.transition)) &
-                    Q(
-                        workflow=self.workflow,
-                        transition_meta=self.transition_approval.transition.meta,
-                        hook_type=AFTER
-                    )
-            ):
-                hook.execute(self._get_context(AFTER))
+            for hook in self.hooks[AFTER]:
+                hook_executor.execute(hook, self._get_context(AFTER))
             LOGGER.debug("The signal that is fired right after the transition ( %s) happened for %s"
                          % (self.transition_approval.transition, self.workflow_object))
 
     def _get_context(self, when):
         return {
             "hook": {
-                "type": "on-transit",
+                "type": ON_TRANSIT,
                 "when": when,
                 "payload": {
                     "workflow": self.workflow,
@@ -77,46 +145,29 @@ class TransitionSignal(object):
 
 
 class ApproveSignal(object):
-    def __init__(self, workflow_object, field_name, transition_approval):
+    def __init__(self, workflow, workflow_object, transition_approval, hooks):
+        self.workflow = workflow
         self.workflow_object = workflow_object
-        self.field_name = field_name
         self.transition_approval = transition_approval
-        self.content_type = ContentType.objects.get_for_model(self.workflow_object.__class__)
-        self.workflow = Workflow.objects.get(content_type=self.content_type, field_name=self.field_name)
+        self.hooks = hooks
 
     def __enter__(self):
-        for hook in OnApprovedHook.objects.filter(
-                (Q(object_id__isnull=True) | Q(object_id=self.workflow_object.pk, content_type=self.content_type)) &
-                (Q(transition_approval__isnull=True) | Q(transition_approval=self.transition_approval)) &
-                Q(
-                    workflow__field_name=self.field_name,
-                    transition_approval_meta=self.transition_approval.meta,
-                    hook_type=BEFORE
-                )
-        ):
-            hook.execute(self._get_context(BEFORE))
+        for hook in self.hooks[BEFORE]:
+            hook_executor.execute(hook, self._get_context(BEFORE))
 
         LOGGER.debug("The signal that is fired right before a transition approval is approved for %s due to transition %s -> %s" % (
             self.workflow_object, self.transition_approval.transition.source_state.label, self.transition_approval.transition.destination_state.label))
 
     def __exit__(self, type, value, traceback):
-        for hook in OnApprovedHook.objects.filter(
-                (Q(object_id__isnull=True) | Q(object_id=self.workflow_object.pk, content_type=self.content_type)) &
-                (Q(transition_approval__isnull=True) | Q(transition_approval=self.transition_approval)) &
-                Q(
-                    workflow__field_name=self.field_name,
-                    transition_approval_meta=self.transition_approval.meta,
-                    hook_type=AFTER
-                )
-        ):
-            hook.execute(self._get_context(AFTER))
+        for hook in self.hooks[AFTER]:
+            hook_executor.execute(hook, self._get_context(AFTER))
         LOGGER.debug("The signal that is fired right after a transition approval is approved for %s due to transition %s -> %s" % (
             self.workflow_object, self.transition_approval.transition.source_state.label, self.transition_approval.transition.destination_state.label))
 
     def _get_context(self, when):
         return {
             "hook": {
-                "type": "on-approved",
+                "type": ON_APPROVED,
                 "when": when,
                 "payload": {
                     "workflow": self.workflow,
@@ -128,42 +179,28 @@ class ApproveSignal(object):
 
 
 class OnCompleteSignal(object):
-    def __init__(self, workflow_object, field_name):
+    def __init__(self, status, workflow, workflow_object, hooks):
+        self.status = status
+        self.workflow = workflow
         self.workflow_object = workflow_object
-        self.field_name = field_name
-        self.workflow = getattr(self.workflow_object.river, self.field_name)
-        self.status = self.workflow.on_final_state
-        self.content_type = ContentType.objects.get_for_model(self.workflow_object.__class__)
-        self.workflow = Workflow.objects.get(content_type=self.content_type, field_name=self.field_name)
+        self.hooks = hooks
 
     def __enter__(self):
         if self.status:
-            for hook in OnCompleteHook.objects.filter(
-                    (Q(object_id__isnull=True) | Q(object_id=self.workflow_object.pk, content_type=self.content_type)) &
-                    Q(
-                        workflow__field_name=self.field_name,
-                        hook_type=BEFORE
-                    )
-            ):
-                hook.execute(self._get_context(BEFORE))
+            for hook in self.hooks[BEFORE]:
+                hook_executor.execute(hook, self._get_context(BEFORE))
             LOGGER.debug("The signal that is fired right before the workflow of %s is complete" % self.workflow_object)
 
     def __exit__(self, type, value, traceback):
         if self.status:
-            for hook in OnCompleteHook.objects.filter(
-                    (Q(object_id__isnull=True) | Q(object_id=self.workflow_object.pk, content_type=self.content_type)) &
-                    Q(
-                        workflow__field_name=self.field_name,
-                        hook_type=AFTER
-                    )
-            ):
-                hook.execute(self._get_context(AFTER))
+            for hook in self.hooks[AFTER]:
+                hook_executor.execute(hook, self._get_context(AFTER))
             LOGGER.debug("The signal that is fired right after the workflow of %s is complete" % self.workflow_object)
 
     def _get_context(self, when):
         return {
             "hook": {
-                "type": "on-complete",
+                "type": ON_COMPLETE,
                 "when": when,
                 "payload": {
                     "workflow": self.workflow,
@@ -0,0 +1,40 @@
+SELECT approval.id
+FROM (
+         SELECT ta.id,
+                ta.transition_id,
+                ta.object_id,
+                ta.object_id_int,
+                ta.object_id_uuid,
+                ta.priority,
+                ta.transactioner_id,
+                min(ta.priority) OVER (PARTITION BY ta.transition_id) AS min_priority
+         FROM river_transitionapproval ta
+         WHERE ta.workflow_id = %%s
+           AND ta.status = %%s
+     ) approval
+         INNER JOIN river_transition t ON t.id = approval.transition_id
+         INNER JOIN %(workflow_object_table)s wot
+                    ON (
+                            wot.%(object_pk_column)s = %(object_id_expression)s
+                            AND wot.%(state_column)s = t.source_state_id
+                        )
+WHERE approval.priority = approval.min_priority
+  AND (approval.transactioner_id IS NULL OR approval.transactioner_id = %%s)
+  AND (
+        NOT EXISTS(SELECT 1 FROM %(permissions_table)s tap WHERE tap.%(permissions_source_column)s = approval.id)
+        OR EXISTS(
+            SELECT 1
+            FROM %(permissions_table)s tap
+            WHERE tap.%(permissions_source_column)s = approval.id
+              AND tap.%(permissions_target_column)s = ANY (CAST(%%s AS %(permission_pk_type)s[]))
+        )
+    )
+  AND (
+        NOT EXISTS(SELECT 1 FROM %(groups_table)s tag WHERE tag.%(groups_source_column)s = approval.id)
+        OR EXISTS(
+            SELECT 1
+            FROM %(groups_table)s tag
+            WHERE tag.%(groups_source_column)s = approval.id
+              AND tag.%(groups_target_column)s = ANY (CAST(%%s AS %(group_pk_type)s[]))
+        )
+    )
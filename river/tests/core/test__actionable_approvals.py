@@ -0,0 +1,81 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from hamcrest import assert_that, equal_to, has_length, instance_of, contains_string
+from six import StringIO
+
+from river.driver.actionable_driver import ActionableApprovalDriver
+from river.models import ActionableApproval
+from river.models.factories import PermissionObjectFactory, UserObjectFactory, StateObjectFactory, WorkflowFactory, TransitionMetaFactory, \
+    TransitionApprovalMetaFactory, GroupObjectFactory
+from river.tests.core.test__class_api import ClassApiTest
+from river.tests.core.test__instance_api import InstanceApiTest
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+
+@override_settings(RIVER_ACTIONABLE_APPROVALS=True)
+class ActionableInstanceApiTest(InstanceApiTest):
+    pass
+
+
+@override_settings(RIVER_ACTIONABLE_APPROVALS=True)
+class ActionableClassApiTest(ClassApiTest):
+    pass
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+@override_settings(RIVER_ACTIONABLE_APPROVALS=True)
+class ActionableApprovalsTest(TestCase):
+
+    def setUp(self):
+        self.permission1 = PermissionObjectFactory()
+        self.permission2 = PermissionObjectFactory()
+        self.group = GroupObjectFactory()
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        self.state3 = StateObjectFactory(label="state3")
+        self.workflow = WorkflowFactory(initial_state=state1, content_type=ContentType.objects.get_for_model(BasicTestModel), field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=self.workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=self.workflow, transition_meta=transition_meta, priority=0,
+                                             permissions=[self.permission1, self.permission2]).groups.add(self.group)
+        TransitionApprovalMetaFactory.create(workflow=self.workflow, transition_meta=transition_meta, priority=1, permissions=[self.permission1])
+        transition_meta = TransitionMetaFactory.create(workflow=self.workflow, source_state=state2, destination_state=self.state3)
+        TransitionApprovalMetaFactory.create(workflow=self.workflow, transition_meta=transition_meta, priority=0)
+
+    def test_shouldKeepARowPerPermissionAndGroupOfTheActionableApprovals(self):
+        workflow_object = BasicTestModelObjectFactory().model
+
+        assert_that(BasicTestModel.river.my_field._river_driver, instance_of(ActionableApprovalDriver))
+        assert_that(ActionableApproval.objects.filter(object_id=workflow_object.pk), has_length(2))
+        assert_that(set(ActionableApproval.objects.values_list("transition_approval__priority", flat=True)), equal_to({0}))
+
+    def test_shouldMaintainTheActionableApprovalsWhileTheObjectProceeds(self):
+        authorized_user = UserObjectFactory(user_permissions=[self.permission1], groups=[self.group])
+        workflow_object = BasicTestModelObjectFactory().model
+
+        workflow_object.river.my_field.approve(as_user=authorized_user)
+        assert_that(list(ActionableApproval.objects.values_list("transition_approval__priority", flat=True)), equal_to([1]))
+
+        workflow_object.river.my_field.approve(as_user=authorized_user)
+        assert_that(ActionableApproval.objects.filter(transition_approval__transition__destination_state=self.state3), has_length(1))
+
+        workflow_object.river.my_field.jump_to(self.state3)
+        assert_that(ActionableApproval.objects.all(), has_length(0))
+
+    def test_shouldRebuildTheActionableApprovals(self):
+        authorized_user = UserObjectFactory(user_permissions=[self.permission2], groups=[self.group])
+        workflow_object = BasicTestModelObjectFactory().model
+        BasicTestModelObjectFactory()
+        expected = list(ActionableApproval.objects.order_by("pk").values_list("transition_approval", "permission", "group"))
+
+        ActionableApproval.objects.all().delete()
+        assert_that(workflow_object.river.my_field.get_available_approvals(as_user=authorized_user), has_length(0))
+
+        out = StringIO()
+        call_command("river_rebuild_actionable_approvals", stdout=out)
+
+        assert_that(out.getvalue(), contains_string("Actionable approvals of 2 objects are rebuilt"))
+        assert_that(list(ActionableApproval.objects.order_by("pk").values_list("transition_approval", "permission", "group")), equal_to(expected))
+        assert_that(workflow_object.river.my_field.get_available_approvals(as_user=authorized_user), has_length(1))
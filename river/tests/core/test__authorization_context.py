@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import transaction
+from django.test import TestCase, override_settings
+from hamcrest import assert_that, contains_inanyorder, empty, same_instance, is_not, equal_to
+
+from river.core.authorizationcontext import authorization_context_cache
+from river.models.factories import PermissionObjectFactory, GroupObjectFactory, UserObjectFactory
+
+
+# noinspection PyMethodMayBeStatic
+class AuthorizationContextTest(TestCase):
+
+    def _reload(self, user):
+        return get_user_model().objects.get(pk=user.pk)
+
+    def test_shouldResolveThePermissionsAndTheGroupsOfAUser(self):
+        user_permission = PermissionObjectFactory()
+        group_permission = PermissionObjectFactory()
+        group = GroupObjectFactory(permissions=[group_permission])
+        user = UserObjectFactory(user_permissions=[user_permission], groups=[group])
+
+        authorization_context = authorization_context_cache.get(self._reload(user))
+
+        assert_that(authorization_context.permission_ids, contains_inanyorder(user_permission.pk, group_permission.pk))
+        assert_that(authorization_context.group_ids, contains_inanyorder(group.pk))
+
+    def test_shouldResolveAllThePermissionsOfASuperUser(self):
+        user = UserObjectFactory(is_superuser=True)
+
+        authorization_context = authorization_context_cache.get(self._reload(user))
+
+        assert_that(authorization_context.permission_ids, equal_to(frozenset(Permission.objects.values_list("pk", flat=True))))
+
+    def test_shouldNotHitTheDatabaseForTheSameUserTwice(self):
+        user = UserObjectFactory(user_permissions=[PermissionObjectFactory()])
+        authorization_context = authorization_context_cache.get(self._reload(user))
+
+        with self.assertNumQueries(0):
+            assert_that(authorization_context_cache.get(self._reload_without_query(user)), same_instance(authorization_context))
+
+    def test_shouldBeInvalidatedWhenThePermissionsOfTheUserChange(self):
+        user = UserObjectFactory()
+        assert_that(authorization_context_cache.get(self._reload(user)).permission_ids, empty())
+
+        permission = PermissionObjectFactory()
+        user.user_permissions.add(permission)
+        assert_that(authorization_context_cache.get(self._reload(user)).permission_ids, contains_inanyorder(permission.pk))
+
+    def test_shouldBeInvalidatedWhenTheGroupsOfTheUserChange(self):
+        user = UserObjectFactory()
+        assert_that(authorization_context_cache.get(self._reload(user)).group_ids, empty())
+
+        group = GroupObjectFactory()
+        group.user_set.add(user)
+        assert_that(authorization_context_cache.get(self._reload(user)).group_ids, contains_inanyorder(group.pk))
+
+        permission = PermissionObjectFactory()
+        group.permissions.add(permission)
+        assert_that(authorization_context_cache.get(self._reload(user)).permission_ids, contains_inanyorder(permission.pk))
+
+    def test_shouldForgetThePermissionsThatAreRolledBack(self):
+        user = UserObjectFactory()
+        permission = PermissionObjectFactory()
+        assert_that(authorization_context_cache.get(self._reload(user)).permission_ids, empty())
+
+        try:
+            with transaction.atomic():
+                user.user_permissions.add(permission)
+                assert_that(authorization_context_cache.get(self._reload(user)).permission_ids, contains_inanyorder(permission.pk))
+                raise RuntimeError("Rolling back")
+        except RuntimeError:
+            pass
+
+        assert_that(authorization_context_cache.get(self._reload(user)).permission_ids, empty())
+
+    @override_settings(RIVER_AUTHORIZATION_CACHE_TTL=0)
+    def test_shouldExpire(self):
+        user = UserObjectFactory()
+        authorization_context = authorization_context_cache.get(self._reload(user))
+
+        assert_that(authorization_context_cache.get(self._reload(user)), is_not(same_instance(authorization_context)))
+
+    def _reload_without_query(self, user):
+        return get_user_model()(pk=user.pk, username=user.username)
@@ -0,0 +1,171 @@
+from uuid import uuid4
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from hamcrest import assert_that, equal_to, has_length, has_item, calling, raises, only_contains, has_property
+from mock import patch
+
+import river
+from river.core.transitionbatch import TransitionBatch
+from river.models import TransitionApproval, Transition
+from river.models.factories import PermissionObjectFactory, GroupObjectFactory, StateObjectFactory, WorkflowFactory, TransitionMetaFactory, \
+    TransitionApprovalMetaFactory, UserObjectFactory
+from river.tests.matchers import has_permission
+from river.tests.models import BasicTestModel, ModelWithStringPrimaryKey
+from river.utils.exceptions import RiverException
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class BulkInitializationTest(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(BulkInitializationTest, self).__init__(*args, **kwargs)
+        self.content_type = ContentType.objects.get_for_model(BasicTestModel)
+
+    def _create_workflow(self, content_type, field_name):
+        self.authorized_permission = PermissionObjectFactory()
+        self.authorized_group = GroupObjectFactory()
+
+        self.state1 = StateObjectFactory(label="state1")
+        self.state2 = StateObjectFactory(label="state2")
+        self.state3 = StateObjectFactory(label="state3")
+
+        workflow = WorkflowFactory(initial_state=self.state1, content_type=content_type, field_name=field_name)
+        transition_meta_1 = TransitionMetaFactory.create(workflow=workflow, source_state=self.state1, destination_state=self.state2)
+        transition_meta_2 = TransitionMetaFactory.create(workflow=workflow, source_state=self.state2, destination_state=self.state3)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_1, priority=0, permissions=[self.authorized_permission])
+        approval_meta = TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=0)
+        approval_meta.groups.add(self.authorized_group)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=1, permissions=[self.authorized_permission])
+        return workflow
+
+    def test_shouldInitializeApprovalsOfManyObjectsAtOnce(self):
+        workflow_objects = [BasicTestModel.objects.create(test_field=str(i)) for i in range(5)]
+        workflow = self._create_workflow(self.content_type, "my_field")
+
+        river.bulk_initialize(workflow_objects, "my_field")
+
+        for workflow_object in workflow_objects:
+            assert_that(BasicTestModel.objects.get(pk=workflow_object.pk).my_field, equal_to(self.state1))
+            assert_that(workflow_object.my_field_transitions.all(), has_length(2))
+            assert_that(workflow_object.my_field_transition_approvals.all(), has_length(3))
+
+        approvals = TransitionApproval.objects.filter(workflow=workflow, meta__priority=0, transition__source_state=self.state1)
+        assert_that(approvals, has_length(5))
+        for approval in approvals:
+            assert_that(approval, has_permission("permissions", has_item(self.authorized_permission)))
+
+        approvals = TransitionApproval.objects.filter(workflow=workflow, meta__priority=0, transition__source_state=self.state2)
+        assert_that(approvals, has_length(5))
+        for approval in approvals:
+            assert_that(approval, has_permission("groups", has_item(self.authorized_group)))
+
+    def test_shouldNotInitializeAlreadyInitializedObjectsAgain(self):
+        workflow_objects = [BasicTestModel.objects.create(test_field=str(i)) for i in range(2)]
+        self._create_workflow(self.content_type, "my_field")
+
+        BasicTestModel.river.my_field.bulk_initialize(workflow_objects)
+        BasicTestModel.river.my_field.bulk_initialize(workflow_objects)
+
+        assert_that(Transition.objects.filter(content_type=self.content_type), has_length(4))
+        assert_that(TransitionApproval.objects.filter(content_type=self.content_type), has_length(6))
+
+    def test_shouldCostTheSameNumberOfQueriesRegardlessOfTheNumberOfObjects(self):
+        few_objects = [BasicTestModel.objects.create(test_field=str(i)) for i in range(2)]
+        many_objects = [BasicTestModel.objects.create(test_field=str(i)) for i in range(20)]
+        self._create_workflow(self.content_type, "my_field")
+        BasicTestModel.river.my_field.workflow_graph
+
+        with CaptureQueriesContext(connection) as few_objects_queries:
+            BasicTestModel.river.my_field.bulk_initialize(few_objects)
+
+        with CaptureQueriesContext(connection) as many_objects_queries:
+            BasicTestModel.river.my_field.bulk_initialize(many_objects)
+
+        assert_that(len(many_objects_queries), equal_to(len(few_objects_queries)))
+
+    def test_shouldLetTheInitializedObjectsBeApproved(self):
+        workflow_objects = [BasicTestModel.objects.create(test_field=str(i)) for i in range(2)]
+        self._create_workflow(self.content_type, "my_field")
+        authorized_user = UserObjectFactory(user_permissions=[self.authorized_permission])
+
+        river.bulk_initialize(workflow_objects, "my_field")
+
+        workflow_object = BasicTestModel.objects.get(pk=workflow_objects[0].pk)
+        workflow_object.river.my_field.approve(as_user=authorized_user)
+        assert_that(workflow_object.my_field, equal_to(self.state2))
+
+    @patch("river.core.transitionbatch.READ_BACK_BATCH_SIZE", 2)
+    def test_shouldReadThePrimaryKeysOfManyObjectsBackInChunks(self):
+        workflow_objects = [BasicTestModel.objects.create(test_field=str(i)) for i in range(5)]
+        self._create_workflow(self.content_type, "my_field")
+
+        river.bulk_initialize(workflow_objects, "my_field")
+
+        for workflow_object in workflow_objects:
+            approvals = workflow_object.my_field_transition_approvals.filter(transition__source_state=self.state1)
+            assert_that(approvals, has_length(1))
+            assert_that(approvals[0], has_permission("permissions", has_item(self.authorized_permission)))
+
+    def test_shouldTellTheApprovalsWithTheSameNaturalKeyApartByTheirOrder(self):
+        workflow_object = BasicTestModel.objects.create(test_field="1")
+        workflow = self._create_workflow(self.content_type, "my_field")
+        transition_meta = workflow.transition_metas.get(source_state=self.state1)
+
+        batch = TransitionBatch(workflow)
+        batch.add(
+            Transition(workflow=workflow, content_type=self.content_type, object_id=workflow_object.pk, meta=transition_meta,
+                       source_state=self.state1, destination_state=self.state2, iteration=0),
+            [
+                (TransitionApproval(workflow=workflow, content_type=self.content_type, object_id=workflow_object.pk, priority=0), [self.authorized_permission.pk], []),
+                (TransitionApproval(workflow=workflow, content_type=self.content_type, object_id=workflow_object.pk, priority=0), [], [self.authorized_group.pk]),
+            ]
+        )
+        batch.save()
+
+        approvals = TransitionApproval.objects.filter(workflow_object=workflow_object).order_by("pk")
+        assert_that(approvals, has_length(2))
+        assert_that(approvals[0], has_permission("permissions", has_item(self.authorized_permission)))
+        assert_that(approvals[0].groups.all(), has_length(0))
+        assert_that(approvals[1].permissions.all(), has_length(0))
+        assert_that(approvals[1], has_permission("groups", has_item(self.authorized_group)))
+
+    @patch("river.utils.bulkupdate.hasattr", return_value=False, create=True)
+    def test_shouldInitializeAndApproveManyObjectsOnTheDjangoVersionsWithoutBulkUpdate(self, _):
+        workflow_objects = [BasicTestModel.objects.create(test_field=str(i)) for i in range(2)]
+        self._create_workflow(self.content_type, "my_field")
+        authorized_user = UserObjectFactory(user_permissions=[self.authorized_permission])
+
+        river.bulk_initialize(workflow_objects, "my_field")
+        for workflow_object in workflow_objects:
+            assert_that(BasicTestModel.objects.get(pk=workflow_object.pk).my_field, equal_to(self.state1))
+
+        BasicTestModel.river.my_field.approve_many(as_user=authorized_user, workflow_objects=workflow_objects)
+        for workflow_object in workflow_objects:
+            assert_that(BasicTestModel.objects.get(pk=workflow_object.pk).my_field, equal_to(self.state2))
+
+    def test_shouldCreateWorkflowObjectsInBulk(self):
+        self._create_workflow(ContentType.objects.get_for_model(ModelWithStringPrimaryKey), "status")
+
+        workflow_objects = river.bulk_create([ModelWithStringPrimaryKey(custom_pk=str(uuid4())) for _ in range(3)])
+
+        assert_that(ModelWithStringPrimaryKey.objects.all(), has_length(3))
+        assert_that(list(ModelWithStringPrimaryKey.objects.all()), only_contains(has_property("status", self.state1)))
+        for workflow_object in workflow_objects:
+            assert_that(workflow_object.status_transitions.all(), has_length(2))
+            assert_that(workflow_object.status_transition_approvals.all(), has_length(3))
+
+    def test_shouldNotCreateWorkflowObjectsInBulkWhenThePrimaryKeysCanNotBeKnown(self):
+        features = connection.features
+        if getattr(features, "can_return_rows_from_bulk_insert", getattr(features, "can_return_ids_from_bulk_insert", False)):
+            self.skipTest("The database backend returns the primary keys of the objects created in bulk")
+
+        self._create_workflow(self.content_type, "my_field")
+
+        assert_that(
+            calling(river.bulk_create).with_args([BasicTestModel(test_field="1")]),
+            raises(RiverException, "can not return the primary keys")
+        )
+        assert_that(BasicTestModel.objects.all(), has_length(0))
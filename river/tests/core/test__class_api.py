@@ -2,13 +2,15 @@ from datetime import datetime, timedelta
 
 from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
-from hamcrest import assert_that, equal_to, has_item, all_of, has_property, less_than, has_items, has_length
+from hamcrest import assert_that, equal_to, has_item, all_of, has_property, less_than, has_items, has_length, none, instance_of, is_not
 
-from river.models import TransitionApproval
+from river.models import TransitionApproval, APPROVED
 from river.models.factories import PermissionObjectFactory, UserObjectFactory, StateObjectFactory, TransitionApprovalMetaFactory, GroupObjectFactory, \
     WorkflowFactory, TransitionMetaFactory
 from river.tests.models import BasicTestModel
 from river.tests.models.factories import BasicTestModelObjectFactory
+from river.utils.error_code import ErrorCode
+from river.utils.exceptions import RiverException
 
 
 # noinspection PyMethodMayBeStatic,DuplicatedCode
@@ -170,6 +172,29 @@ class ClassApiTest(TestCase):
         assert_that(after - before, less_than(timedelta(milliseconds=200)))
         print("Time taken %s" % str(after - before))
 
+    def test_shouldLookTheObjectsOnApprovalUpWithASubquery(self):
+        authorized_permission = PermissionObjectFactory()
+        authorized_user = UserObjectFactory(user_permissions=[authorized_permission])
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0, permissions=[authorized_permission])
+
+        workflow_objects = [BasicTestModelObjectFactory().model for _ in range(5)]
+        BasicTestModelObjectFactory().model.river.my_field.approve(as_user=authorized_user)
+
+        with self.assertNumQueries(0):
+            on_approval_objects = BasicTestModel.river.my_field.get_on_approval_objects(as_user=authorized_user)
+
+        with self.assertNumQueries(1):
+            assert_that(list(on_approval_objects), has_length(5))
+        assert_that(list(on_approval_objects), equal_to(workflow_objects))
+
+        assert_that(list(BasicTestModel.river.my_field.iter_on_approval_objects(as_user=authorized_user, chunk_size=2)),
+                    equal_to(workflow_objects))
+
     def test_shouldAssesInitialStateProperly(self):
         state1 = StateObjectFactory(label="state1")
         state2 = StateObjectFactory(label="state2")
@@ -264,3 +289,94 @@ class ClassApiTest(TestCase):
 
         assert_that(BasicTestModel.river.my_field.final_states, has_length(4))
         assert_that(list(BasicTestModel.river.my_field.final_states), has_items(state21, state22, state31, state32))
+
+    def test_shouldApproveManyObjectsAtOnce(self):
+        authorized_permission = PermissionObjectFactory()
+        authorized_user = UserObjectFactory(user_permissions=[authorized_permission])
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        state3 = StateObjectFactory(label="state3")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta1 = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        transition_meta2 = TransitionMetaFactory.create(workflow=workflow, source_state=state2, destination_state=state3)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta1, priority=0, permissions=[authorized_permission])
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta2, priority=0, permissions=[authorized_permission])
+
+        workflow_objects = BasicTestModelObjectFactory.create_batch(3)
+
+        results = BasicTestModel.river.my_field.approve_many(as_user=authorized_user, workflow_objects=workflow_objects)
+
+        assert_that(results, has_length(3))
+        for result in results:
+            assert_that(result.error, none())
+            assert_that(result.approval, has_property("status", APPROVED))
+            assert_that(result.approval, has_property("transactioner", authorized_user))
+            assert_that(result.workflow_object.my_field, equal_to(state2))
+            assert_that(BasicTestModel.objects.get(pk=result.workflow_object.pk).my_field, equal_to(state2))
+
+        results = BasicTestModel.river.my_field.approve_many(as_user=authorized_user, workflow_objects=BasicTestModel.objects.all())
+
+        for result in results:
+            assert_that(result.error, none())
+            assert_that(result.approval.previous, is_not(none()))
+            assert_that(BasicTestModel.objects.get(pk=result.workflow_object.pk).my_field, equal_to(state3))
+
+    def test_shouldReportTheObjectsThatCanNotBeApprovedWhenApprovingMany(self):
+        authorized_permission = PermissionObjectFactory()
+        authorized_user = UserObjectFactory(user_permissions=[authorized_permission])
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0, permissions=[authorized_permission])
+
+        already_approved = BasicTestModelObjectFactory().model
+        already_approved.river.my_field.approve(as_user=authorized_user)
+        workflow_object = BasicTestModelObjectFactory().model
+
+        results = BasicTestModel.river.my_field.approve_many(as_user=authorized_user, workflow_objects=[already_approved, workflow_object])
+
+        assert_that(results[0].approval, none())
+        assert_that(results[0].error, instance_of(RiverException))
+        assert_that(results[0].error.code, equal_to(ErrorCode.NO_AVAILABLE_NEXT_STATE_FOR_USER))
+
+        assert_that(results[1].error, none())
+        assert_that(BasicTestModel.objects.get(pk=workflow_object.pk).my_field, equal_to(state2))
+
+    def test_shouldRequireTheNextStateWhenApprovingManyObjectsWithMultipleDestinations(self):
+        authorized_permission = PermissionObjectFactory()
+        authorized_user = UserObjectFactory(user_permissions=[authorized_permission])
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        state3 = StateObjectFactory(label="state3")
+        state4 = StateObjectFactory(label="state4")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta1 = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        transition_meta2 = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state3)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta1, priority=0, permissions=[authorized_permission])
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta2, priority=0, permissions=[authorized_permission])
+
+        workflow_objects = list(BasicTestModelObjectFactory.create_batch(2))
+
+        results = BasicTestModel.river.my_field.approve_many(as_user=authorized_user, workflow_objects=workflow_objects)
+        for result in results:
+            assert_that(result.error.code, equal_to(ErrorCode.NEXT_STATE_IS_REQUIRED))
+
+        results = BasicTestModel.river.my_field.approve_many(as_user=authorized_user, workflow_objects=workflow_objects, next_state=state4)
+        for result in results:
+            assert_that(result.error.code, equal_to(ErrorCode.INVALID_NEXT_STATE_FOR_USER))
+
+        results = BasicTestModel.river.my_field.approve_many(as_user=authorized_user, workflow_objects=workflow_objects, next_state=state3)
+        for result in results:
+            assert_that(result.error, none())
+            assert_that(BasicTestModel.objects.get(pk=result.workflow_object.pk).my_field, equal_to(state3))
+            assert_that(
+                TransitionApproval.objects.filter(workflow_object=result.workflow_object, transition__destination_state=state2),
+                has_item(has_property("status", "cancelled"))
+            )
@@ -0,0 +1,93 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from hamcrest import assert_that, equal_to, has_length
+
+from river.models import APPROVED, CANCELLED, PENDING
+from river.models.factories import PermissionObjectFactory, GroupObjectFactory, UserObjectFactory, StateObjectFactory, WorkflowFactory, \
+    TransitionMetaFactory, TransitionApprovalMetaFactory
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+
+def _render(approval):
+    return (
+        approval.transition.source_state.label,
+        approval.transition.destination_state.label,
+        approval.status,
+        approval.transactioner.username if approval.transactioner else None,
+        approval.meta.priority if approval.meta else None,
+        sorted(permission.codename for permission in approval.permissions.all()),
+        sorted(group.name for group in approval.groups.all()),
+    )
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class HistoryTest(TestCase):
+
+    def setUp(self):
+        self.permission = PermissionObjectFactory()
+        self.group = GroupObjectFactory()
+        self.user = UserObjectFactory(user_permissions=[self.permission])
+        self.user.groups.add(self.group)
+
+        self.state1 = StateObjectFactory(label="state1")
+        self.state2 = StateObjectFactory(label="state2")
+        self.state3 = StateObjectFactory(label="state3")
+        self.state4 = StateObjectFactory(label="state4")
+
+        workflow = WorkflowFactory(initial_state=self.state1, content_type=ContentType.objects.get_for_model(BasicTestModel), field_name="my_field")
+        transition_meta_1 = TransitionMetaFactory.create(workflow=workflow, source_state=self.state1, destination_state=self.state2)
+        transition_meta_2 = TransitionMetaFactory.create(workflow=workflow, source_state=self.state2, destination_state=self.state3)
+        transition_meta_3 = TransitionMetaFactory.create(workflow=workflow, source_state=self.state2, destination_state=self.state4)
+        approval_meta = TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_1, priority=0, permissions=[self.permission])
+        approval_meta.groups.add(self.group)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_1, priority=1, permissions=[self.permission])
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=0, permissions=[self.permission])
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_3, priority=0, permissions=[self.permission])
+
+    def _proceed(self, workflow_object):
+        workflow_object.river.my_field.approve(as_user=self.user)
+        workflow_object.river.my_field.approve(as_user=self.user)
+        workflow_object.river.my_field.approve(as_user=self.user, next_state=self.state3)
+
+    def test_shouldReturnTheHistoryInTheOrderItHasHappenedWithAFixedNumberOfQueries(self):
+        workflow_object = BasicTestModelObjectFactory().model
+        self._proceed(workflow_object)
+
+        with self.assertNumQueries(3):
+            history = [_render(approval) for approval in workflow_object.river.my_field.history()]
+
+        assert_that(history, equal_to([
+            ("state1", "state2", APPROVED, self.user.username, 0, [self.permission.codename], [self.group.name]),
+            ("state1", "state2", APPROVED, self.user.username, 1, [self.permission.codename], []),
+            ("state2", "state3", APPROVED, self.user.username, 0, [self.permission.codename], []),
+            ("state2", "state4", CANCELLED, None, 0, [self.permission.codename], []),
+        ]))
+
+    def test_shouldReturnTheHistoryOfTheGivenStatuses(self):
+        workflow_object = BasicTestModelObjectFactory().model
+        workflow_object.river.my_field.approve(as_user=self.user)
+
+        assert_that(workflow_object.river.my_field.history(statuses=[APPROVED]), has_length(1))
+        assert_that(workflow_object.river.my_field.history(statuses=[PENDING]), has_length(3))
+
+    def test_shouldStreamTheHistoriesOfManyObjectsChunkByChunk(self):
+        workflow_objects = [BasicTestModelObjectFactory().model for _ in range(5)]
+        for workflow_object in workflow_objects:
+            self._proceed(workflow_object)
+
+        with self.assertNumQueries(3 * 4 + 1):
+            history = [(int(approval.object_id), _render(approval)) for approval in BasicTestModel.river.my_field.iter_history(chunk_size=2)]
+
+        assert_that(history, has_length(20))
+        assert_that([object_id for object_id, _ in history], equal_to([workflow_object.pk for workflow_object in workflow_objects for _ in range(4)]))
+        assert_that([row for _, row in history[4:8]], equal_to([_render(approval) for approval in workflow_objects[1].river.my_field.history()]))
+
+    def test_shouldStreamTheHistoriesOfTheGivenObjectsOnly(self):
+        workflow_objects = [BasicTestModelObjectFactory().model for _ in range(3)]
+        for workflow_object in workflow_objects:
+            self._proceed(workflow_object)
+
+        history = list(BasicTestModel.river.my_field.iter_history(workflow_objects=workflow_objects[1:], chunk_size=1))
+
+        assert_that([int(approval.object_id) for approval in history], equal_to([workflow_objects[1].pk] * 4 + [workflow_objects[2].pk] * 4))
@@ -0,0 +1,82 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from hamcrest import assert_that, equal_to, has_length, none, calling, raises, has_property, is_not
+
+from river.models import TransitionApproval
+from river.models.factories import PermissionObjectFactory, UserObjectFactory, StateObjectFactory, WorkflowFactory, TransitionMetaFactory, \
+    TransitionApprovalMetaFactory
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+from river.utils.error_code import ErrorCode
+from river.utils.exceptions import RiverException
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class InboxTest(TestCase):
+
+    def setUp(self):
+        authorized_permission = PermissionObjectFactory()
+        self.authorized_user = UserObjectFactory(user_permissions=[authorized_permission])
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        workflow = WorkflowFactory(initial_state=state1, content_type=ContentType.objects.get_for_model(BasicTestModel), field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0, permissions=[authorized_permission])
+
+        self.workflow_objects = [BasicTestModelObjectFactory().model for _ in range(7)]
+
+    def _all_pages(self, order_by, page_size):
+        pages = [BasicTestModel.river.my_field.get_inbox(as_user=self.authorized_user, order_by=order_by, page_size=page_size)]
+        while pages[-1].next_cursor:
+            pages.append(BasicTestModel.river.my_field.get_inbox(as_user=self.authorized_user, order_by=order_by, page_size=page_size, cursor=pages[-1].next_cursor))
+        return pages
+
+    def test_shouldPaginateTheApprovalsByKeyset(self):
+        pages = self._all_pages("date_created", 2)
+
+        assert_that([len(page) for page in pages], equal_to([2, 2, 2, 1]))
+        assert_that(
+            [approval.pk for page in pages for approval in page],
+            equal_to(list(TransitionApproval.objects.order_by("date_created", "pk").values_list("pk", flat=True)))
+        )
+        assert_that(pages[-1].next_cursor, none())
+
+    def test_shouldOrderTheWorkflowObjectsDescending(self):
+        pages = self._all_pages("-object", 3)
+
+        assert_that([workflow_object for page in pages for workflow_object in page.workflow_objects], equal_to(list(reversed(self.workflow_objects))))
+
+    def test_shouldCostTheSameForEveryPage(self):
+        pages = self._all_pages("priority", 2)
+
+        query_counts = []
+        for cursor in [None] + [page.next_cursor for page in pages[:-1]]:
+            with CaptureQueriesContext(connection) as queries:
+                BasicTestModel.river.my_field.get_inbox(as_user=self.authorized_user, order_by="priority", page_size=2, cursor=cursor)
+            query_counts.append(len(queries))
+
+        assert_that(set(query_counts), has_length(1))
+
+    def test_shouldCountTheApprovalsInTheInbox(self):
+        page = BasicTestModel.river.my_field.get_inbox(as_user=self.authorized_user, page_size=2, count="exact")
+        assert_that(page.count, equal_to(7))
+
+        page = BasicTestModel.river.my_field.get_inbox(as_user=self.authorized_user, page_size=2, count="estimate")
+        assert_that(page.count, is_not(none()))
+
+    def test_shouldNotAcceptTheCursorsOfAnotherOrdering(self):
+        page = BasicTestModel.river.my_field.get_inbox(as_user=self.authorized_user, order_by="pk", page_size=2)
+
+        assert_that(
+            calling(BasicTestModel.river.my_field.get_inbox).with_args(as_user=self.authorized_user, order_by="-pk", cursor=page.next_cursor),
+            raises(RiverException)
+        )
+        try:
+            BasicTestModel.river.my_field.get_inbox(as_user=self.authorized_user, cursor="not-a-cursor")
+        except RiverException as e:
+            assert_that(e, has_property("code", ErrorCode.INVALID_INBOX_CURSOR))
+        else:
+            raise AssertionError("Invalid cursor is accepted")
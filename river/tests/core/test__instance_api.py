@@ -1,7 +1,8 @@
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from hamcrest import assert_that, equal_to, has_item, has_property, raises, calling, has_length, is_not, all_of, none, has_items
 
+from river.core.instrumentation import instrumentation, InstrumentationListener
 from river.models import TransitionApproval, PENDING, CANCELLED, APPROVED, Transition, JUMPED
 from river.models.factories import UserObjectFactory, StateObjectFactory, TransitionApprovalMetaFactory, PermissionObjectFactory, WorkflowFactory, \
     TransitionMetaFactory
@@ -2031,3 +2032,116 @@ class InstanceApiTest(TestCase):
                 has_item(has_property("status", PENDING))
             )
         ),
+
+    def test_shouldCancelTheImpossibleFutureWithAConstantNumberOfQueries(self):
+        authorized_permission = PermissionObjectFactory()
+
+        first_state = StateObjectFactory(label="first")
+        workflow = WorkflowFactory(initial_state=first_state, content_type=self.content_type, field_name="my_field")
+        for branch in ["left", "right"]:
+            source_state = first_state
+            for depth in range(5):
+                destination_state = StateObjectFactory(label="%s-%s" % (branch, depth))
+                transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=source_state, destination_state=destination_state)
+                TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0, permissions=[authorized_permission])
+                source_state = destination_state
+
+        workflow_object = BasicTestModelObjectFactory().model
+        approval = workflow_object.my_field_transition_approvals.select_related("transition").get(transition__source_state=first_state, transition__destination_state__label="left-0")
+
+        cancellations = []
+
+        class CancellationListener(InstrumentationListener):
+            def on_stop(self, event):
+                if event.operation == "cancel_impossible_future":
+                    cancellations.append(event.queries)
+
+        listener = instrumentation.add_listener(CancellationListener())
+        try:
+            workflow_object.river.my_field.cancel_impossible_future(approval)
+        finally:
+            instrumentation.remove_listener(listener)
+
+        assert_that(cancellations, equal_to([3]))
+        assert_that(Transition.objects.filter(workflow=workflow, destination_state__label__startswith="left", status=PENDING), has_length(5))
+        assert_that(Transition.objects.filter(workflow=workflow, destination_state__label__startswith="right", status=CANCELLED), has_length(5))
+        assert_that(TransitionApproval.objects.filter(workflow=workflow, status=CANCELLED), has_length(5))
+
+    def test_shouldReCreateTheCycledPathWithAConstantNumberOfQueries(self):
+        authorized_permission = PermissionObjectFactory()
+        authorized_user = UserObjectFactory(user_permissions=[authorized_permission])
+        content_type = ContentType.objects.get_for_model(ModelWithTwoStateFields)
+
+        def _create_cycle(field_name, length):
+            states = [StateObjectFactory(label="%s-%s" % (field_name, index)) for index in range(length)]
+            workflow = WorkflowFactory(initial_state=states[0], content_type=content_type, field_name=field_name)
+            for source_state, destination_state in zip(states, states[1:] + states[:1]):
+                transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=source_state, destination_state=destination_state)
+                TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0, permissions=[authorized_permission])
+            return workflow
+
+        small_cycle = _create_cycle("status1", 3)
+        big_cycle = _create_cycle("status2", 8)
+        workflow_object = ModelWithTwoStateFieldsObjectFactory().model
+
+        re_creations = []
+
+        class ReCreationListener(InstrumentationListener):
+            def on_stop(self, event):
+                if event.operation == "re_create_cycled_path":
+                    re_creations.append(event.queries)
+
+        listener = instrumentation.add_listener(ReCreationListener())
+        try:
+            for _ in range(3):
+                workflow_object.river.status1.approve(as_user=authorized_user)
+            for _ in range(8):
+                workflow_object.river.status2.approve(as_user=authorized_user)
+        finally:
+            instrumentation.remove_listener(listener)
+
+        assert_that(re_creations, has_length(2))
+        assert_that(re_creations[0], equal_to(re_creations[1]))
+        assert_that(Transition.objects.filter(workflow=small_cycle, status=PENDING), has_length(3))
+        assert_that(list(Transition.objects.filter(workflow=big_cycle, status=PENDING).order_by("iteration").values_list("iteration", flat=True)), equal_to(list(range(8, 16))))
+        assert_that(TransitionApproval.objects.filter(workflow=big_cycle, status=PENDING, permissions=authorized_permission), has_length(8))
+
+    def _create_single_transition_workflow(self):
+        authorized_permission = PermissionObjectFactory()
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0, permissions=[authorized_permission])
+        return UserObjectFactory(user_permissions=[authorized_permission]), state2
+
+    def test_shouldOnlySaveTheStateFieldWhenTheObjectProceeds(self):
+        authorized_user, state2 = self._create_single_transition_workflow()
+        workflow_object = BasicTestModelObjectFactory().model
+        BasicTestModel.objects.filter(pk=workflow_object.pk).update(test_field="changed elsewhere")
+
+        workflow_object.test_field = "stale"
+        workflow_object.river.my_field.approve(as_user=authorized_user)
+
+        saved = BasicTestModel.objects.get(pk=workflow_object.pk)
+        assert_that(saved.my_field, equal_to(state2))
+        assert_that(saved.test_field, equal_to("changed elsewhere"))
+
+    @override_settings(RIVER_FULL_OBJECT_SAVE=True)
+    def test_shouldSaveTheWholeObjectWhenTheObjectProceedsIfItIsConfigured(self):
+        authorized_user, state2 = self._create_single_transition_workflow()
+        workflow_object = BasicTestModelObjectFactory().model
+
+        workflow_object.test_field = "changed"
+        workflow_object.river.my_field.approve(as_user=authorized_user)
+
+        saved = BasicTestModel.objects.get(pk=workflow_object.pk)
+        assert_that(saved.my_field, equal_to(state2))
+        assert_that(saved.test_field, equal_to("changed"))
+
+    def test_shouldNotDoAnythingElseWhenAnExistingObjectIsSaved(self):
+        self._create_single_transition_workflow()
+        workflow_object = BasicTestModelObjectFactory().model
+
+        with self.assertNumQueries(1):
+            workflow_object.save()
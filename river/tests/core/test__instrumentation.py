@@ -0,0 +1,158 @@
+import socket
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from hamcrest import assert_that, has_item, has_property, all_of, greater_than, has_length, contains_string, equal_to, is_not, none, has_items
+
+from river.core.instrumentation import instrumentation, InstrumentationListener, InstrumentationEvent
+from river.core.metricexporters import PrometheusExporter, StatsdExporter
+from river.models.factories import PermissionObjectFactory, UserObjectFactory, StateObjectFactory, WorkflowFactory, TransitionMetaFactory, \
+    TransitionApprovalMetaFactory
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+
+class RecordingListener(InstrumentationListener):
+
+    def __init__(self):
+        self.started = []
+        self.stopped = []
+
+    def on_start(self, event):
+        self.started.append(event.operation)
+
+    def on_stop(self, event):
+        self.stopped.append(event)
+
+
+def _event(operation, duration, queries, error=None, **tags):
+    event = InstrumentationEvent(operation, tags)
+    event.duration = duration
+    event.queries = queries
+    event.error = error
+    return event
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class InstrumentationTest(TestCase):
+
+    def setUp(self):
+        self.listener = instrumentation.add_listener(RecordingListener())
+
+    def tearDown(self):
+        instrumentation.remove_listener(self.listener)
+
+    def _create_workflow(self):
+        self.authorized_permission = PermissionObjectFactory()
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=ContentType.objects.get_for_model(BasicTestModel), field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0, permissions=[self.authorized_permission])
+
+    def test_shouldMeasureTheDurationAndTheQueriesOfTheOperations(self):
+        self._create_workflow()
+        authorized_user = UserObjectFactory(user_permissions=[self.authorized_permission])
+        workflow_object = BasicTestModelObjectFactory().model
+
+        workflow_object.river.my_field.approve(as_user=authorized_user)
+
+        assert_that(self.listener.started, has_items("initialize_approvals", "approve", "get_available_approvals"))
+        assert_that(self.listener.stopped, has_item(all_of(
+            has_property("operation", "approve"),
+            has_property("duration", greater_than(0)),
+            has_property("queries", greater_than(0)),
+            has_property("error", none()),
+        )))
+        assert_that(self.listener.stopped, has_item(all_of(
+            has_property("operation", "get_available_approvals"),
+            has_property("tags", equal_to({"driver": "OrmDriver"})),
+        )))
+
+    def test_shouldMeasureTheAvailableApprovalsWhenTheyAreEvaluated(self):
+        self._create_workflow()
+        authorized_user = UserObjectFactory(user_permissions=[self.authorized_permission])
+        BasicTestModelObjectFactory()
+
+        available_approvals = BasicTestModel.river.my_field.get_available_approvals(as_user=authorized_user).filter(priority=0)
+        assert_that(self.listener.started, is_not(has_item("get_available_approvals")))
+
+        assert_that(list(available_approvals), has_length(1))
+        assert_that(self.listener.stopped, has_item(all_of(
+            has_property("operation", "get_available_approvals"),
+            has_property("tags", equal_to({"driver": "OrmDriver"})),
+            has_property("queries", greater_than(0)),
+        )))
+
+    def test_shouldReportTheFailedOperations(self):
+        self._create_workflow()
+        unauthorized_user = UserObjectFactory()
+        workflow_object = BasicTestModelObjectFactory().model
+
+        try:
+            workflow_object.river.my_field.approve(as_user=unauthorized_user)
+        except Exception:
+            pass
+
+        assert_that(self.listener.stopped, has_item(all_of(has_property("operation", "approve"), has_property("error", is_not(none())))))
+
+    def test_shouldNotMeasureAnythingWhenThereIsNoListener(self):
+        instrumentation.remove_listener(self.listener)
+
+        with instrumentation.measure("approve") as event:
+            assert_that(event, none())
+
+    def test_shouldNotLetAFailingListenerBreakTheOperation(self):
+        class FailingListener(InstrumentationListener):
+            def on_stop(self, event):
+                raise Exception("Failing listener")
+
+        failing_listener = instrumentation.add_listener(FailingListener())
+        try:
+            with instrumentation.measure("approve"):
+                pass
+        finally:
+            instrumentation.remove_listener(failing_listener)
+
+        assert_that(self.listener.stopped, has_length(1))
+
+
+# noinspection PyMethodMayBeStatic
+class MetricExporterTest(TestCase):
+
+    def test_shouldRenderTheEventsInPrometheusTextFormat(self):
+        exporter = PrometheusExporter(buckets=(0.01, 0.1))
+        exporter.on_stop(_event("approve", 0.05, 7))
+        exporter.on_stop(_event("approve", 0.5, 3, error=Exception()))
+        exporter.on_stop(_event("get_available_approvals", 0.001, 1, driver="OrmDriver"))
+
+        output = exporter.render()
+
+        assert_that(output, contains_string("# TYPE river_operation_duration_seconds histogram"))
+        assert_that(output, contains_string('river_operation_duration_seconds_bucket{operation="approve",le="0.01"} 0'))
+        assert_that(output, contains_string('river_operation_duration_seconds_bucket{operation="approve",le="0.1"} 1'))
+        assert_that(output, contains_string('river_operation_duration_seconds_bucket{operation="approve",le="+Inf"} 2'))
+        assert_that(output, contains_string('river_operation_duration_seconds_count{operation="approve"} 2'))
+        assert_that(output, contains_string('river_operation_queries_total{operation="approve"} 10'))
+        assert_that(output, contains_string('river_operation_errors_total{operation="approve"} 1'))
+        assert_that(output, contains_string('river_operation_queries_total{operation="get_available_approvals",driver="OrmDriver"} 1'))
+
+    def test_shouldSendTheEventsToStatsd(self):
+        statsd = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        statsd.bind(("127.0.0.1", 0))
+        statsd.settimeout(5)
+        exporter = StatsdExporter(host="127.0.0.1", port=statsd.getsockname()[1])
+        try:
+            exporter.on_stop(_event("approve", 0.0125, 4, error=Exception()))
+            packet = statsd.recv(4096).decode("ascii")
+        finally:
+            exporter.close()
+            statsd.close()
+
+        assert_that(packet.splitlines(), equal_to([
+            "river.approve.duration:12.500|ms",
+            "river.approve.queries:4|c",
+            "river.approve.errors:1|c",
+        ]))
@@ -0,0 +1,59 @@
+from unittest import skipUnless
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from hamcrest import assert_that, instance_of, contains_inanyorder, has_length
+from mock import patch
+
+from river.config import app_config
+from river.driver.orm_driver import OrmDriver
+from river.driver.postgres_driver import PostgresDriver
+from river.models.factories import PermissionObjectFactory, GroupObjectFactory, UserObjectFactory, StateObjectFactory, WorkflowFactory, \
+    TransitionMetaFactory, TransitionApprovalMetaFactory
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class PostgresDriverTest(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(PostgresDriverTest, self).__init__(*args, **kwargs)
+        self.content_type = ContentType.objects.get_for_model(BasicTestModel)
+
+    def test_shouldBePickedOnPostgreSQL(self):
+        state1 = StateObjectFactory(label="state1")
+        WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+
+        with patch.dict(app_config.settings, {"IS_MSSQL": False, "IS_POSTGRESQL": True}):
+            assert_that(BasicTestModel.river.my_field._river_driver, instance_of(PostgresDriver))
+
+    # It runs in the py36-dj2.2-postgresql* tox environments which the Travis build runs against PostgreSQL 9 to 12.
+    @skipUnless(connection.vendor == "postgresql", "PostgreSQL is required")
+    def test_shouldFindTheSameApprovalsAsTheOrmDriver(self):
+        authorized_permission = PermissionObjectFactory()
+        authorized_group = GroupObjectFactory()
+        authorized_user = UserObjectFactory(user_permissions=[authorized_permission], groups=[authorized_group])
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        state3 = StateObjectFactory(label="state3")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta_1 = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        transition_meta_2 = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state3)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_1, priority=0, permissions=[authorized_permission])
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_1, priority=1, permissions=[authorized_permission])
+        approval_meta = TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=0)
+        approval_meta.groups.add(authorized_group)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=1, permissions=[PermissionObjectFactory()])
+
+        for _ in range(3):
+            BasicTestModelObjectFactory()
+
+        postgres_approvals = PostgresDriver(workflow, BasicTestModel, "my_field").get_available_approvals(authorized_user)
+        orm_approvals = OrmDriver(workflow, BasicTestModel, "my_field").get_available_approvals(authorized_user)
+
+        assert_that(postgres_approvals, has_length(6))
+        assert_that(list(postgres_approvals), contains_inanyorder(*list(orm_approvals)))
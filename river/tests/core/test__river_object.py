@@ -0,0 +1,82 @@
+import copy
+import gc
+import pickle
+import weakref
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from hamcrest import assert_that, is_not, same_instance, equal_to, none
+
+from river.models.factories import PermissionObjectFactory, StateObjectFactory, WorkflowFactory, TransitionMetaFactory, TransitionApprovalMetaFactory
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class RiverObjectTest(TestCase):
+
+    def setUp(self):
+        authorized_permission = PermissionObjectFactory()
+
+        self.state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+
+        self.workflow = WorkflowFactory(initial_state=self.state1, content_type=ContentType.objects.get_for_model(BasicTestModel), field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=self.workflow, source_state=self.state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=self.workflow, transition_meta=transition_meta, priority=0, permissions=[authorized_permission])
+
+    def test_shouldMemoizeTheInstanceWorkflowObjectsOnTheInstance(self):
+        workflow_object = BasicTestModelObjectFactory().model
+        instance_workflow = workflow_object.river.my_field
+
+        with self.assertNumQueries(0):
+            assert_that(workflow_object.river.my_field, same_instance(instance_workflow))
+
+        assert_that(BasicTestModel.objects.get(pk=workflow_object.pk).river.my_field, is_not(same_instance(instance_workflow)))
+
+    def test_shouldNotKeepTheInstanceAliveByTheMemoizedInstanceWorkflowObjects(self):
+        workflow_object = BasicTestModelObjectFactory().model
+        assert_that(workflow_object.river.my_field.get_state(), equal_to(self.state1))
+        reference = weakref.ref(workflow_object)
+
+        gc.disable()
+        try:
+            del workflow_object
+            assert_that(reference(), none())
+        finally:
+            gc.enable()
+
+    def test_shouldKeepAnInstanceWhichIsNotReferredToAnywhereElseAliveByItsInstanceWorkflowObjects(self):
+        workflow_object = BasicTestModelObjectFactory().model
+
+        assert_that(BasicTestModel.objects.get(pk=workflow_object.pk).river.my_field.get_state(), equal_to(self.state1))
+
+    def test_shouldMemoizeTheClassWorkflowObjectsUntilTheWorkflowMetadataChanges(self):
+        class_workflow = BasicTestModel.river.my_field
+
+        with self.assertNumQueries(0):
+            assert_that(BasicTestModel.river.my_field, same_instance(class_workflow))
+
+        StateObjectFactory(label="state3")
+
+        assert_that(BasicTestModel.river.my_field, is_not(same_instance(class_workflow)))
+
+    def test_shouldForgetTheInstanceWorkflowObjectsWhenTheInstanceIsRefreshed(self):
+        workflow_object = BasicTestModelObjectFactory().model
+        instance_workflow = workflow_object.river.my_field
+        assert_that(instance_workflow.get_state(), equal_to(self.state1))
+
+        workflow_object.refresh_from_db()
+
+        assert_that(workflow_object.river.my_field, is_not(same_instance(instance_workflow)))
+
+    def test_shouldNotShareTheInstanceWorkflowObjectsWithTheCopiesOfTheInstance(self):
+        workflow_object = BasicTestModelObjectFactory().model
+        workflow_object.river.my_field
+
+        copied = copy.copy(workflow_object)
+        unpickled = pickle.loads(pickle.dumps(workflow_object))
+
+        assert_that(copied.river.my_field.workflow_object, same_instance(copied))
+        assert_that(unpickled.river.my_field.workflow_object, same_instance(unpickled))
+        assert_that(copy.deepcopy(workflow_object).my_field, equal_to(self.state1))
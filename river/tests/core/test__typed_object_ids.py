@@ -0,0 +1,69 @@
+from uuid import uuid4
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase
+from six import StringIO
+from hamcrest import assert_that, equal_to, has_length, only_contains, has_property, none, is_not, contains_string
+
+from river.models import Transition, TransitionApproval
+from river.models.factories import PermissionObjectFactory, UserObjectFactory, StateObjectFactory, WorkflowFactory, TransitionMetaFactory, \
+    TransitionApprovalMetaFactory
+from river.tests.models import BasicTestModel, ModelWithStringPrimaryKey
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class TypedObjectIdTest(TestCase):
+
+    def _create_workflow(self, content_type, field_name):
+        self.authorized_permission = PermissionObjectFactory()
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=content_type, field_name=field_name)
+        transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0, permissions=[self.authorized_permission])
+        return workflow
+
+    def test_shouldPopulateTheIntegerObjectIdsOfTheWorkflowObjectsWithIntegerPrimaryKeys(self):
+        self._create_workflow(ContentType.objects.get_for_model(BasicTestModel), "my_field")
+
+        workflow_object = BasicTestModelObjectFactory().model
+
+        assert_that(list(workflow_object.my_field_transitions.all()), only_contains(has_property("object_id_int", workflow_object.pk)))
+        assert_that(list(workflow_object.my_field_transition_approvals.all()), only_contains(has_property("object_id_int", workflow_object.pk)))
+
+    def test_shouldNotPopulateTheTypedObjectIdsOfTheWorkflowObjectsWithStringPrimaryKeys(self):
+        self._create_workflow(ContentType.objects.get_for_model(ModelWithStringPrimaryKey), "status")
+
+        workflow_object = ModelWithStringPrimaryKey.objects.create(custom_pk=str(uuid4()))
+
+        approvals = TransitionApproval.objects.filter(workflow_object=workflow_object)
+        assert_that(approvals, has_length(1))
+        assert_that(approvals[0].object_id_int, none())
+        assert_that(approvals[0].object_id_uuid, none())
+
+    def test_shouldNotCastTheObjectIdsWhileLookingUpTheAvailableApprovals(self):
+        self._create_workflow(ContentType.objects.get_for_model(BasicTestModel), "my_field")
+        authorized_user = UserObjectFactory(user_permissions=[self.authorized_permission])
+        workflow_object = BasicTestModelObjectFactory().model
+
+        available_approvals = BasicTestModel.river.my_field.get_available_approvals(as_user=authorized_user)
+
+        assert_that(str(available_approvals.query), is_not(contains_string("CAST")))
+        assert_that(list(available_approvals), equal_to(list(workflow_object.my_field_transition_approvals.all())))
+
+    def test_shouldBackfillTheMissingTypedObjectIds(self):
+        self._create_workflow(ContentType.objects.get_for_model(BasicTestModel), "my_field")
+        workflow_object = BasicTestModelObjectFactory().model
+        Transition.objects.update(object_id_int=None)
+        TransitionApproval.objects.update(object_id_int=None)
+
+        out = StringIO()
+        call_command("river_backfill_object_ids", stdout=out)
+
+        assert_that(out.getvalue(), contains_string("1 rows of Transition are backfilled"))
+        assert_that(list(workflow_object.my_field_transitions.all()), only_contains(has_property("object_id_int", workflow_object.pk)))
+        assert_that(list(workflow_object.my_field_transition_approvals.all()), only_contains(has_property("object_id_int", workflow_object.pk)))
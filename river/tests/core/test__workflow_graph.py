@@ -0,0 +1,161 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.test import TestCase
+from hamcrest import assert_that, equal_to, has_length, has_item, none, contains_inanyorder, same_instance
+
+from river.core.workflowgraph import workflow_graph_cache
+from river.models.factories import StateObjectFactory, WorkflowFactory, TransitionMetaFactory, TransitionApprovalMetaFactory, PermissionObjectFactory, \
+    GroupObjectFactory
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class WorkflowGraphTest(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(WorkflowGraphTest, self).__init__(*args, **kwargs)
+        self.content_type = ContentType.objects.get_for_model(BasicTestModel)
+
+    def test_shouldCompileTheWholeWorkflow(self):
+        authorized_permission = PermissionObjectFactory()
+        authorized_group = GroupObjectFactory()
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        state3 = StateObjectFactory(label="state3")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta_1 = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        transition_meta_2 = TransitionMetaFactory.create(workflow=workflow, source_state=state2, destination_state=state3)
+
+        approval_meta_1 = TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_1, priority=0, permissions=[authorized_permission])
+        approval_meta_2 = TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=0)
+        approval_meta_2.groups.add(authorized_group)
+
+        graph = workflow_graph_cache.get(self.content_type, "my_field")
+
+        assert_that(graph.workflow, equal_to(workflow))
+        assert_that(graph.initial_state, equal_to(state1))
+        assert_that(graph.final_state_ids, contains_inanyorder(state3.pk))
+        assert_that(graph.get_transition_metas_from([state1.pk]), contains_inanyorder(transition_meta_1))
+        assert_that(graph.get_approval_metas(transition_meta_2), contains_inanyorder(approval_meta_2))
+        assert_that(graph.get_permission_ids(approval_meta_1), contains_inanyorder(authorized_permission.pk))
+        assert_that(graph.get_group_ids(approval_meta_2), contains_inanyorder(authorized_group.pk))
+
+    def test_shouldNotHitTheDatabaseForTheSameWorkflowTwice(self):
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0)
+
+        graph = workflow_graph_cache.get(self.content_type, "my_field")
+
+        with self.assertNumQueries(0):
+            assert_that(workflow_graph_cache.get(self.content_type, "my_field"), same_instance(graph))
+            assert_that(BasicTestModel.river.my_field.initial_state, equal_to(state1))
+            assert_that(BasicTestModel.river.my_field.workflow, equal_to(workflow))
+
+    def test_shouldForgetTheGraphThatIsBuiltWithARolledBackMetadataChange(self):
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0)
+        assert_that(workflow_graph_cache.get(self.content_type, "my_field").final_state_ids, contains_inanyorder(state2.pk))
+
+        try:
+            with transaction.atomic():
+                state3 = StateObjectFactory(label="state3")
+                rolled_back_transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=state2, destination_state=state3)
+                TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=rolled_back_transition_meta, priority=0)
+                assert_that(workflow_graph_cache.get(self.content_type, "my_field").final_state_ids, contains_inanyorder(state3.pk))
+                assert_that(BasicTestModel.river.my_field.final_states, has_length(1))
+                raise RuntimeError("Rolling back")
+        except RuntimeError:
+            pass
+
+        assert_that(workflow_graph_cache.get(self.content_type, "my_field").final_state_ids, contains_inanyorder(state2.pk))
+        assert_that(BasicTestModel.river.my_field.final_states, contains_inanyorder(state2))
+        workflow_object = BasicTestModelObjectFactory().model
+        assert_that(workflow_object.river.my_field.get_state(), equal_to(state1))
+
+    def test_shouldBeInvalidatedWhenTheMetadataChanges(self):
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        state3 = StateObjectFactory(label="state3")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta_1 = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        approval_meta_1 = TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_1, priority=0)
+
+        assert_that(workflow_graph_cache.get(self.content_type, "my_field").final_state_ids, contains_inanyorder(state2.pk))
+
+        transition_meta_2 = TransitionMetaFactory.create(workflow=workflow, source_state=state2, destination_state=state3)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=0)
+
+        assert_that(workflow_graph_cache.get(self.content_type, "my_field").final_state_ids, contains_inanyorder(state3.pk))
+
+        permission = PermissionObjectFactory()
+        approval_meta_1.permissions.add(permission)
+
+        assert_that(workflow_graph_cache.get(self.content_type, "my_field").get_permission_ids(approval_meta_1), contains_inanyorder(permission.pk))
+
+    def test_shouldCacheTheAbsenceOfAWorkflow(self):
+        assert_that(workflow_graph_cache.get(self.content_type, "my_field"), none())
+
+        state1 = StateObjectFactory(label="state1")
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+
+        assert_that(workflow_graph_cache.get(self.content_type, "my_field").workflow, equal_to(workflow))
+
+    def test_shouldInitializeApprovalsFromTheCompiledGraph(self):
+        authorized_permission = PermissionObjectFactory()
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        state3 = StateObjectFactory(label="state3")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta_1 = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        transition_meta_2 = TransitionMetaFactory.create(workflow=workflow, source_state=state2, destination_state=state3)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_1, priority=0, permissions=[authorized_permission])
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=0, permissions=[authorized_permission])
+
+        workflow_object = BasicTestModelObjectFactory().model
+
+        transitions = list(workflow_object.my_field_transitions.order_by("iteration"))
+        assert_that(transitions, has_length(2))
+        assert_that([transition.iteration for transition in transitions], equal_to([0, 1]))
+        assert_that([transition.meta for transition in transitions], equal_to([transition_meta_1, transition_meta_2]))
+
+        approvals = workflow_object.my_field_transition_approvals.all()
+        assert_that(approvals, has_length(2))
+        for approval in approvals:
+            assert_that(list(approval.permissions.all()), has_item(authorized_permission))
+
+    def test_shouldTellWhetherAnObjectIsOnTheInitialOrTheFinalStateWithoutHittingTheDatabase(self):
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        state3 = StateObjectFactory(label="state3")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta_1 = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        transition_meta_2 = TransitionMetaFactory.create(workflow=workflow, source_state=state2, destination_state=state3)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_1, priority=0)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=0)
+
+        workflow_object = BasicTestModelObjectFactory().model
+        workflow_object.river.my_field
+
+        with self.assertNumQueries(0):
+            assert_that(workflow_object.river.my_field.on_initial_state, equal_to(True))
+            assert_that(workflow_object.river.my_field.on_final_state, equal_to(False))
+
+        workflow_object.my_field = state3
+        with self.assertNumQueries(0):
+            assert_that(workflow_object.river.my_field.on_initial_state, equal_to(False))
+            assert_that(workflow_object.river.my_field.on_final_state, equal_to(True))
@@ -0,0 +1,195 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from hamcrest import assert_that, equal_to, has_length, has_property, contains_string, all_of, contains_inanyorder
+
+from river.core.workflowspec import export_workflows, import_workflows
+from river.models import State, Workflow, TransitionMeta, TransitionApprovalMeta, OnApprovedHook, OnTransitHook, OnCompleteHook, Function
+from river.models.function import loaded_functions
+from river.models.factories import PermissionObjectFactory, GroupObjectFactory, UserObjectFactory
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+from river.utils.error_code import ErrorCode
+from river.utils.exceptions import RiverException
+
+CALLBACK = """
+def handle(context):
+    pass
+"""
+
+
+def _spec(number_of_states=3, permissions=(), groups=(), function_name="callback"):
+    return {
+        "version": 1,
+        "states": [{"slug": "state%s" % index, "label": "State %s" % index} for index in range(number_of_states)],
+        "functions": [{"name": function_name, "body": CALLBACK}],
+        "workflows": [{
+            "model": "tests.basictestmodel",
+            "field_name": "my_field",
+            "initial_state": "state0",
+            "transitions": [
+                {
+                    "source": "state%s" % index,
+                    "destination": "state%s" % (index + 1),
+                    "approvals": [
+                        {"priority": 0, "permissions": list(permissions), "groups": list(groups), "hooks": [{"function": function_name, "type": "BEFORE"}]},
+                        {"priority": 1, "permissions": list(permissions)},
+                    ],
+                    "hooks": [{"function": function_name, "type": "AFTER"}],
+                }
+                for index in range(number_of_states - 1)
+            ],
+            "hooks": [{"function": function_name, "type": "AFTER"}],
+        }],
+    }
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class WorkflowSpecTest(TestCase):
+
+    def setUp(self):
+        self.permission = PermissionObjectFactory()
+        self.permission_name = "%s.%s" % (self.permission.content_type.app_label, self.permission.codename)
+        self.group = GroupObjectFactory()
+        ContentType.objects.get_for_model(BasicTestModel)
+
+    def test_shouldImportAWorkflowThatWorks(self):
+        workflows = import_workflows(_spec(permissions=[self.permission_name], groups=[self.group.name]))
+
+        assert_that(workflows, has_length(1))
+        workflow = workflows[0]
+        assert_that(workflow, all_of(
+            has_property("content_type", ContentType.objects.get_for_model(BasicTestModel)),
+            has_property("field_name", "my_field"),
+            has_property("initial_state", State.objects.get(slug="state0")),
+        ))
+        assert_that(TransitionMeta.objects.filter(workflow=workflow), has_length(2))
+        assert_that(TransitionApprovalMeta.objects.filter(workflow=workflow), has_length(4))
+        assert_that(OnApprovedHook.objects.filter(workflow=workflow), has_length(2))
+        assert_that(OnTransitHook.objects.filter(workflow=workflow), has_length(2))
+        assert_that(OnCompleteHook.objects.filter(workflow=workflow), has_length(1))
+
+        second_approval_meta = TransitionApprovalMeta.objects.get(workflow=workflow, transition_meta__source_state__slug="state1", priority=0)
+        assert_that(second_approval_meta.parents.all(), contains_inanyorder(*TransitionApprovalMeta.objects.filter(transition_meta__source_state__slug="state0")))
+        assert_that(second_approval_meta.groups.all(), contains_inanyorder(self.group))
+
+        authorized_user = UserObjectFactory(user_permissions=[self.permission])
+        authorized_user.groups.add(self.group)
+        workflow_object = BasicTestModelObjectFactory().model
+        workflow_object.river.my_field.approve(as_user=authorized_user)
+        workflow_object.river.my_field.approve(as_user=authorized_user)
+        assert_that(workflow_object.my_field, equal_to(State.objects.get(slug="state1")))
+        assert_that(workflow_object.river.my_field.on_final_state, equal_to(False))
+
+    def test_shouldExportTheSameSpecThatIsImported(self):
+        spec = _spec(permissions=[self.permission_name], groups=[self.group.name])
+        workflows = import_workflows(spec)
+
+        exported = export_workflows(workflows)
+
+        assert_that(exported["workflows"][0]["transitions"][0]["approvals"][0], equal_to({
+            "priority": 0,
+            "permissions": [self.permission_name],
+            "groups": [self.group.name],
+            "hooks": [{"function": "callback", "type": "BEFORE"}],
+        }))
+        assert_that([state["slug"] for state in exported["states"]], equal_to(["state0", "state1", "state2"]))
+        assert_that(export_workflows(import_workflows(exported)), equal_to(exported))
+
+    def test_shouldUpdateTheExistingWorkflowWithoutDuplicatingAnything(self):
+        import_workflows(_spec(permissions=[self.permission_name]))
+        spec = _spec(number_of_states=4)
+        spec["states"][0]["label"] = "Renamed"
+
+        import_workflows(spec)
+
+        workflow = Workflow.objects.get(field_name="my_field")
+        assert_that(State.objects.get(slug="state0").label, equal_to("Renamed"))
+        assert_that(TransitionMeta.objects.filter(workflow=workflow), has_length(3))
+        assert_that(TransitionApprovalMeta.objects.filter(workflow=workflow), has_length(6))
+        assert_that(OnTransitHook.objects.filter(workflow=workflow), has_length(3))
+        assert_that(OnCompleteHook.objects.filter(workflow=workflow), has_length(1))
+        assert_that(TransitionApprovalMeta.objects.filter(workflow=workflow, permissions__isnull=False), has_length(0))
+
+    def test_shouldUpdateTheChangedFunctionsWithAFixedNumberOfQueries(self):
+        spec = _spec(number_of_states=2)
+        spec["functions"].extend({"name": "function%s" % index, "body": CALLBACK} for index in range(3))
+        import_workflows(spec)
+        callback = Function.objects.get(name="callback")
+        callback.get()
+
+        spec["functions"][0]["body"] = CALLBACK + "\n"
+        with CaptureQueriesContext(connection) as one_changed:
+            import_workflows(spec)
+        for function_spec in spec["functions"]:
+            function_spec["body"] = CALLBACK + "\n\n"
+        with CaptureQueriesContext(connection) as all_changed:
+            import_workflows(spec)
+
+        assert_that(len(all_changed), equal_to(len(one_changed)))
+        assert_that(Function.objects.get(name="callback"), all_of(has_property("body", CALLBACK + "\n\n"), has_property("version", callback.version + 2)))
+        assert_that(Function.objects.get(name="function0"), has_property("version", callback.version + 1))
+        assert_that([key for key in loaded_functions if key[0] == callback.pk], has_length(0))
+
+    def test_shouldImportWithAFixedNumberOfQueries(self):
+        with CaptureQueriesContext(connection) as small:
+            import_workflows(_spec(number_of_states=3, permissions=[self.permission_name], groups=[self.group.name], function_name="small"))
+        Workflow.objects.all().update(field_name="another_field")
+        State.objects.all().update(slug=None)
+
+        with CaptureQueriesContext(connection) as large:
+            import_workflows(_spec(number_of_states=30, permissions=[self.permission_name], groups=[self.group.name], function_name="large"))
+
+        assert_that(len(large), equal_to(len(small)))
+
+    def test_shouldReportAllTheProblemsOfAnInvalidSpecWithoutWritingAnything(self):
+        spec = _spec(permissions=["river.does_not_exist"], groups=["No such group"])
+        spec["workflows"][0]["transitions"].append({"source": "state0", "destination": "unknown", "approvals": [{}]})
+        spec["workflows"][0]["transitions"].append({"source": "state2", "destination": "state1", "approvals": []})
+        spec["states"].append({"slug": "island", "label": "Island"})
+        spec["workflows"][0]["transitions"].append({"source": "island", "destination": "state0", "approvals": [{"hooks": [{"function": "missing"}]}]})
+        spec["states"].append({"slug": ["unhashable"], "label": "Unhashable"})
+        spec["functions"].append({"name": ["unhashable"], "body": CALLBACK})
+        spec["workflows"].append({
+            "model": ["tests.basictestmodel"],
+            "field_name": ["my_field"],
+            "initial_state": ["state0"],
+            "transitions": [{
+                "source": ["state0"],
+                "destination": "state1",
+                "approvals": [{"priority": [0]}, {"priority": [0], "hooks": [{"function": "callback", "type": ["AFTER"]}]}],
+            }],
+        })
+
+        try:
+            import_workflows(spec)
+        except RiverException as e:
+            assert_that(str(e), all_of(
+                contains_string("Permission river.does_not_exist does not exist."),
+                contains_string("Group No such group does not exist."),
+                contains_string("destination unknown should be one of the states in the spec."),
+                contains_string("transition state2 -> state1 should have at least one approval."),
+                contains_string("state island is not reachable from the initial state."),
+                contains_string("Function missing is neither defined in the spec nor exists."),
+                contains_string("State #5 slug and description should be strings."),
+                contains_string("Function #2 should have a name and a body."),
+                contains_string("Workflow #2 model"),
+                contains_string("Workflow #2 field_name"),
+                contains_string("Workflow #2 initial state"),
+                contains_string("Workflow #2 transition #1 source"),
+                contains_string("Workflow #2 transition None -> state1 approval #2 should have an integer priority."),
+                contains_string("Workflow #2 transition None -> state1 approval #2 hook #1 type should be one of BEFORE, AFTER."),
+            ))
+        else:
+            raise AssertionError("The spec should have been rejected.")
+        assert_that(Workflow.objects.all(), has_length(0))
+        assert_that(State.objects.all(), has_length(0))
+
+    def test_shouldRaiseTheErrorCodeOfAnInvalidSpec(self):
+        try:
+            import_workflows({"version": 2})
+        except RiverException as e:
+            assert_that(e.code, equal_to(ErrorCode.INVALID_WORKFLOW_SPEC))
+        else:
+            raise AssertionError("The spec should have been rejected.")
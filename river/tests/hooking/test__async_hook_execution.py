@@ -0,0 +1,121 @@
+from uuid import uuid4
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import override_settings
+from hamcrest import assert_that, equal_to, has_length, none, has_entry
+from mock import patch
+
+from river.core.hookexecutor import hook_executor
+from river.models import Function, OnCompleteHook
+from river.models.factories import PermissionObjectFactory, UserObjectFactory, StateObjectFactory, WorkflowFactory, TransitionApprovalMetaFactory, \
+    TransitionMetaFactory
+from river.models.hook import BEFORE, AFTER
+from river.tests.hooking.base_hooking_test import BaseHookingTest, callback_output
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+failing_callback_method = """
+from river.tests.hooking.base_hooking_test import callback_output
+def handle(context):
+    key = '%s'
+    callback_output[key] = callback_output.get(key,[]) + [context]
+    if len(callback_output[key]) < 2:
+        raise Exception("It fails at the first attempt")
+"""
+
+
+# noinspection DuplicatedCode
+@override_settings(RIVER_HOOK_EXECUTION="async", RIVER_HOOK_RETRY_DELAY=0)
+class AsyncHookExecutionTest(BaseHookingTest):
+
+    def tearDown(self):
+        hook_executor.shutdown()
+        super(AsyncHookExecutionTest, self).tearDown()
+
+    def _create_workflow(self):
+        self.authorized_permission = PermissionObjectFactory()
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+
+        content_type = ContentType.objects.get_for_model(BasicTestModel)
+        self.workflow = WorkflowFactory(initial_state=state1, content_type=content_type, field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=self.workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=self.workflow, transition_meta=transition_meta, priority=0, permissions=[self.authorized_permission])
+
+    def _approve_and_commit(self):
+        authorized_user = UserObjectFactory(user_permissions=[self.authorized_permission])
+        workflow_object = BasicTestModelObjectFactory().model
+
+        with patch("river.core.hookexecutor.transaction.on_commit") as on_commit:
+            workflow_object.river.my_field.approve(as_user=authorized_user)
+
+        assert_that(self.get_output(), none())
+
+        for on_commit_call in on_commit.call_args_list:
+            on_commit_call[0][0]()
+        hook_executor.shutdown()
+
+    def test_shouldRunTheAfterHooksOnlyOnceTheTransactionIsCommitted(self):
+        self._create_workflow()
+        self.hook_post_complete(self.workflow)
+
+        self._approve_and_commit()
+
+        output = self.get_output()
+        assert_that(output, has_length(1))
+        assert_that(output[0]["hook"], has_entry("when", AFTER))
+
+    @override_settings(RIVER_HOOK_RETRIES=1)
+    def test_shouldRetryTheFailingAfterHooksOnceTheTransactionIsCommitted(self):
+        self._create_workflow()
+        self.callback_function = Function.objects.create(name=uuid4(), body=failing_callback_method % self.identifier)
+        self.hook_post_complete(self.workflow)
+
+        self._approve_and_commit()
+
+        output = self.get_output()
+        assert_that(output, has_length(2))
+        assert_that(output[1]["hook"], has_entry("when", AFTER))
+
+    def test_shouldKeepRunningTheBeforeHooksSynchronously(self):
+        self._create_workflow()
+        authorized_user = UserObjectFactory(user_permissions=[self.authorized_permission])
+        workflow_object = BasicTestModelObjectFactory().model
+
+        self.hook_pre_complete(self.workflow)
+
+        workflow_object.river.my_field.approve(as_user=authorized_user)
+
+        output = self.get_output()
+        assert_that(output, has_length(1))
+        assert_that(output[0]["hook"], has_entry("when", BEFORE))
+
+    def test_shouldRunTheSubmittedHooksOnTheWorkerPool(self):
+        self._create_workflow()
+        hook = OnCompleteHook(workflow=self.workflow, callback_function=self.callback_function, hook_type=AFTER)
+
+        future = hook_executor.submit(hook, {"hook": {"when": AFTER}})
+
+        assert_that(future.result(timeout=10), equal_to(True))
+        assert_that(self.get_output(), has_length(1))
+
+    @override_settings(RIVER_HOOK_RETRIES=1)
+    def test_shouldRetryTheFailingHooks(self):
+        self._create_workflow()
+        identifier = str(uuid4())
+        callback_function = Function.objects.create(name=uuid4(), body=failing_callback_method % identifier)
+        hook = OnCompleteHook(workflow=self.workflow, callback_function=callback_function, hook_type=AFTER)
+
+        future = hook_executor.submit(hook, {"hook": {"when": AFTER}})
+
+        assert_that(future.result(timeout=10), equal_to(True))
+        assert_that(callback_output[identifier], has_length(2))
+
+    @override_settings(RIVER_HOOK_QUEUE_SIZE=0)
+    def test_shouldRunTheHooksOnTheCommittingThreadWhenTheQueueIsFull(self):
+        self._create_workflow()
+        hook = OnCompleteHook(workflow=self.workflow, callback_function=self.callback_function, hook_type=AFTER)
+
+        assert_that(hook_executor.submit(hook, {"hook": {"when": AFTER}}), none())
+        assert_that(self.get_output(), has_length(1))
@@ -0,0 +1,68 @@
+from uuid import uuid4
+
+from django.test import TestCase, override_settings
+from hamcrest import assert_that, same_instance, is_not, has_length, has_key, equal_to, empty
+
+from river.models import Function
+from river.models.function import loaded_functions
+
+callback_method = """
+def handle(context):
+    context["output"] = %s
+"""
+
+
+# noinspection PyMethodMayBeStatic
+class FunctionCacheTest(TestCase):
+
+    def test_shouldCompileAFunctionOnlyOnce(self):
+        function = Function.objects.create(name=uuid4(), body=callback_method % 1)
+
+        assert_that(Function.objects.get(pk=function.pk).get(), same_instance(function.get()))
+
+    def test_shouldRecompileAFunctionWhenItIsUpdated(self):
+        function = Function.objects.create(name=uuid4(), body=callback_method % 1)
+        compiled = function.get()
+
+        function.body = callback_method % 2
+        function.save()
+
+        assert_that([key for key in loaded_functions if key[0] == function.pk], empty())
+        assert_that(function.get(), is_not(same_instance(compiled)))
+
+        context = {}
+        function.get()(context)
+        assert_that(context["output"], equal_to(2))
+
+    def test_shouldNotRunTheCachedFunctionOfAnotherBodyWithTheSamePrimaryKeyAndVersion(self):
+        function = Function.objects.create(name=uuid4(), body=callback_method % 1)
+        function.get()
+
+        context = {}
+        Function(pk=function.pk, name=uuid4(), body=callback_method % 2, version=function.version).get()(context)
+
+        assert_that(context["output"], equal_to(2))
+
+    @override_settings(RIVER_FUNCTION_CACHE_SIZE=2)
+    def test_shouldEvictTheLeastRecentlyUsedFunctions(self):
+        function1 = Function.objects.create(name=uuid4(), body=callback_method % 1)
+        function2 = Function.objects.create(name=uuid4(), body=callback_method % 2)
+        function3 = Function.objects.create(name=uuid4(), body=callback_method % 3)
+
+        function1.get()
+        function2.get()
+        function1.get()
+        function3.get()
+
+        assert_that(loaded_functions, has_length(2))
+        assert_that(loaded_functions, has_key((function1.pk, function1.version)))
+        assert_that(loaded_functions, is_not(has_key((function2.pk, function2.version))))
+
+    def test_shouldEvictADeletedFunction(self):
+        function = Function.objects.create(name=uuid4(), body=callback_method % 1)
+        function.get()
+
+        function_id = function.pk
+        function.delete()
+
+        assert_that([key for key in loaded_functions if key[0] == function_id], empty())
@@ -0,0 +1,140 @@
+from uuid import uuid4
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from hamcrest import assert_that, equal_to, has_length
+
+from river.models import Function, OnApprovedHook, TransitionApprovalMeta, PENDING, APPROVED
+from river.models.factories import PermissionObjectFactory, UserObjectFactory, StateObjectFactory, WorkflowFactory, TransitionApprovalMetaFactory, \
+    TransitionMetaFactory
+from river.models.hook import BEFORE, AFTER
+from river.signals import HookDispatcher
+from river.tests.hooking.base_hooking_test import BaseHookingTest, callback_output
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+
+status_recording_method = """
+from river.models import TransitionApproval
+from river.tests.hooking.base_hooking_test import callback_output
+def handle(context):
+    approval = context["hook"]["payload"]["transition_approval"]
+    key = '%s'
+    callback_output[key] = callback_output.get(key, []) + [(context["hook"]["when"], TransitionApproval.objects.get(pk=approval.pk).status)]
+"""
+
+
+# noinspection DuplicatedCode
+class HookDispatcherTest(BaseHookingTest):
+
+    def _create_workflow_with_hooks(self, with_object_hooks=True):
+        self.authorized_permission = PermissionObjectFactory()
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+
+        self.content_type = ContentType.objects.get_for_model(BasicTestModel)
+        self.workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=self.workflow, source_state=state1, destination_state=state2)
+        meta = TransitionApprovalMetaFactory.create(workflow=self.workflow, transition_meta=transition_meta, priority=0, permissions=[self.authorized_permission])
+
+        self.workflow_object = BasicTestModelObjectFactory().model
+
+        hooked_object = self.workflow_object if with_object_hooks else None
+        self.hook_pre_approve(self.workflow, meta)
+        self.hook_post_approve(self.workflow, meta, workflow_object=hooked_object)
+        self.hook_pre_transition(self.workflow, transition_meta)
+        self.hook_post_transition(self.workflow, transition_meta, workflow_object=hooked_object)
+        self.hook_pre_complete(self.workflow)
+        self.hook_post_complete(self.workflow, workflow_object=hooked_object)
+
+    def test_shouldFireTheHooksInTheNestedOrder(self):
+        self._create_workflow_with_hooks()
+        authorized_user = UserObjectFactory(user_permissions=[self.authorized_permission])
+
+        self.workflow_object.river.my_field.approve(as_user=authorized_user)
+
+        output = self.get_output()
+        assert_that(output, has_length(6))
+        assert_that([(context["hook"]["type"], context["hook"]["when"]) for context in output], equal_to([
+            ("on-approved", BEFORE),
+            ("on-transit", BEFORE),
+            ("on-complete", BEFORE),
+            ("on-complete", AFTER),
+            ("on-transit", AFTER),
+            ("on-approved", AFTER),
+        ]))
+
+    def test_shouldLoadTheHooksOfTheWorkflowObjectWithASingleQuery(self):
+        self._create_workflow_with_hooks()
+        approval = self.workflow_object.my_field_transition_approvals.select_related("transition").first()
+        HookDispatcher(self.workflow, self.workflow_object, self.content_type, approval, True, True)
+
+        with self.assertNumQueries(1):
+            dispatcher = HookDispatcher(self.workflow, self.workflow_object, self.content_type, approval, True, True)
+
+        assert_that([len(signal.hooks[BEFORE]) + len(signal.hooks[AFTER]) for signal in dispatcher.signals], equal_to([2, 2, 2]))
+
+    def test_shouldNotHitTheDatabaseWhenNoObjectOfTheWorkflowHasHooksOfItsOwn(self):
+        self._create_workflow_with_hooks(with_object_hooks=False)
+        approval = self.workflow_object.my_field_transition_approvals.select_related("transition").first()
+        HookDispatcher(self.workflow, self.workflow_object, self.content_type, approval, True, True)
+
+        with self.assertNumQueries(0):
+            dispatcher = HookDispatcher(self.workflow, self.workflow_object, self.content_type, approval, True, True)
+
+        assert_that([len(signal.hooks[BEFORE]) + len(signal.hooks[AFTER]) for signal in dispatcher.signals], equal_to([2, 2, 2]))
+
+    def test_shouldLoadNoHookForTheWorkflowObjectsWithoutHooksOfTheirOwn(self):
+        self._create_workflow_with_hooks()
+        workflow_object = BasicTestModelObjectFactory().model
+        approval = workflow_object.my_field_transition_approvals.select_related("transition").first()
+        HookDispatcher(self.workflow, workflow_object, self.content_type, approval, True, True)
+
+        with self.assertNumQueries(1):
+            dispatcher = HookDispatcher(self.workflow, workflow_object, self.content_type, approval, True, True)
+
+        assert_that([len(signal.hooks[BEFORE]) + len(signal.hooks[AFTER]) for signal in dispatcher.signals], equal_to([1, 1, 1]))
+
+    def test_shouldPickTheNewHooksUp(self):
+        self._create_workflow_with_hooks()
+        workflow_object = BasicTestModelObjectFactory().model
+        approval = workflow_object.my_field_transition_approvals.select_related("transition").first()
+        HookDispatcher(self.workflow, workflow_object, self.content_type, approval, True, True)
+
+        self.hook_post_complete(self.workflow)
+        self.hook_pre_complete(self.workflow, workflow_object=workflow_object)
+
+        dispatcher = HookDispatcher(self.workflow, workflow_object, self.content_type, approval, True, True)
+        assert_that([len(signal.hooks[BEFORE]) + len(signal.hooks[AFTER]) for signal in dispatcher.signals], equal_to([1, 1, 3]))
+
+    def test_shouldForgetTheHooksThatAreRolledBack(self):
+        self._create_workflow_with_hooks(with_object_hooks=False)
+        workflow_object = BasicTestModelObjectFactory().model
+        approval = workflow_object.my_field_transition_approvals.select_related("transition").first()
+
+        try:
+            with transaction.atomic():
+                self.hook_post_complete(self.workflow)
+                dispatcher = HookDispatcher(self.workflow, workflow_object, self.content_type, approval, True, True)
+                assert_that([len(signal.hooks[BEFORE]) + len(signal.hooks[AFTER]) for signal in dispatcher.signals], equal_to([2, 2, 3]))
+                raise RuntimeError("Rolling back")
+        except RuntimeError:
+            pass
+
+        dispatcher = HookDispatcher(self.workflow, workflow_object, self.content_type, approval, True, True)
+        assert_that([len(signal.hooks[BEFORE]) + len(signal.hooks[AFTER]) for signal in dispatcher.signals], equal_to([2, 2, 2]))
+
+    def test_shouldFireTheBeforeHooksOfTheApprovalsThatAreApprovedInBulkBeforeWritingThem(self):
+        self._create_workflow_with_hooks(with_object_hooks=False)
+        authorized_user = UserObjectFactory(user_permissions=[self.authorized_permission])
+        workflow_objects = [self.workflow_object, BasicTestModelObjectFactory().model]
+        meta = TransitionApprovalMeta.objects.get(workflow=self.workflow)
+        key = str(uuid4())
+        function = Function.objects.create(name=uuid4(), body=status_recording_method % key)
+        OnApprovedHook.objects.create(workflow=self.workflow, callback_function=function, transition_approval_meta=meta, hook_type=BEFORE)
+        OnApprovedHook.objects.create(workflow=self.workflow, callback_function=function, transition_approval_meta=meta, hook_type=AFTER)
+
+        BasicTestModel.river.my_field.approve_many(as_user=authorized_user, workflow_objects=workflow_objects)
+
+        assert_that(callback_output[key], equal_to([(BEFORE, PENDING), (BEFORE, PENDING), (AFTER, APPROVED), (AFTER, APPROVED)]))
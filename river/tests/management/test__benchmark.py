@@ -0,0 +1,42 @@
+import json
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from hamcrest import assert_that, has_entry, has_key, all_of, has_length, calling, raises, greater_than
+from six import StringIO
+
+from river.models import Workflow, Transition
+from river.models.factories import StateObjectFactory, WorkflowFactory
+from river.tests.models import BasicTestModel
+
+
+# noinspection PyMethodMayBeStatic
+class BenchmarkTest(TestCase):
+
+    def test_shouldReportTheQueryCountsAndTheTimingsOfTheCoreApi(self):
+        out = StringIO()
+        call_command("river_benchmark", "tests.BasicTestModel", "my_field", states=4, branching=2, approvals=2, cycles=True, objects=3, stdout=out)
+
+        report = json.loads(out.getvalue())
+        assert_that(report, has_entry("parameters", has_entry("objects", 3)))
+        assert_that(report["results"], all_of(
+            has_key("initialize_approvals"),
+            has_key("get_available_approvals"),
+            has_key("get_on_approval_objects"),
+            has_key("hook_dispatch"),
+            has_key("approve"),
+            has_key("jump_to"),
+        ))
+        assert_that(report["results"]["initialize_approvals"], all_of(has_entry("calls", 3), has_entry("queries", greater_than(0))))
+
+    def test_shouldLeaveTheDatabaseAsItIs(self):
+        call_command("river_benchmark", "tests.BasicTestModel", "my_field", objects=2, stdout=StringIO())
+
+        assert_that(Workflow.objects.all(), has_length(0))
+        assert_that(Transition.objects.all(), has_length(0))
+        assert_that(BasicTestModel.objects.all(), has_length(0))
+
+    def test_shouldNotRunForAModelWhichAlreadyHasAWorkflow(self):
+        WorkflowFactory(initial_state=StateObjectFactory(), content_type=BasicTestModel.river.my_field._content_type, field_name="my_field")
+
+        assert_that(calling(call_command).with_args("river_benchmark", "tests.BasicTestModel", "my_field", stdout=StringIO()), raises(CommandError))
@@ -0,0 +1,118 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from django.utils import timezone
+from hamcrest import assert_that, equal_to, has_length, has_entries, calling, raises
+from six import StringIO
+
+from river.core.historyexport import export_history, APPROVALS, TRANSITIONS, JSON_LINES
+from river.models import TransitionApproval, APPROVED, PENDING, DONE
+from river.models.factories import PermissionObjectFactory, UserObjectFactory, StateObjectFactory, WorkflowFactory, TransitionMetaFactory, \
+    TransitionApprovalMetaFactory
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class HistoryExportTest(TestCase):
+
+    def setUp(self):
+        permission = PermissionObjectFactory()
+        self.user = UserObjectFactory(user_permissions=[permission])
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        state3 = StateObjectFactory(label="state3")
+        self.workflow = WorkflowFactory(initial_state=state1, content_type=ContentType.objects.get_for_model(BasicTestModel), field_name="my_field")
+        transition_meta_1 = TransitionMetaFactory.create(workflow=self.workflow, source_state=state1, destination_state=state2)
+        transition_meta_2 = TransitionMetaFactory.create(workflow=self.workflow, source_state=state2, destination_state=state3)
+        TransitionApprovalMetaFactory.create(workflow=self.workflow, transition_meta=transition_meta_1, priority=0, permissions=[permission])
+        TransitionApprovalMetaFactory.create(workflow=self.workflow, transition_meta=transition_meta_2, priority=0, permissions=[permission])
+
+        self.workflow_objects = [BasicTestModelObjectFactory().model for _ in range(3)]
+        self.workflow_objects[0].river.my_field.approve(as_user=self.user)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shouldExportTheApprovalsAsCsv(self):
+        output = StringIO()
+
+        count = export_history(output, chunk_size=2)
+
+        rows = list(csv.DictReader(StringIO(output.getvalue())))
+        assert_that(count, equal_to(6))
+        assert_that(rows, has_length(6))
+        assert_that(rows[0], has_entries({
+            "workflow": str(self.workflow.pk),
+            "app_label": "tests",
+            "model": "basictestmodel",
+            "object_id": str(self.workflow_objects[0].pk),
+            "source_state": "state1",
+            "destination_state": "state2",
+            "status": APPROVED,
+            "transactioner": self.user.username,
+        }))
+        assert_that(rows[1], has_entries({"status": PENDING, "transactioner": "", "transaction_date": ""}))
+
+    def test_shouldExportTheTransitionsAsJsonLines(self):
+        output = StringIO()
+
+        export_history(output, TRANSITIONS, JSON_LINES)
+
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert_that(rows, has_length(6))
+        assert_that(rows[0], has_entries({"iteration": 0, "source_state": "state1", "destination_state": "state2", "status": DONE}))
+
+    def test_shouldExportTheRowsInTheDateRangeOnly(self):
+        TransitionApproval.objects.filter(status=PENDING).update(date_updated=timezone.now() - timedelta(days=40))
+        output = StringIO()
+
+        count = export_history(output, APPROVALS, JSON_LINES, since=timezone.now() - timedelta(days=30), until=timezone.now() + timedelta(days=1))
+
+        assert_that(count, equal_to(1))
+        assert_that(json.loads(output.getvalue())["status"], equal_to(APPROVED))
+
+    def test_shouldExportToAFileWithTheCommand(self):
+        path = os.path.join(self.directory, "approvals.jsonl")
+
+        call_command("river_export_history", output=path, workflow=self.workflow.pk, content_type="tests.basictestmodel",
+                     since="2000-01-01", date_field="date_created", stderr=StringIO())
+
+        with open(path) as output:
+            assert_that(output.read().splitlines(), has_length(6))
+
+    def test_shouldRequireTheFormatWhenTheExtensionOfTheOutputIsAmbiguous(self):
+        path = os.path.join(self.directory, "approvals.json")
+
+        assert_that(
+            calling(call_command).with_args("river_export_history", output=path, stderr=StringIO()),
+            raises(CommandError, "It should be given with --format")
+        )
+        assert_that(os.path.exists(path), equal_to(False))
+
+        call_command("river_export_history", output=path, format=JSON_LINES, stderr=StringIO())
+
+        with open(path) as output:
+            assert_that(json.loads(output.readline()), has_entries(status=APPROVED))
+
+    def test_shouldWriteCsvToTheStandardOutputWithTheCommand(self):
+        out = StringIO()
+
+        call_command("river_export_history", table="transitions", stdout=out)
+
+        assert_that(list(csv.reader(StringIO(out.getvalue()))), has_length(7))
+
+    def test_shouldRejectAnInvalidDateField(self):
+        assert_that(
+            calling(call_command).with_args("river_export_history", table="transitions", date_field="transaction_date", stdout=StringIO()),
+            raises(CommandError, "Date field of transitions should be one of")
+        )
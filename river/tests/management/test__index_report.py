@@ -0,0 +1,36 @@
+import json
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase
+from hamcrest import assert_that, has_length, has_item, only_contains, has_entry, has_key
+from six import StringIO
+
+from river.models.factories import StateObjectFactory, WorkflowFactory, TransitionMetaFactory, TransitionApprovalMetaFactory
+from river.tests.models import BasicTestModel
+from river.tests.models.factories import BasicTestModelObjectFactory
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class IndexReportTest(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(IndexReportTest, self).__init__(*args, **kwargs)
+        self.content_type = ContentType.objects.get_for_model(BasicTestModel)
+
+    def test_shouldReportTheRiverIndexesThePlannerUses(self):
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        workflow = WorkflowFactory(initial_state=state1, content_type=self.content_type, field_name="my_field")
+        transition_meta = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta, priority=0)
+        BasicTestModelObjectFactory()
+
+        out = StringIO()
+        call_command("river_index_report", format="json", stdout=out)
+
+        report = json.loads(out.getvalue())
+        assert_that(report, has_length(5))
+        assert_that(report, only_contains(has_entry("workflow", workflow.pk)))
+        assert_that(report, only_contains(has_key("plan")))
+        assert_that([index_name for entry in report for index_name in entry["indexes"]], has_item("river_ta_obj_tx_date_idx"))
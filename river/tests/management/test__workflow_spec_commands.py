@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from hamcrest import assert_that, equal_to, has_length, calling, raises, contains_string
+from six import StringIO
+
+from river.core.workflowspec import import_workflows
+from river.models import Workflow, TransitionApprovalMeta
+from river.models.factories import PermissionObjectFactory
+
+
+# noinspection PyMethodMayBeStatic,DuplicatedCode
+class WorkflowSpecCommandsTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        permission = PermissionObjectFactory()
+        import_workflows({
+            "version": 1,
+            "states": [{"slug": "opened", "label": "Opened"}, {"slug": "closed", "label": "Closed"}],
+            "workflows": [{
+                "model": "tests.basictestmodel",
+                "field_name": "my_field",
+                "initial_state": "opened",
+                "transitions": [{
+                    "source": "opened",
+                    "destination": "closed",
+                    "approvals": [{"priority": 0, "permissions": ["%s.%s" % (permission.content_type.app_label, permission.codename)]}],
+                }],
+            }],
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shouldExportAndImportBackInJson(self):
+        path = os.path.join(self.directory, "workflows.json")
+        call_command("river_export_workflows", output=path, stdout=StringIO())
+        with open(path) as spec_file:
+            spec = json.load(spec_file)
+        assert_that(spec["workflows"], has_length(1))
+
+        TransitionApprovalMeta.objects.all().delete()
+        out = StringIO()
+        call_command("river_import_workflows", path, stdout=out)
+
+        assert_that(out.getvalue(), contains_string("1 workflows are imported."))
+        assert_that(TransitionApprovalMeta.objects.all(), has_length(1))
+
+    def test_shouldExportAndImportBackInYaml(self):
+        path = os.path.join(self.directory, "workflows.yml")
+        call_command("river_export_workflows", output=path, stdout=StringIO())
+        with open(path) as spec_file:
+            assert_that(spec_file.read(), contains_string("initial_state: opened"))
+
+        call_command("river_import_workflows", path, stdout=StringIO())
+
+        assert_that(Workflow.objects.all(), has_length(1))
+
+    def test_shouldWriteToTheStandardOutputByDefault(self):
+        out = StringIO()
+        call_command("river_export_workflows", workflow=[Workflow.objects.get().pk], stdout=out)
+
+        assert_that(json.loads(out.getvalue())["workflows"][0]["field_name"], equal_to("my_field"))
+
+    def test_shouldFailWithTheProblemsOfAnInvalidSpec(self):
+        path = os.path.join(self.directory, "workflows.json")
+        with open(path, "w") as spec_file:
+            json.dump({"version": 1, "workflows": [{"model": "tests.nosuchmodel"}]}, spec_file)
+
+        assert_that(
+            calling(call_command).with_args("river_import_workflows", path, stdout=StringIO()),
+            raises(CommandError, "model tests.nosuchmodel should be an existing model")
+        )
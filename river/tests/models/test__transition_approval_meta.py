@@ -1,8 +1,9 @@
 from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
-from hamcrest import assert_that, has_length, has_item, has_property, none
+from hamcrest import assert_that, has_length, has_item, has_property, none, equal_to, contains_inanyorder, empty
 
-from river.models import TransitionApproval, APPROVED, PENDING
+from river.core.approvalmetagraph import rebuild_approval_meta_graph, deferred_approval_meta_graph, update_approval_meta_neighbours
+from river.models import TransitionApproval, TransitionApprovalMeta, APPROVED, PENDING
 from river.models.factories import WorkflowFactory, StateObjectFactory, TransitionApprovalMetaFactory, TransitionMetaFactory
 from river.tests.models import BasicTestModel
 from river.tests.models.factories import BasicTestModelObjectFactory
@@ -60,3 +61,75 @@ class TransitionApprovalMetaModelTest(TestCase):
         meta1.delete()
 
         assert_that(TransitionApproval.objects.filter(workflow=workflow), has_length(0))
+
+    def _create_workflow(self):
+        content_type = ContentType.objects.get_for_model(BasicTestModel)
+
+        state1 = StateObjectFactory(label="state1")
+        state2 = StateObjectFactory(label="state2")
+        state3 = StateObjectFactory(label="state3")
+
+        workflow = WorkflowFactory(initial_state=state1, content_type=content_type, field_name="my_field")
+
+        transition_meta_1 = TransitionMetaFactory.create(workflow=workflow, source_state=state1, destination_state=state2)
+        transition_meta_2 = TransitionMetaFactory.create(workflow=workflow, source_state=state2, destination_state=state3)
+        transition_meta_3 = TransitionMetaFactory.create(workflow=workflow, source_state=state3, destination_state=state1)
+
+        meta1 = TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_1, priority=0)
+        meta2 = TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=0)
+        meta3 = TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_2, priority=1)
+        meta4 = TransitionApprovalMetaFactory.create(workflow=workflow, transition_meta=transition_meta_3, priority=0)
+        return workflow, meta1, meta2, meta3, meta4
+
+    def test_shouldMaintainTheParentsWhenSaved(self):
+        workflow, meta1, meta2, meta3, meta4 = self._create_workflow()
+
+        assert_that(meta1.parents.all(), contains_inanyorder(meta4))
+        assert_that(meta2.parents.all(), contains_inanyorder(meta1))
+        assert_that(meta3.parents.all(), contains_inanyorder(meta1))
+        assert_that(meta4.parents.all(), contains_inanyorder(meta2, meta3))
+
+    def test_shouldRebuildTheParentsWithTheDifferenceOnly(self):
+        workflow, meta1, meta2, meta3, meta4 = self._create_workflow()
+        meta1.parents.clear()
+        meta2.parents.add(meta3)
+
+        with self.assertNumQueries(6):
+            assert_that(rebuild_approval_meta_graph(workflow), equal_to((1, 1)))
+
+        assert_that(meta1.parents.all(), contains_inanyorder(meta4))
+        assert_that(meta2.parents.all(), contains_inanyorder(meta1))
+        assert_that(rebuild_approval_meta_graph(workflow), equal_to((0, 0)))
+
+    def test_shouldUpdateOnlyTheRelationsOfTheSavedApprovalMeta(self):
+        workflow, meta1, meta2, meta3, meta4 = self._create_workflow()
+        TransitionApprovalMeta.objects.filter(pk=meta3.pk).update(transition_meta=meta4.transition_meta)
+        meta3.refresh_from_db()
+
+        with self.assertNumQueries(7):
+            assert_that(update_approval_meta_neighbours(meta3), equal_to((2, 2)))
+
+        assert_that(meta3.parents.all(), contains_inanyorder(meta2))
+        assert_that(meta1.parents.all(), contains_inanyorder(meta3, meta4))
+        assert_that(meta4.parents.all(), contains_inanyorder(meta2))
+        assert_that(rebuild_approval_meta_graph(workflow), equal_to((0, 0)))
+
+    def test_shouldUpdateTheRelationsWhenTheTransitionOfAnApprovalMetaIsChanged(self):
+        workflow, meta1, meta2, meta3, meta4 = self._create_workflow()
+
+        meta3.transition_meta = meta4.transition_meta
+        meta3.save()
+
+        assert_that(meta3.parents.all(), contains_inanyorder(meta2))
+        assert_that(meta4.parents.all(), contains_inanyorder(meta2))
+        assert_that(rebuild_approval_meta_graph(workflow), equal_to((0, 0)))
+
+    def test_shouldDeferMaintainingTheParentsUntilTheBlockExits(self):
+        with deferred_approval_meta_graph():
+            with deferred_approval_meta_graph():
+                workflow, meta1, meta2, meta3, meta4 = self._create_workflow()
+            assert_that(TransitionApprovalMeta.parents.through.objects.all(), empty())
+            assert_that(meta4.parents.all(), empty())
+
+        assert_that(meta1.parents.all(), contains_inanyorder(meta4))
+        assert_that(meta4.parents.all(), contains_inanyorder(meta2, meta3))
@@ -0,0 +1,11 @@
+def bulk_update(model, objects, fields):
+    """
+    ``bulk_update`` of the default manager of the model. It is only available as of Django 2.2, so the objects are
+    updated one by one with an ``update`` query on the earlier versions. Neither of them fires any model signal.
+    """
+    if hasattr(model.objects, "bulk_update"):
+        return model.objects.bulk_update(objects, fields)
+
+    attnames = [model._meta.get_field(field).attname for field in fields]
+    for obj in objects:
+        model.objects.filter(pk=obj.pk).update(**dict((attname, getattr(obj, attname)) for attname in attnames))
@@ -10,3 +10,7 @@ class ErrorCode(object):
     NO_STATE_FIELD = 8
     ALREADY_SKIPPED = 9
     STATE_IS_NOT_AVAILABLE_TO_BE_JUMPED = 10
+    BULK_CREATE_REQUIRES_PRIMARY_KEYS = 11
+    INVALID_INBOX_CURSOR = 12
+    INVALID_WORKFLOW_SPEC = 13
+    AMBIGUOUS_BULK_CREATED_OBJECTS = 14
@@ -0,0 +1,16 @@
+import inspect
+
+from django.db import models
+
+_index_spec = (getattr(inspect, "getfullargspec", None) or inspect.getargspec)(models.Index.__init__)
+SUPPORTS_PARTIAL_INDEXES = "condition" in _index_spec.args + list(getattr(_index_spec, "kwonlyargs", None) or [])
+
+
+def partial_indexes(definitions):
+    """
+    The indexes with a condition. ``models.Index`` only takes a condition as of Django 2.2, so they are left out on the
+    earlier versions. Django itself doesn't create them on the database backends which don't support partial indexes.
+    """
+    if not SUPPORTS_PARTIAL_INDEXES:
+        return []
+    return [models.Index(**definition) for definition in definitions]
@@ -0,0 +1,96 @@
+import uuid
+
+from django.db.models import BigIntegerField
+from django.db.models.functions import Cast
+
+from river.config import app_config
+from river.utils.bulkupdate import bulk_update
+
+OBJECT_ID_INT = "object_id_int"
+OBJECT_ID_UUID = "object_id_uuid"
+
+INTEGER_TYPES = {
+    "AutoField", "BigAutoField", "SmallAutoField",
+    "IntegerField", "BigIntegerField", "SmallIntegerField", "PositiveIntegerField", "PositiveSmallIntegerField",
+}
+
+
+def typed_object_id_field_name(model_class):
+    """
+    The name of the typed object id column that can hold the primary keys of the given workflow model. It is ``None``
+    when the primary key is neither an integer nor a UUID and only the char ``object_id`` column can be used.
+    """
+    if model_class is None:
+        return None
+    internal_type = model_class._meta.pk.get_internal_type()
+    if internal_type in INTEGER_TYPES:
+        return OBJECT_ID_INT
+    elif internal_type == "UUIDField":
+        return OBJECT_ID_UUID
+    return None
+
+
+def populate_typed_object_id(instance, model_class=None):
+    """
+    Sets the typed object id of a transition or a transition approval from its char ``object_id``.
+    """
+    if model_class is None:
+        model_class = app_config.CONTENT_TYPE_CLASS.objects.get_for_id(instance.content_type_id).model_class()
+    instance.object_id_int = None
+    instance.object_id_uuid = None
+    field_name = typed_object_id_field_name(model_class)
+    if field_name and instance.object_id is not None:
+        setattr(instance, field_name, model_class._meta.pk.to_python(instance.object_id))
+
+
+def backfill_typed_object_ids(model, content_type_class, get_model_class, batch_size=1000):
+    """
+    Fills the typed object id columns of the rows of a transition or a transition approval model which don't have
+    them yet. The integer ones are filled with a single ``UPDATE`` per content type, the UUIDs batch by batch. Returns
+    the number of the rows that are filled.
+    """
+    filled = 0
+    content_type_ids = model.objects.order_by().values_list("content_type_id", flat=True).distinct()
+    for content_type in content_type_class.objects.filter(pk__in=list(content_type_ids)):
+        model_class = get_model_class(content_type)
+        field_name = typed_object_id_field_name(model_class)
+        rows = model.objects.filter(content_type_id=content_type.pk, object_id_int__isnull=True, object_id_uuid__isnull=True)
+        if field_name == OBJECT_ID_INT:
+            filled += rows.update(object_id_int=Cast("object_id", BigIntegerField()))
+        elif field_name == OBJECT_ID_UUID:
+            last_pk = None
+            while True:
+                batch = rows.order_by("pk") if last_pk is None else rows.filter(pk__gt=last_pk).order_by("pk")
+                batch = list(batch.values_list("pk", "object_id")[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1][0]
+                objects = [model(pk=pk, object_id_uuid=_to_uuid(object_id)) for pk, object_id in batch if _to_uuid(object_id)]
+                bulk_update(model, objects, ["object_id_uuid"])
+                filled += len(objects)
+    return filled
+
+
+def _to_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def object_id_filter(model_class, object_id):
+    """
+    The lookup that matches the transitions or the transition approvals of a workflow object, on the typed object id
+    column when there is one for the workflow model.
+    """
+    field_name = typed_object_id_field_name(model_class)
+    return {field_name: object_id} if field_name else {"object_id": object_id}
+
+
+def object_ids_filter(model_class, object_ids):
+    field_name = typed_object_id_field_name(model_class)
+    return {field_name + "__in": list(object_ids)} if field_name else {"object_id__in": [str(object_id) for object_id in object_ids]}
+
+
+def on_pre_save(sender, instance, *args, **kwargs):
+    populate_typed_object_id(instance)
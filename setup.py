@@ -26,6 +26,9 @@ setup(
         "django-cte==1.1.4",
         "django-codemirror2==0.2"
     ],
+    extras_require={
+        "yaml": ["PyYAML"],
+    },
     include_package_data=True,
     zip_safe=False,
     license='BSD',